@@ -3,10 +3,18 @@
 # UI Dimensions
 IMAGE_PREVIEW_MAX_WIDTH = 560
 IMAGE_PREVIEW_MAX_HEIGHT = 480
+PREVIEW_CACHE_MAX_BYTES = 128 * 1024 * 1024
+PREVIEW_RESIZE_SETTLE_MS = 150  # Smooth rescale once resizing pauses this long
+PREVIEW_LOAD_PRIORITY = 2  # Thread pool priority of the selected file's preview, above visible thumbnails
+TIFF_DECODE_MAX_BYTES = 64 * 1024 * 1024  # Working memory for decoding large TIFFs at reduced size
+PREFETCH_AHEAD_FILES = 3  # Files not done yet after the current one whose preview and metadata are prefetched
 
 # Magic Strings
 NULL_PRESET_NAME = "(None)"
 DONE_ICON = "✓ "
+PENDING_ICON = "… "  # Save queued or being written
+ERROR_ICON = "⚠ "  # Save failed; can be retried from the context menu
+MISMATCH_ICON = "✗ "  # Saved, but the image data changed; check the file
 
 # Datetime Adjustment Controls
 DT_CONTROL_LIST = [
@@ -20,8 +28,39 @@ DT_CONTROL_LIST = [
     ["-00:01", "L", (0, 0, -1)],
 ]
 
+# exiftool Worker Pool
+EXIFTOOL_WORKERS_MAX = 64
+METADATA_CHUNK_SIZE = 32
+METADATA_CACHE_MAX_ENTRIES = 50000
+METADATA_CACHE_MAX_BYTES = 256 * 1024 * 1024
+METADATA_CACHE_MB_MAX = 4096
+METADATA_INDEX_FILENAME = "Timestamper-metadata.sqlite3"
+UNDO_JOURNAL_FILENAME = "Timestamper-undo-{pid}.jsonl"  # One per running instance
+THUMBNAIL_CACHE_FILENAME = "Timestamper-thumbnails.pack"
+THUMBNAIL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+THUMBNAIL_CACHE_MB_MAX = 16384
+
+# File list
+THUMBNAIL_PREFETCH_ROWS = 50  # Rows beyond the viewport whose thumbnails and metadata are loaded
+THUMBNAIL_KEEP_ROWS = 200  # Rows beyond the viewport whose thumbnails are kept in memory
+VIEWPORT_UPDATE_DELAY_MS = 20
+LIST_ICON_SIZE = 32
+GRID_ICON_SIZE_MIN = 64
+GRID_ICON_SIZE_MAX = 256
+GRID_ICON_SIZE_DEFAULT = 128
+# Thumbnails are decoded and cached at the smallest of these sizes (in device pixels) that fits the icons
+THUMBNAIL_SIZE_TIERS = (32, 64, 128, 256, 512)
+THUMBNAIL_BATCH_SIZE = 8  # Thumbnails decoded by each task on the thread pool
+THUMBNAIL_MEMORY_MAX_BYTES = 128 * 1024 * 1024  # Decoded thumbnails the file list may hold
+METADATA_INDEX_VERSION = 2  # Bump whenever FORM_TAGS or the stored value format changes
+
 # File Dialog Filters
 FILE_FILTER = "Image Files (*.png *.jpg *.jpeg *.bmp *.tif *.tiff)"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+# Folder scanning
+SCAN_BATCH_SIZE = 2000  # Found files added to the list at a time
+SCAN_BATCH_INTERVAL_MS = 50  # Longest wait before found files are added to the list
 
 # EXIF Tags
 EXIF_MAKE = "EXIF:Make"
@@ -34,3 +73,48 @@ EXIF_OFFSET_TIME_ORIGINAL = "EXIF:OffsetTimeOriginal"
 EXIF_OFFSET_TIME = "EXIF:OffsetTime"
 EXIF_EXPOSURE_TIME = "EXIF:ExposureTime"
 EXIF_SHUTTER_SPEED = "EXIF:ShutterSpeedValue"
+EXIF_ISO = "EXIF:ISO"
+EXIF_F_NUMBER = "EXIF:FNumber"
+EXIF_FOCAL_LENGTH = "EXIF:FocalLength"
+EXIF_MAX_APERTURE_VALUE = "EXIF:MaxApertureValue"
+EXIF_LENS_SERIAL_NUMBER = "EXIF:LensSerialNumber"
+
+# Read Profiles
+READ_PROFILE_FORM = "form"  # Only the tags the editing form reads and writes
+READ_PROFILE_FULL = "full"  # Complete metadata dump for the EXIF tree view
+FORM_TAGS = [
+    EXIF_DATE_TIME_ORIGINAL,
+    EXIF_OFFSET_TIME_ORIGINAL,
+    EXIF_OFFSET_TIME,
+    EXIF_MAKE,
+    EXIF_MODEL,
+    EXIF_LENS_MAKE,
+    EXIF_LENS_MODEL,
+    EXIF_LENS_INFO,
+    EXIF_LENS_SERIAL_NUMBER,
+    EXIF_MAX_APERTURE_VALUE,
+    EXIF_ISO,
+    EXIF_F_NUMBER,
+    EXIF_FOCAL_LENGTH,
+    EXIF_EXPOSURE_TIME,
+    EXIF_SHUTTER_SPEED,
+]
+# Form tags holding numbers (or lists of numbers), compared with a relative tolerance
+NUMERIC_TAGS = {"ExposureTime", "ShutterSpeedValue", "FNumber", "MaxApertureValue", "FocalLength", "ISO", "LensInfo"}
+OFFSET_TAGS = {"OffsetTime", "OffsetTimeOriginal"}
+TAG_VALUE_REL_TOLERANCE = 1e-3  # Rationals and APEX values do not round-trip exactly
+# -fast2 stops at the image data and skips MakerNotes, which never hold form tags
+FORM_READ_PARAMS = ["-fast2"]
+
+# Save Modes (how a save reached the file)
+SAVE_MODE_IN_PLACE = "in-place"  # Values patched inside the existing metadata, nothing moved
+SAVE_MODE_APPENDED = "appended"  # New IFDs appended to a TIFF file, image data untouched
+SAVE_MODE_REWRITTEN = "rewritten"  # The whole file was written again
+SAVE_MODE_SIDECAR = "sidecar"  # Written to an XMP sidecar, the image file untouched
+SAVE_MODE_UNCHANGED = "unchanged"  # The file already carried every value, nothing was written
+SAVE_MODE_PAYLOAD_CHANGED = "image data changed"  # Saved, but verification found the image data altered
+
+# Save Targets (where the form tags are saved)
+SAVE_TARGET_EMBEDDED = "embedded"  # EXIF inside the image file
+SAVE_TARGET_SIDECAR = "sidecar"  # An XMP sidecar next to the image file
+XMP_SIDECAR_EXTENSION = ".xmp"
@@ -0,0 +1,176 @@
+"""Image decoding in worker processes, with pixels passed back through shared memory.
+
+Decoding in threads is limited by the GIL in the Python parts of the pipeline and by
+Qt image plugins that serialize internally. A DecodePool runs load_scaled_image in
+separate processes instead. Each worker copies the decoded pixels into a
+multiprocessing.shared_memory block and returns only its name and the image layout;
+the GUI process maps the block and wraps it in a QImage, so pixels are never pickled
+or copied on the way back.
+"""
+
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker, shared_memory
+from typing import NamedTuple, Optional
+
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QImage
+
+from .image_loader import load_scaled_image
+
+logger = logging.getLogger(__name__)
+
+# Before Python 3.13 every block opened on POSIX is registered with the resource tracker
+_ALWAYS_TRACKED = sys.version_info < (3, 13) and os.name == "posix"
+
+
+class _SharedImage(NamedTuple):
+    """The layout of a decoded image left in a shared memory block by a worker."""
+    name: str
+    width: int
+    height: int
+    bytes_per_line: int
+    format: int
+
+
+def default_decode_workers() -> int:
+    """Returns the default number of decoding processes: one per core."""
+    return max(1, os.cpu_count() or 1)
+
+
+def _open_shared_memory(**kwargs) -> shared_memory.SharedMemory:
+    """
+    Opens a shared memory block that the resource tracker leaves to its owner to unlink.
+
+    Where blocks are always tracked, a block attached by name is unregistered again when
+    the GUI process unlinks it, and a worker unregisters the blocks it hands over.
+    """
+    if _ALWAYS_TRACKED:
+        return shared_memory.SharedMemory(**kwargs)
+    return shared_memory.SharedMemory(track=False, **kwargs)
+
+
+def _decode_to_shared_memory(file_path: str, width: int, height: int) -> Optional[_SharedImage]:
+    """Decodes an image in a worker and leaves its pixels in a new shared memory block."""
+    image = load_scaled_image(file_path, QSize(width, height))
+    if image.isNull():
+        return None
+    block = _open_shared_memory(create=True, size=image.sizeInBytes())
+    try:
+        block.buf[:image.sizeInBytes()] = image.constBits()
+        shared = _SharedImage(block.name, image.width(), image.height(), image.bytesPerLine(), image.format().value)
+    except BaseException:
+        block.unlink()
+        raise
+    finally:
+        block.close()  # The GUI process maps the block by name and unlinks it
+    if _ALWAYS_TRACKED:
+        # Otherwise the tracker unlinks the block again at exit and warns that it leaked
+        resource_tracker.unregister(block._name, "shared_memory")
+    return shared
+
+
+class _SharedPixels:
+    """
+    Keeps a shared memory block mapped for as long as the QImage wrapping it is alive.
+
+    PySide keeps a reference to the buffer object a QImage is constructed from, so the
+    block is closed when the last Python reference to that QImage goes away.
+    """
+
+    def __init__(self, block: shared_memory.SharedMemory):
+        """Takes ownership of an open, already unlinked block."""
+        self._block = block
+
+    def __buffer__(self, flags: int) -> memoryview:
+        """Exposes the pixels to the QImage constructor."""
+        return memoryview(self._block.buf)
+
+    def __del__(self) -> None:
+        """Unmaps the block once the image is gone."""
+        self._block.close()
+
+
+def _wrap_shared_image(shared: _SharedImage) -> QImage:
+    """
+    Maps a worker's block and wraps it in a QImage without copying the pixels.
+
+    The block is unlinked straight away, so its memory is freed once it is unmapped.
+    The QImage must only be passed on as a Python object: a C++ copy, such as a queued
+    signal argument, does not keep the block mapped, so hand on ``image.copy()`` instead.
+    """
+    block = _open_shared_memory(name=shared.name)
+    try:
+        block.unlink()
+    except FileNotFoundError:
+        pass  # Windows frees the block when its last handle closes
+    pixels = _SharedPixels(block)
+    return QImage(pixels, shared.width, shared.height, shared.bytes_per_line, QImage.Format(shared.format))
+
+
+class DecodePool:
+    """
+    A pool of worker processes that decode thumbnails and previews.
+
+    ``decode`` can be called from any thread; it blocks until a worker has decoded the
+    image, so a QThreadPool of loaders keeps every worker busy.
+    """
+
+    def __init__(self, max_workers: int):
+        """Initializes the pool; worker processes are started when the first image is decoded."""
+        self.max_workers = max(1, max_workers)
+        # Forking a process that runs Qt threads is unsafe, so workers are spawned
+        self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        self._broken = False
+
+    def submit(self, file_path: str, size: QSize) -> Future:
+        """
+        Starts decoding an image scaled to fit within ``size``.
+
+        Returns:
+            A future for the QImage, null if the file cannot be decoded. Shared memory
+            blocks are claimed as soon as a worker finishes, whether or not anyone is
+            still waiting for the result, so none are left behind.
+        """
+        result: Future = Future()
+        try:
+            decoding = self._executor.submit(_decode_to_shared_memory, file_path, size.width(), size.height())
+        except (BrokenProcessPool, RuntimeError) as e:
+            result.set_exception(e)
+            return result
+
+        def claim(done: Future) -> None:
+            try:
+                shared = done.result()
+                result.set_result(QImage() if shared is None else _wrap_shared_image(shared))
+            except BaseException as e:
+                result.set_exception(e)
+
+        decoding.add_done_callback(claim)
+        return result
+
+    def decode(self, file_path: str, size: QSize) -> QImage:
+        """
+        Decodes an image scaled to fit within ``size`` in a worker process.
+
+        Falls back to decoding in this process if the pool has broken, for example
+        because a worker crashed in an image plugin.
+        """
+        if not self._broken:
+            try:
+                return self.submit(file_path, size).result()
+            except (BrokenProcessPool, RuntimeError) as e:
+                logger.error(f"Decoding processes unavailable, decoding in-process: {e}")
+                self._broken = True
+            except Exception as e:
+                logger.error(f'Error decoding "{file_path}" in a worker process: {e}')
+                return QImage()
+        return load_scaled_image(file_path, size)
+
+    def close(self) -> None:
+        """Stops the worker processes, dropping decodes that have not started."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
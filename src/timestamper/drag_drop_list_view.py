@@ -0,0 +1,143 @@
+from PySide6.QtWidgets import QListView, QWidget
+from PySide6.QtCore import QAbstractItemModel, QItemSelectionModel, QSize, Qt, QTimer, Signal
+from PySide6.QtGui import QDragEnterEvent, QDropEvent, QDragMoveEvent, QResizeEvent
+from typing import Optional, List
+
+from .constants import LIST_ICON_SIZE, VIEWPORT_UPDATE_DELAY_MS
+
+GRID_SPACING = 8  # Pixels around each cell of the grid
+
+
+class DragDropListView(QListView):
+    """
+    A QListView that supports drag and drop of files.
+
+    It also reports which rows are on screen, so data for a large model can be loaded
+    for the visible rows only, and shows either a list or a grid of thumbnails.
+    """
+    filesDropped = Signal(list)
+    # First and last row in the viewport, emitted shortly after scrolling or resizing
+    visibleRowsChanged = Signal(int, int)
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        """Initializes the DragDropListView."""
+        super().__init__(parent)
+        self.setAcceptDrops(True)
+        self.setDragEnabled(False)
+        self._visible_rows_timer = QTimer(self)
+        self._visible_rows_timer.setSingleShot(True)
+        self._visible_rows_timer.setInterval(VIEWPORT_UPDATE_DELAY_MS)
+        self._visible_rows_timer.timeout.connect(self._emit_visible_rows)
+        self.verticalScrollBar().valueChanged.connect(self._schedule_visible_rows)
+        self.horizontalScrollBar().valueChanged.connect(self._schedule_visible_rows)
+
+    def setModel(self, model: QAbstractItemModel) -> None:
+        """Sets the model and reports the visible rows whenever its rows change."""
+        super().setModel(model)
+        model.modelReset.connect(self._schedule_visible_rows)
+        model.rowsInserted.connect(self._schedule_visible_rows)
+
+    def count(self) -> int:
+        """Returns the number of rows."""
+        return self.model().rowCount() if self.model() is not None else 0
+
+    def currentRow(self) -> int:
+        """Returns the row of the current index, or -1."""
+        return self.currentIndex().row()
+
+    def setCurrentRow(self, row: int) -> None:
+        """Makes a row current and the only selected row."""
+        self.selectionModel().setCurrentIndex(
+            self.model().index(row, 0), QItemSelectionModel.SelectionFlag.ClearAndSelect
+        )
+
+    def selectedRows(self) -> List[int]:
+        """Returns the selected rows, in the order they were selected."""
+        return [index.row() for index in self.selectionModel().selectedIndexes()]
+
+    def isGridMode(self) -> bool:
+        """Returns whether thumbnails are shown in a grid rather than a list."""
+        return self.viewMode() == QListView.ViewMode.IconMode
+
+    def setGridMode(self, grid: bool, icon_size: int) -> None:
+        """Shows the rows as a wrapping grid of ``icon_size`` thumbnails, or as a list of small ones."""
+        if grid:
+            self.setViewMode(QListView.ViewMode.IconMode)
+            self.setMovement(QListView.Movement.Static)  # IconMode would let items be dragged around
+            self.setResizeMode(QListView.ResizeMode.Adjust)
+            self.setIconSize(QSize(icon_size, icon_size))
+            text_height = self.fontMetrics().height()
+            self.setGridSize(QSize(icon_size + 2 * GRID_SPACING, icon_size + text_height + 2 * GRID_SPACING))
+        else:
+            self.setViewMode(QListView.ViewMode.ListMode)
+            self.setGridSize(QSize())
+            self.setIconSize(QSize(LIST_ICON_SIZE, LIST_ICON_SIZE))
+        self.setDragEnabled(False)
+        self._schedule_visible_rows()
+
+    def visibleRows(self) -> Optional[tuple[int, int]]:
+        """Returns the first and last row in the viewport, or None if no row is shown."""
+        count = self.count()
+        if not count:
+            return None
+        # Rows are laid out in order in both modes, so their rectangles can be bisected
+        height = self.viewport().height()
+        model = self.model()
+        first = self._bisect_rows(count, lambda row: self.visualRect(model.index(row, 0)).bottom() < 0)
+        last = self._bisect_rows(count, lambda row: self.visualRect(model.index(row, 0)).top() < height) - 1
+        first = min(first, count - 1)
+        return first, max(first, last)
+
+    @staticmethod
+    def _bisect_rows(count: int, is_before) -> int:
+        """Returns the first row for which ``is_before`` is False, or ``count``."""
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if is_before(middle):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _schedule_visible_rows(self, *args) -> None:
+        """Emits visibleRowsChanged once scrolling or resizing has paused."""
+        self._visible_rows_timer.start()
+
+    def _emit_visible_rows(self) -> None:
+        """Emits visibleRowsChanged for the current viewport."""
+        rows = self.visibleRows()
+        if rows is not None:
+            self.visibleRowsChanged.emit(*rows)
+
+    def resizeEvent(self, event: QResizeEvent):
+        """Reports the visible rows again once the viewport has been resized."""
+        super().resizeEvent(event)
+        self._schedule_visible_rows()
+
+    def dragEnterEvent(self, event: QDragEnterEvent):
+        """Handles the drag enter event to accept URLs."""
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+        else:
+            super().dragEnterEvent(event)
+
+    def dragMoveEvent(self, event: QDragMoveEvent):
+        """Handles the drag move event to accept URLs."""
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+        else:
+            super().dragMoveEvent(event)
+
+    def dropEvent(self, event: QDropEvent):
+        """Handles the drop event to add dropped files to the list."""
+        if event.mimeData().hasUrls():
+            event.setDropAction(Qt.CopyAction)
+            event.accept()
+            links = []
+            for url in event.mimeData().urls():
+                if url.isLocalFile():
+                    links.append(str(url.toLocalFile()))
+            self.filesDropped.emit(links)
+        else:
+            super().dropEvent(event)
@@ -1,8 +1,17 @@
 """EXIF data management for the Timestamper application."""
 
+import asyncio
+import json
 import logging
-from typing import Dict, Any, Optional
+import os
+import tempfile
+import threading
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, InvalidStateError, ThreadPoolExecutor, wait
+from os import path
+from typing import Any, Callable, Dict, Iterator, List, Optional
 import exiftool
+from exiftool.exceptions import ExifToolExecuteError, ExifToolNotRunning
 from PySide6.QtCore import QDateTime, Qt
 
 from .constants import (
@@ -13,9 +22,29 @@ from .constants import (
     EXIF_MODEL,
     EXIF_OFFSET_TIME,
     EXIF_OFFSET_TIME_ORIGINAL,
-    EXIF_SHUTTER_SPEED
+    EXIF_SHUTTER_SPEED,
+    FORM_READ_PARAMS,
+    FORM_TAGS,
+    METADATA_CACHE_MAX_BYTES,
+    METADATA_CACHE_MAX_ENTRIES,
+    METADATA_CHUNK_SIZE,
+    OFFSET_TAGS,
+    READ_PROFILE_FORM,
+    READ_PROFILE_FULL,
+    SAVE_MODE_REWRITTEN,
+    SAVE_MODE_PAYLOAD_CHANGED,
+    SAVE_MODE_SIDECAR,
+    SAVE_MODE_UNCHANGED,
+    SAVE_TARGET_EMBEDDED,
+    SAVE_TARGET_SIDECAR
 )
-from .utils import float_to_shutterspeed, parse_lensinfo
+from . import native_exif, xmp_sidecar
+from .metadata_cache import FileSignature, MetadataCache, file_signature, normalize_path
+from .metadata_index import open_metadata_index
+from .native_exif import NativeExifUnsupported
+from .undo_journal import UndoJournal, open_undo_journal
+from .xmp_sidecar import XmpSidecarError
+from .utils import float_to_shutterspeed, parse_lensinfo, tag_values_equal
 
 logger = logging.getLogger(__name__)
 
@@ -25,38 +54,863 @@ class ExifToolNotFound(Exception):
     pass
 
 
+def default_worker_count() -> int:
+    """Returns the default number of exiftool worker processes (one per CPU)."""
+    return os.cpu_count() or 1
+
+
+class ExifToolWorker:
+    """A stay-open exiftool process serviced by its own request thread."""
+
+    def __init__(self, exiftool_path: str, name: str = "exiftool"):
+        """Initialize the worker; the exiftool process is started on first use."""
+        self.exiftool_path = exiftool_path
+        self.name = name
+        self._exiftool: Optional[exiftool.ExifToolHelper] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def submit(self, operation: Callable[[exiftool.ExifToolHelper], Any]) -> Future:
+        """Queues an operation; operations on one worker run strictly in submission order."""
+        return self._executor.submit(self.execute, operation)
+
+    def call(self, task: Callable[[], Any]) -> Future:
+        """Queues a task that may not need exiftool; it can call ``execute`` when it does."""
+        return self._executor.submit(task)
+
+    def _get_exiftool(self) -> exiftool.ExifToolHelper:
+        """Returns the stay-open exiftool process, starting it on first use."""
+        try:
+            if self._exiftool is None:
+                self._exiftool = exiftool.ExifToolHelper(executable=self.exiftool_path)
+            if not self._exiftool.running:
+                logger.info(f'Starting exiftool process "{self.exiftool_path}" for {self.name}')
+                self._exiftool.run()
+        except FileNotFoundError:
+            self._exiftool = None
+            raise ExifToolNotFound
+        return self._exiftool
+
+    def execute(self, operation: Callable[[exiftool.ExifToolHelper], Any]) -> Any:
+        """
+        Runs an operation on the exiftool process, restarting it once if it has crashed.
+
+        Must only be called on the worker thread, i.e. from a task queued with ``call``.
+        """
+        try:
+            return operation(self._get_exiftool())
+        except (ExifToolNotRunning, BrokenPipeError) as e:
+            logger.warning(f"exiftool process for {self.name} died ({e}), restarting")
+            self._exiftool = None
+            return operation(self._get_exiftool())
+
+    def _terminate(self) -> None:
+        """Stops the exiftool process; runs on the worker thread."""
+        if self._exiftool is not None:
+            self._exiftool.terminate()
+            logger.info(f"Stopped exiftool process for {self.name}")
+            self._exiftool = None
+
+    def close(self) -> None:
+        """Finishes queued operations, then shuts down the exiftool process."""
+        try:
+            self._executor.submit(self._terminate).result()
+        except Exception as e:
+            logger.error(f"Error stopping exiftool for {self.name}: {e}")
+        self._executor.shutdown(wait=True)
+
+
 class ExifManager:
     """Manages EXIF data operations for image files."""
     
-    def __init__(self, exiftool_path: str):
-        """Initialize the EXIF manager with the path to exiftool."""
+    def __init__(
+        self,
+        exiftool_path: str,
+        num_workers: Optional[int] = None,
+        use_native: bool = True,
+        cache_entries: int = METADATA_CACHE_MAX_ENTRIES,
+        cache_bytes: int = METADATA_CACHE_MAX_BYTES,
+        index_path: Optional[str] = None,
+        save_target: str = SAVE_TARGET_EMBEDDED,
+        journal_path: Optional[str] = None,
+        verify_payload: bool = False,
+        journal: Optional[UndoJournal] = None,
+    ):
+        """
+        Initialize the EXIF manager.
+
+        Args:
+            exiftool_path: The exiftool executable.
+            num_workers: The number of exiftool processes, one per CPU by default.
+            use_native: Read and write the form tags of JPEG and TIFF files without
+                exiftool where possible, falling back to exiftool for anything else.
+            cache_entries: The maximum number of metadata dictionaries kept in memory.
+            cache_bytes: The approximate memory budget of the metadata cache.
+            index_path: An SQLite database that keeps form-profile metadata across
+                sessions, or None to keep it in memory only.
+            save_target: SAVE_TARGET_EMBEDDED to write EXIF into the image files, or
+                SAVE_TARGET_SIDECAR to write XMP sidecars next to them instead. With
+                sidecars, reads merge the sidecar values over the embedded EXIF.
+            journal_path: The file recording the values saves replaced, for undo. It is
+                emptied on startup; a temporary file is used if it is None.
+            verify_payload: Hash the image data of JPEG and TIFF files before and after
+                each write, and report files whose image data changed as
+                SAVE_MODE_PAYLOAD_CHANGED.
+            journal: An undo journal owned by the caller, used instead of opening one at
+                ``journal_path``, so the undo history outlives this manager. It is not
+                closed with the manager.
+        """
         self.exiftool_path = exiftool_path
+        self.num_workers = max(1, num_workers or default_worker_count())
+        self.use_native = use_native
+        self.save_target = save_target
+        self._workers = [
+            ExifToolWorker(exiftool_path, f"exiftool-{i}") for i in range(self.num_workers)
+        ]
+        self._cache = MetadataCache(cache_entries, cache_bytes)
+        self._index = open_metadata_index(index_path)
+        self._owns_journal = journal is None
+        self._journal = open_undo_journal(journal_path) if journal is None else journal
+        self._hash_pool = (
+            ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="payload-hash")
+            if verify_payload else None
+        )
+    
+    @property
+    def uses_sidecars(self) -> bool:
+        """Whether form tags are saved to and read from XMP sidecars."""
+        return self.save_target == SAVE_TARGET_SIDECAR
+
+    def _signature(self, file_path: str) -> Optional[FileSignature]:
+        """Returns a file's signature, covering its sidecar when sidecars are in use."""
+        sidecar = xmp_sidecar.sidecar_path(file_path) if self.uses_sidecars else None
+        return file_signature(file_path, sidecar)
+
+    def _worker_for(self, file_path: str) -> ExifToolWorker:
+        """Returns the worker that owns a file, so requests for one file are never reordered."""
+        key = path.normcase(path.abspath(file_path)).encode("utf-8", "surrogateescape")
+        return self._workers[zlib.crc32(key) % self.num_workers]
+    
+    def close(self) -> None:
+        """Shuts down all exiftool processes and closes the metadata index and its own undo journal."""
+        for worker in self._workers:
+            worker.close()
+        if self._hash_pool is not None:
+            self._hash_pool.shutdown(wait=True)
+        if self._owns_journal:
+            self._journal.close()
+        if self._index is not None:
+            self._index.close()
+            self._index = None
     
-    def load_exif_data(self, file_path: str) -> Optional[Dict[str, Any]]:
-        """Load EXIF data from a file."""
+    def load_exif_data(self, file_path: str, profile: str = READ_PROFILE_FORM) -> Optional[Dict[str, Any]]:
+        """
+        Load EXIF data from a file, answering from the metadata cache when the file is
+        unchanged on disk.
+
+        Args:
+            file_path: The file to read.
+            profile: READ_PROFILE_FORM reads only the tags the editing form uses;
+                READ_PROFILE_FULL reads the complete metadata dump.
+        """
+        return self.submit_load(file_path, profile).result()
+    
+    def submit_load(self, file_path: str, profile: str = READ_PROFILE_FORM) -> Future:
+        """
+        Starts loading EXIF data without waiting for it.
+
+        Returns:
+            A future for the EXIF data. It is already done when the data was cached, and
+            cancelling it before its worker picks it up drops the read entirely.
+        """
+        signature = self._signature(file_path)
+        exif_data = self.get_cached_exif_data(file_path, profile, signature)
+        if exif_data is not None:
+            future: Future = Future()
+            future.set_result(exif_data)
+            return future
+        return self._load_exif_future(file_path, profile, signature, remember=True)
+    
+    async def load(self, file_path: str, profile: str = READ_PROFILE_FORM) -> Optional[Dict[str, Any]]:
+        """
+        Loads EXIF data from a file without blocking the event loop.
+
+        Cancelling the awaiting task drops the read if its worker has not started it yet.
+        """
+        return await asyncio.wrap_future(self.submit_load(file_path, profile))
+    
+    async def save(self, file_paths: List[str], tags: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """
+        Saves the same EXIF data to many files without blocking the event loop.
+
+        Cancelling the awaiting task drops the writes whose worker has not started them
+        yet; writes already running still finish.
+
+        Returns:
+            A mapping of each file path to its save mode, or None if it failed.
+        """
+        return await asyncio.wrap_future(self.submit_save(file_paths, tags))
+    
+    def get_cached_exif_data(
+        self,
+        file_path: str,
+        profile: str = READ_PROFILE_FORM,
+        signature: Optional[FileSignature] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Returns the cached EXIF data for a file without reading it, if it is unchanged on disk."""
+        if signature is None:
+            signature = self._signature(file_path)
+        return self._lookup_cached({file_path: signature}, profile)[file_path]
+    
+    def _lookup_cached(
+        self, signatures: Dict[str, Optional[FileSignature]], profile: str
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Looks up many files in the memory cache, then the rest in the metadata index.
+
+        Index hits whose signature still matches the file are promoted to the memory cache.
+        """
+        results = {}
+        for file_path, signature in signatures.items():
+            exif_data = self._cache.get(file_path, profile, signature)
+            if exif_data is None and profile == READ_PROFILE_FORM:
+                full_data = self._cache.get(file_path, READ_PROFILE_FULL, signature)
+                if full_data is not None:
+                    exif_data = self._form_subset(full_data)
+            results[file_path] = exif_data
+
+        missing = [p for p, exif_data in results.items() if exif_data is None and signatures[p]]
+        if missing and self._index is not None and profile == READ_PROFILE_FORM:
+            for file_path, (signature, exif_data) in self._index.get_many(missing, profile).items():
+                if signature == signatures[file_path]:
+                    self._cache.put(file_path, profile, exif_data, signature)
+                    results[file_path] = exif_data
+        return results
+    
+    def _remember(self, entries: List[tuple[str, Optional[FileSignature], Dict[str, Any]]], profile: str) -> None:
+        """Caches freshly read metadata in memory and, for the form profile, in the index."""
+        for file_path, signature, exif_data in entries:
+            self._cache.put(file_path, profile, exif_data, signature)
+        if self._index is not None and profile == READ_PROFILE_FORM:
+            self._index.put_many(entries, profile)
+    
+    def _forget(self, file_paths: List[str]) -> None:
+        """Drops cached and indexed metadata of files that are being written."""
+        for file_path in file_paths:
+            self._cache.invalidate(file_path)
+        if self._index is not None:
+            self._index.invalidate_many(file_paths)
+    
+    def preload_exif_data(
+        self,
+        file_paths: List[str],
+        chunk_size: int = METADATA_CHUNK_SIZE,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> int:
+        """
+        Reads the form tags of many files into the metadata cache.
+
+        Files are grouped by worker and read in chunks of ``chunk_size`` paths per exiftool
+        call. Each worker has at most one chunk in flight, so an interactive read queued on
+        the same worker only ever waits for a single chunk.
+
+        Args:
+            file_paths: The files to read.
+            chunk_size: The number of files passed to each exiftool invocation.
+            progress_callback: Called with (files done, files total) after each chunk.
+            is_cancelled: Polled between chunks; returning True stops the preload.
+
+        Returns:
+            The number of files whose metadata was cached.
+        """
+        signatures = {p: self._signature(p) for p in dict.fromkeys(file_paths)}
+        cached = self._lookup_cached(signatures, READ_PROFILE_FORM)
+        pending = [p for p, exif_data in cached.items() if exif_data is None]
+        total = len(pending)
+        if not total:
+            return 0
+
+        by_worker: Dict[ExifToolWorker, List[str]] = {}
+        for file_path in pending:
+            by_worker.setdefault(self._worker_for(file_path), []).append(file_path)
+        chunk_iters = {
+            worker: self._chunks(paths, chunk_size) for worker, paths in by_worker.items()
+        }
+
+        in_flight: Dict[Future, ExifToolWorker] = {}
+        for worker, chunks in chunk_iters.items():
+            chunk = next(chunks, None)
+            if chunk:
+                in_flight[worker.call(self._load_chunk_task(worker, chunk))] = worker
+
+        done_count = 0
+        stored = 0
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                worker = in_flight.pop(future)
+                results = future.result()
+                done_count += len(results)
+                entries = [
+                    (file_path, signatures[file_path], exif_data)
+                    for file_path, exif_data in results.items() if exif_data is not None
+                ]
+                self._remember(entries, READ_PROFILE_FORM)
+                stored += len(entries)
+                if progress_callback:
+                    progress_callback(done_count, total)
+                if is_cancelled and is_cancelled():
+                    continue
+                chunk = next(chunk_iters[worker], None)
+                if chunk:
+                    in_flight[worker.call(self._load_chunk_task(worker, chunk))] = worker
+
+        logger.info(f"Preloaded EXIF for {stored} of {total} files")
+        return stored
+    
+    def load_exif_data_many(self, file_paths: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Load the form tags of many files in parallel across the worker pool."""
+        signatures = {file_path: self._signature(file_path) for file_path in file_paths}
+        results = self._lookup_cached(signatures, READ_PROFILE_FORM)
+        futures = {
+            file_path: self._load_exif_future(file_path, READ_PROFILE_FORM)
+            for file_path, exif_data in results.items() if exif_data is None
+        }
+        for file_path, future in futures.items():
+            results[file_path] = future.result()
+        self._remember(
+            [(p, signatures[p], results[p]) for p in futures if results[p] is not None],
+            READ_PROFILE_FORM,
+        )
+        return results
+    
+    def save_exif_data(self, file_path: str, tags: Dict[str, str]) -> Optional[str]:
+        """
+        Save EXIF data to a file.
+
+        Returns:
+            How the file was written (SAVE_MODE_IN_PLACE, SAVE_MODE_APPENDED,
+            SAVE_MODE_REWRITTEN or SAVE_MODE_SIDECAR), SAVE_MODE_PAYLOAD_CHANGED if
+            verification found the image data altered, or None if the save failed. The
+            tags are written even if the file already carries them, so unlike batch saves
+            this never reports SAVE_MODE_UNCHANGED.
+        """
+        self._forget([file_path])
         try:
-            with exiftool.ExifToolHelper(executable=self.exiftool_path) as et:
-                exif_data = et.get_metadata(file_path)[0]
-                logger.info(f'Loaded EXIF for "{file_path}"')
-                return exif_data
-        except FileNotFoundError:
-            raise ExifToolNotFound
-        except Exception as e:
-            logger.error(f'Error loading EXIF for "{file_path}": {e}')
+            return self._save_exif_future(file_path, tags).result()
+        finally:
+            # A read cached while the save was queued describes the old file
+            self._forget([file_path])
+    
+    def save_exif_data_batch(self, file_paths: List[str], tags: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """
+        Saves the same EXIF data to many files.
+
+        The files owned by each worker are written by a single exiftool execution whose
+        arguments are passed through an argfile, so the batch size is never limited by
+        the command-line length. Workers run their batches in parallel.
+
+        Args:
+            file_paths: The files to write.
+            tags: The tags to write to every file.
+
+        Returns:
+            A mapping of each file path to its save mode, or None if it failed.
+            Files that already carry every value are SAVE_MODE_UNCHANGED.
+        """
+        return self.submit_save(file_paths, tags).result()
+    
+    def submit_save(self, file_paths: List[str], tags: Dict[str, str], journal: bool = True) -> Future:
+        """
+        Queues a batch save (see ``save_exif_data_batch``) without waiting for it.
+
+        Args:
+            file_paths: The files to write.
+            tags: The tags to write to every file.
+            journal: Record the values the save replaces, so ``submit_undo`` can restore
+                them.
+
+        Each file's current values are taken from the metadata cache, or read just
+        before the write for files not cached. Only the tags whose values differ are
+        written, and files already carrying every value are not written at all but
+        reported as SAVE_MODE_UNCHANGED.
+
+        Returns:
+            A future for the mapping of each file path to its save mode (or None). It fails
+            if any worker's batch raised. Cancelling it cancels the batches not yet started.
+        """
+        unique_paths = list(dict.fromkeys(file_paths))
+        signatures = {file_path: self._signature(file_path) for file_path in unique_paths}
+        current = {
+            file_path: exif_data
+            for file_path, exif_data in self._lookup_cached(signatures, READ_PROFILE_FORM).items()
+            if exif_data is not None
+        }
+        self._forget(unique_paths)
+        batches = self._submit_save_batches(unique_paths, tags, current)
+
+        def before_complete(results: Dict[str, Optional[str]]) -> None:
+            # A read cached while the save was queued describes the old file
+            self._forget(unique_paths)
+            if journal:
+                self._journal_save(results, tags, current)
+
+        return self._combine_results(batches, before_complete)
+    
+    def submit_undo(self) -> Future:
+        """
+        Restores the values replaced by the most recent journaled save.
+
+        Files that had the same previous values are written in one batch. Files that
+        fail to be restored are pushed back, so the undo can be retried.
+
+        Returns:
+            A future for the mapping of each restored file path to its save mode (or
+            None); empty if there is nothing to undo.
+        """
+        previous = self._journal.pop()
+        if not previous:
+            done: Future = Future()
+            done.set_result({})
+            return done
+        groups: Dict[str, List[str]] = {}
+        for file_path, values in previous.items():
+            groups.setdefault(json.dumps(values, sort_keys=True), []).append(file_path)
+        saves = [
+            self.submit_save(file_paths, json.loads(values), journal=False)
+            for values, file_paths in groups.items()
+        ]
+
+        def before_complete(results: Dict[str, Optional[str]]) -> None:
+            failed = {p: values for p, values in previous.items() if not results.get(p)}
+            if failed:
+                logger.warning(f"Undo failed for {len(failed)} files, keeping them in the journal")
+                self._journal.record(failed)
+            logger.info(f"Undid save on {len(previous) - len(failed)} files")
+
+        return self._combine_results(saves, before_complete)
+    
+    @property
+    def can_undo(self) -> bool:
+        """Whether a journaled save can be undone."""
+        return len(self._journal) > 0
+    
+    def _journal_save(
+        self,
+        results: Dict[str, Optional[str]],
+        tags: Dict[str, str],
+        previous: Dict[str, Optional[Dict[str, Any]]],
+    ) -> None:
+        """Records the values a finished save replaced in the files it wrote."""
+        entries = {}
+        for file_path, mode in results.items():
+            exif_data = previous.get(file_path)
+            if not mode or mode == SAVE_MODE_UNCHANGED:
+                continue
+            if exif_data is None:
+                logger.warning(f'Previous EXIF of "{file_path}" unknown, its save cannot be undone')
+                continue
+            entries[file_path] = {
+                tag: "" if exif_data.get(f"EXIF:{tag}") is None else str(exif_data[f"EXIF:{tag}"])
+                for tag in self._changed_tags(exif_data, tags)
+            }
+        self._journal.record(entries)
+    
+    @staticmethod
+    def _combine_results(
+        futures: List[Future],
+        before_complete: Callable[[Dict[str, Optional[str]]], None],
+    ) -> Future:
+        """
+        Combines futures of result mappings into one future of the merged mapping.
+
+        ``before_complete`` runs with the merged results once every future has finished,
+        before the combined future completes; an error it raises is logged, never left to
+        keep the combined future pending. The combined future fails if any of the
+        futures raised, and cancelling it cancels those not yet started.
+        """
+        combined: Future = Future()
+        results: Dict[str, Optional[str]] = {}
+        errors: List[BaseException] = []
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def complete() -> None:
+            try:
+                before_complete(results)
+            except Exception as e:
+                # The saves themselves finished, so their results are still delivered
+                logger.error(f"Error finishing a batch of saves: {e}")
+            try:
+                if errors:
+                    combined.set_exception(errors[0])
+                else:
+                    combined.set_result(results)
+            except InvalidStateError:
+                pass  # Cancelled by the caller in the meantime
+
+        def on_done(future: Future) -> None:
+            with lock:
+                try:
+                    results.update(future.result())
+                except BaseException as e:
+                    errors.append(e)
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            complete()
+
+        def on_combined_done(future: Future) -> None:
+            if future.cancelled():
+                for pending in futures:
+                    pending.cancel()
+
+        combined.add_done_callback(on_combined_done)
+        if not futures:
+            complete()
+        for future in futures:
+            future.add_done_callback(on_done)
+        return combined
+    
+    def _submit_save_batches(
+        self,
+        file_paths: List[str],
+        tags: Dict[str, str],
+        current: Dict[str, Optional[Dict[str, Any]]],
+    ) -> List[Future]:
+        """
+        Queues one batch save per worker for the files it owns.
+
+        Each batch first reads the files missing from ``current`` and adds their metadata,
+        so the values the save replaces are known.
+        """
+        by_worker: Dict[ExifToolWorker, List[str]] = {}
+        for file_path in file_paths:
+            by_worker.setdefault(self._worker_for(file_path), []).append(file_path)
+        return [
+            worker.call(self._save_batch_task(worker, paths, tags, current))
+            for worker, paths in by_worker.items()
+        ]
+    
+    @staticmethod
+    def _form_subset(exif_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns only the form tags (and SourceFile) of a full metadata dump."""
+        return {k: v for k, v in exif_data.items() if k == "SourceFile" or k in FORM_TAGS}
+    
+    @staticmethod
+    def _read_metadata(et: exiftool.ExifToolHelper, files: Any, profile: str) -> List[Dict[str, Any]]:
+        """Reads one or more files with a read profile."""
+        if profile == READ_PROFILE_FORM:
+            return et.get_tags(files, tags=FORM_TAGS, params=FORM_READ_PARAMS)
+        return et.get_metadata(files)
+    
+    @staticmethod
+    def _chunks(items: List[str], size: int) -> Iterator[List[str]]:
+        """Yields successive slices of at most ``size`` items."""
+        for i in range(0, len(items), max(1, size)):
+            yield items[i:i + size]
+    
+    def _native_read(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Reads the form tags without exiftool, or returns None if exiftool is needed."""
+        if not self.use_native:
+            return None
+        try:
+            exif_data = native_exif.read_form_tags(file_path)
+        except (NativeExifUnsupported, OSError) as e:
+            logger.debug(f'Native EXIF read of "{file_path}" not possible ({e}), using exiftool')
+            return None
+        logger.info(f'Loaded form EXIF natively for "{file_path}"')
+        return exif_data
+    
+    def _native_write(self, file_path: str, tags: Dict[str, str]) -> Optional[str]:
+        """Writes tags without exiftool; returns the save mode, or None if exiftool is needed."""
+        if not self.use_native:
+            return None
+        try:
+            mode = native_exif.write_form_tags(file_path, tags)
+        except (NativeExifUnsupported, OSError) as e:
+            # A failed native write leaves the original metadata in effect, so exiftool can retry
+            logger.debug(f'Native EXIF write to "{file_path}" not possible ({e}), using exiftool')
             return None
+        logger.info(f'Saved EXIF natively ({mode}) to "{file_path}": {tags}')
+        return mode
     
-    def save_exif_data(self, file_path: str, tags: Dict[str, str]) -> bool:
-        """Save EXIF data to a file."""
+    def _merge_sidecar(self, file_path: str, exif_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Overlays the values of a file's sidecar on its embedded EXIF when sidecars are in use."""
+        if exif_data is None or not self.uses_sidecars:
+            return exif_data
         try:
-            with exiftool.ExifToolHelper(executable=self.exiftool_path) as et:
+            sidecar_data = xmp_sidecar.read_sidecar(file_path)
+        except (XmpSidecarError, OSError) as e:
+            logger.error(f'Error reading XMP sidecar of "{file_path}": {e}')
+            return exif_data
+        return {**exif_data, **sidecar_data} if sidecar_data else exif_data
+    
+    def _sidecar_write(self, file_path: str, tags: Dict[str, str]) -> Optional[str]:
+        """Writes tags to a file's XMP sidecar; returns SAVE_MODE_SIDECAR, or None on failure."""
+        try:
+            xmp_sidecar.write_sidecar(file_path, tags)
+        except (XmpSidecarError, OSError) as e:
+            logger.error(f'Error saving XMP sidecar of "{file_path}": {e}')
+            return None
+        logger.info(f'Saved EXIF to sidecar "{xmp_sidecar.sidecar_path(file_path)}": {tags}')
+        return SAVE_MODE_SIDECAR
+    
+    def _load_chunk_task(self, worker: ExifToolWorker, file_paths: List[str]) -> Callable[[], Dict[str, Optional[Dict[str, Any]]]]:
+        """Builds a task that reads a chunk natively where possible and the rest with exiftool."""
+        def task() -> Dict[str, Optional[Dict[str, Any]]]:
+            results = {file_path: self._native_read(file_path) for file_path in file_paths}
+            remaining = [file_path for file_path, exif_data in results.items() if exif_data is None]
+            if remaining:
+                results.update(worker.execute(self._load_chunk_operation(remaining)))
+            return {file_path: self._merge_sidecar(file_path, exif_data) for file_path, exif_data in results.items()}
+        return task
+    
+    def _save_batch_task(
+        self,
+        worker: ExifToolWorker,
+        file_paths: List[str],
+        tags: Dict[str, str],
+        current: Dict[str, Optional[Dict[str, Any]]],
+    ) -> Callable[[], Dict[str, Optional[str]]]:
+        """
+        Builds a task that writes only the changed tags of each file.
+
+        Files needing the same changes are written together: to sidecars, or natively
+        where possible and the rest with one exiftool call.
+        """
+        def task() -> Dict[str, Optional[str]]:
+            unknown = [file_path for file_path in file_paths if file_path not in current]
+            if unknown:
+                current.update(self._load_chunk_task(worker, unknown)())
+            results: Dict[str, Optional[str]] = {}
+            by_changes: Dict[tuple, List[str]] = {}
+            for file_path in file_paths:
+                changed = self._changed_tags(current.get(file_path), tags)
+                if changed and self.uses_sidecars:
+                    changed = self._with_sidecar_date(changed, current.get(file_path), tags)
+                if changed:
+                    by_changes.setdefault(tuple(changed.items()), []).append(file_path)
+                else:
+                    results[file_path] = SAVE_MODE_UNCHANGED
+            if results:
+                logger.info(f"Skipped {len(results)} files that already carry {tags}")
+            for changes, paths in by_changes.items():
+                results.update(self._write_batch(worker, paths, dict(changes)))
+            return results
+        return task
+    
+    def _write_batch(self, worker: ExifToolWorker, file_paths: List[str], tags: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """Writes the same tags to several files; runs on the worker thread."""
+        if self.uses_sidecars:
+            return {file_path: self._sidecar_write(file_path, tags) for file_path in file_paths}
+
+        def write() -> Dict[str, Optional[str]]:
+            results: Dict[str, Optional[str]] = {}
+            remaining = []
+            for file_path in file_paths:
+                mode = self._native_write(file_path, tags)
+                if mode:
+                    results[file_path] = mode
+                else:
+                    remaining.append(file_path)
+            if remaining:
+                results.update(worker.execute(self._save_batch_operation(remaining, tags)))
+            return results
+        return self._write_verified(file_paths, write)
+    
+    def _write_verified(self, file_paths: List[str], write: Callable[[], Dict[str, Optional[str]]]) -> Dict[str, Optional[str]]:
+        """
+        Runs a write, checking that it left the image data of every written file intact.
+
+        Without ``verify_payload`` this only runs the write. Otherwise the files are
+        hashed in parallel before and after it; files that cannot be hashed (formats
+        other than JPEG and TIFF) are written unverified.
+        """
+        if self._hash_pool is None:
+            return write()
+        before = dict(zip(file_paths, self._hash_pool.map(self._payload_digest, file_paths)))
+        results = write()
+        written = [file_path for file_path in file_paths if before[file_path] and results.get(file_path)]
+        for file_path, digest in zip(written, self._hash_pool.map(self._payload_digest, written)):
+            if digest != before[file_path]:
+                logger.error(f'Image data of "{file_path}" changed while saving its EXIF')
+                results[file_path] = SAVE_MODE_PAYLOAD_CHANGED
+        return results
+    
+    @staticmethod
+    def _payload_digest(file_path: str) -> Optional[str]:
+        """Hashes a file's image data, or returns None if it cannot be verified."""
+        try:
+            return native_exif.payload_digest(file_path)
+        except (NativeExifUnsupported, OSError) as e:
+            logger.debug(f'Image data of "{file_path}" cannot be verified: {e}')
+            return None
+    
+    @staticmethod
+    def _with_sidecar_date(
+        changed: Dict[str, str], exif_data: Optional[Dict[str, Any]], tags: Dict[str, str]
+    ) -> Dict[str, str]:
+        """
+        Adds the file's DateTimeOriginal to a change of only the time zone offset.
+
+        Sidecars store the offset inside exif:DateTimeOriginal, so an unchanged date
+        must still be written for a new offset to be kept.
+        """
+        if "DateTimeOriginal" in changed or not OFFSET_TAGS & changed.keys():
+            return changed
+        date_time = (exif_data or {}).get("EXIF:DateTimeOriginal") or tags.get("DateTimeOriginal")
+        return {**changed, "DateTimeOriginal": str(date_time)} if date_time else changed
+
+    @staticmethod
+    def _changed_tags(exif_data: Optional[Dict[str, Any]], tags: Dict[str, str]) -> Dict[str, str]:
+        """Returns the tags whose values differ from a file's metadata (all of them if it is unknown)."""
+        if exif_data is None:
+            return dict(tags)
+        return {
+            tag: value for tag, value in tags.items()
+            if not tag_values_equal(tag, exif_data.get(f"EXIF:{tag}"), value)
+        }
+    
+    def _load_chunk_operation(self, file_paths: List[str]) -> Callable[[exiftool.ExifToolHelper], Dict[str, Optional[Dict[str, Any]]]]:
+        """Builds an operation that reads the form tags of several files in one exiftool call."""
+        def operation(et: exiftool.ExifToolHelper) -> Dict[str, Optional[Dict[str, Any]]]:
+            try:
+                by_source = {
+                    normalize_path(exif_data["SourceFile"]): exif_data
+                    for exif_data in self._read_metadata(et, file_paths, READ_PROFILE_FORM)
+                }
+                return {p: by_source.get(normalize_path(p)) for p in file_paths}
+            except (ExifToolNotRunning, BrokenPipeError):
+                raise
+            except Exception as e:
+                # One unreadable file fails the whole call; retry the chunk file by file
+                logger.warning(f"Batched EXIF read failed ({e}), reading {len(file_paths)} files individually")
+                results = {}
+                for file_path in file_paths:
+                    try:
+                        results[file_path] = self._read_metadata(et, file_path, READ_PROFILE_FORM)[0]
+                    except (ExifToolNotRunning, BrokenPipeError):
+                        raise
+                    except Exception as e:
+                        logger.error(f'Error loading EXIF for "{file_path}": {e}')
+                        results[file_path] = None
+                return results
+        return operation
+    
+    def _save_batch_operation(self, file_paths: List[str], tags: Dict[str, str]) -> Callable[[exiftool.ExifToolHelper], Dict[str, Optional[str]]]:
+        """Builds an operation that writes the same tags to several files in one exiftool call."""
+        def operation(et: exiftool.ExifToolHelper) -> Dict[str, Optional[str]]:
+            args = [f"-{tag}={value}" for tag, value in tags.items()]
+            if os.name == "nt":
+                args[:0] = ["-charset", "filename=utf8"]
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", suffix=".args", prefix="timestamper-", delete=False
+            ) as argfile:
+                argfile.write("\n".join(args + file_paths) + "\n")
+            try:
+                et.execute("-overwrite_original", "-@", argfile.name)
+                stderr = et.last_stderr or ""
+            except ExifToolExecuteError as e:
+                stderr = e.stderr or ""
+            except (ExifToolNotRunning, BrokenPipeError):
+                raise
+            except Exception as e:
+                logger.error(f"Error saving EXIF to {len(file_paths)} files: {e}")
+                return {file_path: None for file_path in file_paths}
+            finally:
+                os.remove(argfile.name)
+
+            failed = self._files_with_errors(stderr, file_paths)
+            if failed is None:
+                logger.error(f"Unmatched exiftool errors, treating {len(file_paths)} files as not saved: {stderr}")
+                return {file_path: None for file_path in file_paths}
+            for file_path in failed:
+                logger.error(f'Error saving EXIF to "{file_path}"')
+            logger.info(f"Saved EXIF to {len(file_paths) - len(failed)} files: {tags}")
+            # exiftool always writes a complete new copy of each file
+            return {
+                file_path: None if file_path in failed else SAVE_MODE_REWRITTEN
+                for file_path in file_paths
+            }
+        return operation
+    
+    @staticmethod
+    def _files_with_errors(stderr: str, file_paths: List[str]) -> Optional[set[str]]:
+        """
+        Returns the files named in exiftool "Error: <message> - <file>" lines.
+
+        Paths are compared normalized, as exiftool may print them with other separators
+        or case. Returns None if an error line names none of the files, so which files
+        were saved is unknown.
+        """
+        by_path = {normalize_path(file_path): file_path for file_path in file_paths}
+        failed = set()
+        for line in stderr.splitlines():
+            if not line.startswith("Error"):
+                continue
+            named = None
+            # The message or the path may contain " - " too, so try every split
+            for start in (i + 3 for i in range(len(line)) if line.startswith(" - ", i)):
+                named = by_path.get(normalize_path(line[start:]))
+                if named is not None:
+                    break
+            if named is None:
+                return None
+            failed.add(named)
+        return failed
+    
+    def _load_exif_future(
+        self,
+        file_path: str,
+        profile: str,
+        signature: Optional[FileSignature] = None,
+        remember: bool = False,
+    ) -> Future:
+        """Queues a read of one file on its worker, caching the result if ``remember`` is set."""
+        def operation(et: exiftool.ExifToolHelper) -> Optional[Dict[str, Any]]:
+            try:
+                exif_data = self._read_metadata(et, file_path, profile)[0]
+                logger.info(f'Loaded {profile} EXIF for "{file_path}"')
+                return exif_data
+            except (ExifToolNotRunning, BrokenPipeError):
+                raise
+            except Exception as e:
+                logger.error(f'Error loading EXIF for "{file_path}": {e}')
+                return None
+        worker = self._worker_for(file_path)
+        def task() -> Optional[Dict[str, Any]]:
+            exif_data = self._native_read(file_path) if profile == READ_PROFILE_FORM else None
+            if exif_data is None:
+                exif_data = worker.execute(operation)
+            exif_data = self._merge_sidecar(file_path, exif_data)
+            # Cached before the future completes, so a caller never sees a stale cache
+            if remember and exif_data is not None:
+                self._remember([(file_path, signature, exif_data)], profile)
+            return exif_data
+        return worker.call(task)
+    
+    def _save_exif_future(self, file_path: str, tags: Dict[str, str]) -> Future:
+        """Queues a write of one file on its worker."""
+        def operation(et: exiftool.ExifToolHelper) -> Optional[str]:
+            try:
                 et.set_tags(file_path, tags=tags, params=["-overwrite_original"])
-            logger.info(f'Saved EXIF to file: {tags}')
-            return True
-        except FileNotFoundError:
-            raise ExifToolNotFound
-        except Exception as e:
-            logger.error(f'Error saving EXIF to "{file_path}": {e}')
-            return False
+                logger.info(f'Saved EXIF to file: {tags}')
+                return SAVE_MODE_REWRITTEN
+            except (ExifToolNotRunning, BrokenPipeError):
+                raise
+            except Exception as e:
+                logger.error(f'Error saving EXIF to "{file_path}": {e}')
+                return None
+        worker = self._worker_for(file_path)
+        def task() -> Optional[str]:
+            if self.uses_sidecars:
+                return self._sidecar_write(file_path, tags)
+            return self._write_verified(
+                [file_path],
+                lambda: {file_path: self._native_write(file_path, tags) or worker.execute(operation)},
+            )[file_path]
+        return worker.call(task)
     
     def format_exif_for_display(self, exif_data: Dict[str, Any]) -> Dict[str, list]:
         """Format EXIF data for display in the tree widget."""
@@ -0,0 +1,175 @@
+"""The list model behind the file list of the Timestamper application."""
+
+from os import path
+from typing import Any, Dict, List, Optional
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QPersistentModelIndex, Qt
+from PySide6.QtGui import QIcon, QPixmap
+
+from .constants import DONE_ICON, ERROR_ICON, MISMATCH_ICON, PENDING_ICON
+
+PATH_ROLE = Qt.UserRole
+DONE_ROLE = Qt.UserRole + 1
+
+# Row state markers, stored per row as an index into this tuple
+MARKERS = ("", PENDING_ICON, DONE_ICON, ERROR_ICON, MISMATCH_ICON)
+MISMATCH_TOOLTIP = "The image data changed while saving; check this file"
+
+
+class FileListModel(QAbstractListModel):
+    """
+    A list of image files over a compact table: one path string and a few bytes per row.
+
+    Display names and tooltips are derived on demand, and thumbnails are only held for
+    the rows the view has asked for (the ones in or near the viewport); every other row
+    shows a shared placeholder icon. Memory therefore stays flat however many files are
+    loaded, and nothing per row is created until a row is painted.
+
+    Each thumbnail remembers the size tier it was decoded for. A row is only requested
+    again when the view needs a larger tier, so a grid-sized thumbnail is reused, scaled
+    down by the view, when switching back to the list.
+    """
+
+    def __init__(self, placeholder: QIcon, parent=None):
+        """Initializes an empty model; rows without a thumbnail show ``placeholder``."""
+        super().__init__(parent)
+        self.placeholder = placeholder
+        self._paths: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._markers = bytearray()
+        self._done = bytearray()
+        # Only rows near the viewport have an entry in these
+        self._thumbnails: Dict[int, tuple[int, QPixmap]] = {}  # Row -> (tier, thumbnail)
+        self._requested: Dict[int, int] = {}  # Row -> tier being decoded
+
+    def set_files(self, file_paths: List[str]) -> None:
+        """Replaces the rows with the given files, in order."""
+        self.beginResetModel()
+        self._paths = list(file_paths)
+        self._rows = {file_path: row for row, file_path in enumerate(self._paths)}
+        self._markers = bytearray(len(self._paths))
+        self._done = bytearray(len(self._paths))
+        self._thumbnails = {}
+        self._requested = {}
+        self.endResetModel()
+
+    def append_files(self, file_paths: List[str]) -> None:
+        """Adds rows for files at the end of the list, skipping files already in it."""
+        new_paths = [file_path for file_path in dict.fromkeys(file_paths) if file_path not in self._rows]
+        if not new_paths:
+            return
+        first = len(self._paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_paths) - 1)
+        self._paths.extend(new_paths)  # In place, so work queued for the existing rows stays valid
+        self._rows.update((file_path, first + i) for i, file_path in enumerate(new_paths))
+        self._markers += bytearray(len(new_paths))
+        self._done += bytearray(len(new_paths))
+        self.endInsertRows()
+
+    def sort_files(self) -> Dict[int, int]:
+        """
+        Sorts the rows by path, keeping each file's state marker and the selection.
+
+        Thumbnails are held by row, so they are dropped and requested again. The file
+        table is replaced, so work queued for the old rows is recognised as stale.
+
+        Returns:
+            The new row of every old row, or an empty mapping if no row moved.
+        """
+        order = sorted(range(len(self._paths)), key=self._paths.__getitem__)
+        if all(row == new_row for new_row, row in enumerate(order)):
+            return {}
+        self.layoutAboutToBeChanged.emit()
+        new_rows = {row: new_row for new_row, row in enumerate(order)}
+        self._paths = [self._paths[row] for row in order]
+        self._rows = {file_path: row for row, file_path in enumerate(self._paths)}
+        self._markers = bytearray(self._markers[row] for row in order)
+        self._done = bytearray(self._done[row] for row in order)
+        self._thumbnails = {}
+        self._requested = {}
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(persistent, [self.index(new_rows[index.row()]) for index in persistent])
+        self.layoutChanged.emit()
+        return new_rows
+
+    @property
+    def files(self) -> List[str]:
+        """Returns the file table; it is replaced when the files are set or sorted, and only grows when files are appended."""
+        return self._paths
+
+    def file_path(self, row: int) -> Optional[str]:
+        """Returns the file of a row, or None if there is no such row."""
+        return self._paths[row] if 0 <= row < len(self._paths) else None
+
+    def row_of(self, file_path: str) -> Optional[int]:
+        """Returns the row of a file, or None if it is not in the list."""
+        return self._rows.get(file_path)
+
+    def set_marker(self, row: int, marker: str) -> None:
+        """Shows a state marker (one of MARKERS) in front of a row's file name."""
+        self._markers[row] = MARKERS.index(marker)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.ToolTipRole])
+
+    def set_done(self, row: int, done: bool) -> None:
+        """Records whether a row has been saved."""
+        self._done[row] = done
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [DONE_ROLE])
+
+    def take_thumbnail_requests(self, first: int, last: int, tier: int = 0) -> List[int]:
+        """
+        Returns the rows between ``first`` and ``last`` with no thumbnail of at least
+        ``tier`` yet, held or requested, and marks them requested at ``tier``.
+        """
+        rows = [
+            row for row in range(max(first, 0), min(last, len(self._paths) - 1) + 1)
+            if max(self._thumbnails.get(row, (-1,))[0], self._requested.get(row, -1)) < tier
+        ]
+        self._requested.update(dict.fromkeys(rows, tier))
+        return rows
+
+    def set_thumbnail(self, row: int, pixmap: QPixmap, tier: int = 0) -> None:
+        """Shows a thumbnail decoded for ``tier``, unless the row already has a larger one."""
+        if self._requested.get(row, -1) <= tier:
+            self._requested.pop(row, None)
+        if self._thumbnails.get(row, (-1,))[0] > tier:
+            return
+        self._thumbnails[row] = (tier, pixmap)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def has_thumbnail(self, row: int) -> bool:
+        """Returns whether a row currently holds a decoded thumbnail."""
+        return row in self._thumbnails
+
+    def release_thumbnails(self, first: int, last: int) -> None:
+        """
+        Drops the thumbnails of the rows outside ``first``..``last`` and forgets requests
+        for them, so they are requested again when they come back into view.
+        """
+        for row in [row for row in self._thumbnails if not first <= row <= last]:
+            del self._thumbnails[row]
+        self._requested = {row: tier for row, tier in self._requested.items() if first <= row <= last}
+
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        """Returns the number of files; the list has no children."""
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = Qt.DisplayRole) -> Any:
+        """Returns the file name with its state marker, the thumbnail, or the path of a row."""
+        if not index.isValid() or not 0 <= index.row() < len(self._paths):
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return MARKERS[self._markers[row]] + path.basename(self._paths[row])
+        if role == Qt.DecorationRole:
+            thumbnail = self._thumbnails.get(row)
+            return self.placeholder if thumbnail is None else thumbnail[1]
+        if role == Qt.ToolTipRole:
+            return MISMATCH_TOOLTIP if MARKERS[self._markers[row]] == MISMATCH_ICON else None
+        if role == PATH_ROLE:
+            return self._paths[row]
+        if role == DONE_ROLE:
+            return bool(self._done[row])
+        return None
@@ -0,0 +1,93 @@
+"""Recursive searching of files and folders for images, streamed in batches."""
+
+import logging
+import os
+import time
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from .constants import IMAGE_EXTENSIONS, SCAN_BATCH_INTERVAL_MS, SCAN_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+_Entry = Tuple[str, bool]  # (path, is a folder)
+
+
+def is_image_file(file_path: str) -> bool:
+    """Checks whether a path has one of the image extensions the application opens."""
+    return file_path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def scan_images(
+    paths: Iterable[str],
+    is_cancelled: Callable[[], bool] = lambda: False,
+    batch_size: int = SCAN_BATCH_SIZE,
+    batch_interval_ms: int = SCAN_BATCH_INTERVAL_MS,
+) -> Iterator[Tuple[List[str], int]]:
+    """
+    Yields the images among files and folders, searching the folders recursively.
+
+    Images are yielded in batches of up to ``batch_size``, and at least every
+    ``batch_interval_ms`` while any have been found, so the first files of a huge
+    folder tree arrive within milliseconds. Each folder is listed once with
+    os.scandir, whose entries already know whether they are folders. Hidden entries
+    (such as macOS "._" resource files) and symlinked folders are skipped.
+
+    Folders are walked depth-first in sorted order, so when ``paths`` share a parent
+    the images come out in the same order as sorting all of their paths.
+
+    Args:
+        paths: Files and folders to search; files without an image extension are skipped.
+        is_cancelled: Checked between entries; the scan stops once it returns True.
+        batch_size: The most images in one batch.
+        batch_interval_ms: The longest time images are held back before being yielded.
+
+    Yields:
+        (images, folders scanned so far). The last batch is yielded even if it is empty,
+        so the caller learns the final folder count, unless the scan was cancelled.
+    """
+    roots = [(file_path, os.path.isdir(file_path)) for file_path in paths]
+    stack: List[Iterator[_Entry]] = [iter(sorted(roots, key=_sort_key))]
+    batch: List[str] = []
+    seen = set()
+    folders = 0
+    last_yield = time.monotonic()
+    while stack:
+        if is_cancelled():
+            return
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        file_path, is_folder = entry
+        if is_folder:
+            folders += 1
+            stack.append(iter(_list_folder(file_path)))
+        elif is_image_file(file_path) and file_path not in seen:
+            seen.add(file_path)
+            batch.append(file_path)
+        if batch and (len(batch) >= batch_size or (time.monotonic() - last_yield) * 1000 >= batch_interval_ms):
+            yield batch, folders
+            batch = []
+            last_yield = time.monotonic()
+    yield batch, folders
+
+
+def _list_folder(folder: str) -> List[_Entry]:
+    """Returns the visible entries of a folder, sorted; unreadable folders are logged and skipped."""
+    try:
+        with os.scandir(folder) as entries:
+            listing = [
+                (entry.path, entry.is_dir(follow_symlinks=False))
+                for entry in entries if not entry.name.startswith(".")
+            ]
+    except OSError as e:
+        logger.warning(f'Could not scan folder "{folder}": {e}')
+        return []
+    listing.sort(key=_sort_key)
+    return listing
+
+
+def _sort_key(entry: _Entry) -> str:
+    """Orders a folder before its siblings exactly where the paths inside it sort."""
+    file_path, is_folder = entry
+    return file_path + os.sep if is_folder else file_path
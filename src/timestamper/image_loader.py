@@ -0,0 +1,205 @@
+"""Decoding of images for thumbnails and previews in the Timestamper application.
+
+Images are decoded from the cheapest source that is still big enough: an embedded
+JPEG preview, a reduced-resolution TIFF page, a JPEG decoded at 1/2, 1/4 or 1/8
+scale, an 8-bit uncompressed TIFF read one row and column in every few, or any other
+8- or 16-bit TIFF averaged block by block as it is streamed. Only a full decode of a
+format with none of these falls back to decoding at full resolution.
+"""
+
+import logging
+import mmap
+from typing import Optional
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QSize, Qt
+from PySide6.QtGui import QImage, QImageIOHandler, QImageReader, QTransform
+
+from . import native_exif, tiff_decoder
+from .constants import TIFF_DECODE_MAX_BYTES
+from .native_exif import NativeExifUnsupported, TiffPage
+
+logger = logging.getLogger(__name__)
+
+# Embedded previews and reduced pages whose aspect ratio differs more than this from the
+# main image are letterboxed or cropped, so they are not used
+ASPECT_RATIO_TOLERANCE = 0.02
+
+_SUBSAMPLED_FORMATS = {
+    (1, 1): QImage.Format.Format_Grayscale8,  # BlackIsZero
+    (2, 3): QImage.Format.Format_RGB888,
+    (2, 4): QImage.Format.Format_RGBA8888,
+}
+
+
+def load_scaled_image(file_path: str, size: QSize) -> QImage:
+    """
+    Decodes an image scaled to fit within ``size``, never scaling it up.
+
+    The image is oriented as its EXIF Orientation tag says. Uses QImage rather than
+    QPixmap, so it is safe to call off the GUI thread.
+
+    Returns:
+        The scaled image, or a null QImage if the file cannot be decoded.
+    """
+    reader = QImageReader(file_path)
+    reader.setAutoTransform(True)
+    full_size = reader.size()
+    if not full_size.isValid():
+        logger.debug(f'Could not decode "{file_path}": {reader.errorString()}')
+        return QImage()
+    transformation = reader.transformation()
+    stored_size = size  # The bounds in the orientation the pixels are stored in
+    if transformation & QImageIOHandler.Transformation.TransformationRotate90:
+        stored_size = size.transposed()
+    target = full_size.scaled(stored_size, Qt.AspectRatioMode.KeepAspectRatio).boundedTo(full_size)
+
+    image = _load_embedded_jpeg(file_path, full_size, target)
+    if image is None:
+        image = _load_reduced_tiff(file_path, full_size, target)
+    if image is not None:
+        return _fit(_transform(image, transformation), size)
+
+    if reader.supportsOption(QImageIOHandler.ImageOption.ScaledSize):
+        reader.setScaledSize(target)  # JPEG decodes at 1/2, 1/4 or 1/8 scale
+    image = reader.read()
+    if image.isNull():
+        logger.debug(f'Could not decode "{file_path}": {reader.errorString()}')
+        return image
+    return _fit(image, size)
+
+
+def _fit(image: QImage, size: QSize) -> QImage:
+    """Scales an image down to fit within ``size``."""
+    if image.width() <= size.width() and image.height() <= size.height():
+        return image
+    return image.scaled(size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+
+def _covers(candidate: QSize, full_size: QSize, target: QSize) -> bool:
+    """Checks that a reduced image has the main image's shape and is at least ``target``."""
+    if candidate.width() < target.width() or candidate.height() < target.height():
+        return False
+    ratio = candidate.width() * full_size.height() / (candidate.height() * full_size.width())
+    return abs(ratio - 1) <= ASPECT_RATIO_TOLERANCE
+
+
+def _transform(image: QImage, transformation) -> QImage:
+    """Applies an orientation the way QImageReader's auto-transform does."""
+    mirror = bool(transformation & QImageIOHandler.Transformation.TransformationMirror)
+    flip = bool(transformation & QImageIOHandler.Transformation.TransformationFlip)
+    if mirror or flip:
+        image = image.transformed(QTransform().scale(-1 if mirror else 1, -1 if flip else 1))
+    if transformation & QImageIOHandler.Transformation.TransformationRotate90:
+        image = image.transformed(QTransform().rotate(90))
+    return image
+
+
+def _load_embedded_jpeg(file_path: str, full_size: QSize, target: QSize) -> Optional[QImage]:
+    """Decodes the smallest embedded JPEG preview that covers ``target``, if there is one."""
+    try:
+        ranges = native_exif.embedded_jpegs(file_path)
+    except (NativeExifUnsupported, OSError, ValueError, IndexError):
+        return None
+    if not ranges:
+        return None
+    best = None
+    with open(file_path, "rb") as f:
+        for offset, length in ranges:
+            f.seek(offset)
+            data = QByteArray(f.read(length))
+            buffer = QBuffer(data)
+            buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+            reader = QImageReader(buffer, b"jpeg")
+            reader.setAutoTransform(False)  # The main image's orientation applies
+            preview_size = reader.size()
+            if not preview_size.isValid() or not _covers(preview_size, full_size, target):
+                continue
+            if best is None or preview_size.width() < best[1].width():
+                best = (data, preview_size)
+    if best is None:
+        return None
+    buffer = QBuffer(best[0])
+    buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buffer, b"jpeg")
+    reader.setAutoTransform(False)
+    reader.setScaledSize(best[1].scaled(target, Qt.AspectRatioMode.KeepAspectRatio).boundedTo(best[1]))
+    image = reader.read()
+    return None if image.isNull() else image
+
+
+def _load_reduced_tiff(file_path: str, full_size: QSize, target: QSize) -> Optional[QImage]:
+    """
+    Decodes a TIFF file from its smallest reduced-resolution page that covers ``target``,
+    or reduces the first page while streaming it, without decoding it at full size.
+
+    Only pages flagged as reduced images and smaller than the first page count, so the
+    later frames of a multi-page file are never shown in place of the first.
+    """
+    try:
+        pages = native_exif.tiff_pages(file_path)
+    except (NativeExifUnsupported, OSError, ValueError, IndexError):
+        return None
+    candidates = [
+        (page.width, index) for index, page in enumerate(pages)
+        if index > 0 and page.reduces(pages[0]) and _covers(QSize(page.width, page.height), full_size, target)
+    ]
+    if candidates:
+        _, index = min(candidates)
+        page_reader = QImageReader(file_path)
+        page_reader.setAutoTransform(False)  # Applied by the caller
+        if page_reader.jumpToImage(index):
+            image = page_reader.read()
+            if not image.isNull():
+                return image
+    if not pages:
+        return None
+    page = pages[0]
+    factor = min(page.width // max(target.width(), 1), page.height // max(target.height(), 1))
+    if factor <= 1:
+        return None  # Qt's own decoder is just as cheap
+    image = _subsample_tiff_page(file_path, page, target)
+    if image is None:
+        image = tiff_decoder.decode_reduced(file_path, page, factor, TIFF_DECODE_MAX_BYTES)
+    return image
+
+
+def _subsample_tiff_page(file_path: str, page: TiffPage, target: QSize) -> Optional[QImage]:
+    """
+    Reads every n-th row and column of an uncompressed, 8-bit, interleaved TIFF page.
+
+    Only the selected rows are touched, so the cost depends on the target size rather
+    than on the size of the file. Returns None for pages this cannot read.
+    """
+    image_format = _SUBSAMPLED_FORMATS.get((page.photometric, page.samples_per_pixel))
+    if (
+        image_format is None
+        or page.compression != 1
+        or page.planar_configuration != 1
+        or any(bits != 8 for bits in page.bits_per_sample)
+        or not page.strip_offsets
+        or len(page.strip_offsets) != len(page.strip_byte_counts)
+        or page.rows_per_strip <= 0
+    ):
+        return None
+    step = max(1, min(page.width // max(target.width(), 1), page.height // max(target.height(), 1)))
+    if step == 1:
+        return None  # Qt's own decoder is just as cheap
+    samples = page.samples_per_pixel
+    row_bytes = page.width * samples
+    width = (page.width + step - 1) // step
+    height = (page.height + step - 1) // step
+    data = bytearray(width * samples * height)
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for out_row, y in enumerate(range(0, page.height, step)):
+            strip, row_in_strip = divmod(y, page.rows_per_strip)
+            if strip >= len(page.strip_offsets):
+                return None
+            start = page.strip_offsets[strip] + row_in_strip * row_bytes
+            if row_in_strip * row_bytes + row_bytes > page.strip_byte_counts[strip] or start + row_bytes > len(mm):
+                return None
+            row = mm[start:start + row_bytes]
+            out = out_row * width * samples
+            for channel in range(samples):
+                data[out + channel:out + width * samples:samples] = row[channel::step * samples]
+    image = QImage(bytes(data), width, height, width * samples, image_format)
+    return image.copy()  # Detach from the Python buffer
@@ -1,11 +1,15 @@
 # This file is manually maintained. Do not overwrite.
-from PySide6.QtCore import Qt, QSettings, QDateTime, QSize
-from PySide6.QtGui import QAction, QPixmap, QKeySequence, QResizeEvent, QIcon
-from PySide6.QtWidgets import QMainWindow, QFileDialog, QTreeWidgetItem, QListWidgetItem, QMessageBox
+from PySide6.QtCore import Qt, QSettings, QDateTime, QSize, QThreadPool, QTimer
+from PySide6.QtGui import QAction, QPixmap, QKeySequence, QResizeEvent, QCloseEvent, QImage
+from PySide6.QtWidgets import QMainWindow, QFileDialog, QTreeWidgetItem, QMessageBox, QMenu
+from collections import Counter
+from concurrent.futures import Future, wait
+from functools import partial
 from datetime import datetime
 from os import path
 import logging
-from typing import Dict, Tuple, Any
+import os
+from typing import Callable, Dict, Tuple, Any, Optional
 
 from .constants import (
     NULL_PRESET_NAME,
@@ -16,13 +20,44 @@ from .constants import (
     EXIF_OFFSET_TIME,
     EXIF_OFFSET_TIME_ORIGINAL,
     EXIF_SHUTTER_SPEED,
-    DONE_ICON
+    DONE_ICON,
+    ERROR_ICON,
+    MISMATCH_ICON,
+    PENDING_ICON,
+    METADATA_CACHE_MAX_BYTES,
+    METADATA_INDEX_FILENAME,
+    UNDO_JOURNAL_FILENAME,
+    THUMBNAIL_CACHE_FILENAME,
+    THUMBNAIL_CACHE_MAX_BYTES,
+    THUMBNAIL_KEEP_ROWS,
+    THUMBNAIL_PREFETCH_ROWS,
+    THUMBNAIL_SIZE_TIERS,
+    THUMBNAIL_BATCH_SIZE,
+    THUMBNAIL_MEMORY_MAX_BYTES,
+    IMAGE_PREVIEW_MAX_WIDTH,
+    IMAGE_PREVIEW_MAX_HEIGHT,
+    PREVIEW_CACHE_MAX_BYTES,
+    PREVIEW_LOAD_PRIORITY,
+    PREVIEW_RESIZE_SETTLE_MS,
+    PREFETCH_AHEAD_FILES,
+    READ_PROFILE_FORM,
+    READ_PROFILE_FULL,
+    SAVE_MODE_PAYLOAD_CHANGED,
+    SAVE_TARGET_EMBEDDED
 )
 from .preset_manager import PresetManager
 from .ui_manager import UIManager
-from .exif_manager import ExifManager, ExifToolNotFound
-from .utils import validate_numeric_input, validate_exposure_time_input, float_to_shutterspeed, parse_lensinfo
+from .exif_manager import ExifManager, ExifToolNotFound, default_worker_count
+from .utils import validate_numeric_input, validate_exposure_time_input, float_to_shutterspeed, parse_lensinfo, setting_to_bool
 from .settings_dialog import SettingsDialog
+from .workers import (
+    FolderScanner, FutureBridge, MetadataPreloader, Prefetcher, PreviewLoader, ThumbnailLoader,
+    ThumbnailLoaderSignals
+)
+from .thumbnail_cache import open_thumbnail_cache
+from .undo_journal import open_undo_journal, remove_stale_journals
+from .decode_pool import DecodePool, default_decode_workers
+from .preview_cache import PreviewCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -39,9 +74,43 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Timestamper")
         self.settings = QSettings("Test", "Timestamper")
 
+        # Background work (metadata preloading) runs on this pool
+        self.thread_pool = QThreadPool(self)
+        self._metadata_preloader = None
+        self._folder_scanner = None  # Streams the images of opened or dropped folders into the list
+        self._scan_replaced_list = False  # Whether the running scan has replaced the list yet
+        # Metadata reads in flight for the current file, by read profile
+        self._future_bridge = FutureBridge(self)
+        self._exif_requests: Dict[str, Future] = {}
+        # Saves queued in the background; closing the window waits for them
+        self._pending_saves: set[Future] = set()
+        # Thumbnails are decoded on the thread pool for the rows near the viewport
+        self._thumbnail_signals = ThumbnailLoaderSignals(self)
+        self._thumbnail_signals.loaded.connect(self._on_thumbnail_loaded)
+        self._thumbnail_window = (0, -1)  # Rows whose thumbnails are kept
+        self._thumbnail_tier_shown = THUMBNAIL_SIZE_TIERS[0]  # Size tier of the thumbnails requested last
+        self._preload_window = (0, -1)  # Rows whose metadata was last preloaded
+        # Decoded previews; resizing rescales the current one from memory
+        self.preview_cache = PreviewCache(PREVIEW_CACHE_MAX_BYTES)
+        self._preview_image = QImage()
+        self._preview_loader = None  # Decodes the current preview when it is not cached
+        self._preview_resize_timer = QTimer(self)
+        self._preview_resize_timer.setSingleShot(True)
+        self._preview_resize_timer.setInterval(PREVIEW_RESIZE_SETTLE_MS)
+        self._preview_resize_timer.timeout.connect(self._show_preview)
+        # Warms the caches for the files likely to be opened next
+        self._prefetcher = None
+
         # Initialize managers
         self.ui_manager = UIManager(self)
+        # Owned here rather than by the ExifManager, so changing settings keeps the undo history
+        journal_path = self._settings_data_path(UNDO_JOURNAL_FILENAME.format(pid=os.getpid()))
+        if journal_path:
+            remove_stale_journals(path.dirname(journal_path), UNDO_JOURNAL_FILENAME)
+        self.undo_journal = open_undo_journal(journal_path)
         self._init_exif_manager()
+        self._init_thumbnail_cache()
+        self._init_decode_pool()
 
         # Set up menu bar
         self._setup_menu_bar()
@@ -53,6 +122,8 @@ class MainWindow(QMainWindow):
         # Initialize preset managers
         self._setup_preset_managers()
 
+        self.set_grid_mode(self.action_grid_view.isChecked())
+
         self.statusBar().showMessage("Ready")
 
     def _setup_menu_bar(self) -> None:
@@ -66,12 +137,24 @@ class MainWindow(QMainWindow):
         action_save.setShortcut(QKeySequence.StandardKey.Save)
         action_save.triggered.connect(self.save)
 
+        self.action_undo_save = QAction("&Undo Last Save", self)
+        self.action_undo_save.setShortcut(QKeySequence.StandardKey.Undo)
+        self.action_undo_save.setStatusTip("Restore the values the most recent save replaced")
+        self.action_undo_save.triggered.connect(self.undo_last_save)
+
         button_clearpresets = QAction("Clear presets", self)
         button_clearpresets.triggered.connect(self.clear_presets)
 
         action_clear_fields = QAction("Clear Fields", self)
         action_clear_fields.triggered.connect(self.clear_fields)
 
+        self.action_grid_view = QAction("Thumbnail &Grid", self)
+        self.action_grid_view.setCheckable(True)
+        self.action_grid_view.setChecked(setting_to_bool(self.settings.value("grid_view", False)))
+        self.action_grid_view.setShortcut(QKeySequence("Ctrl+G"))
+        self.action_grid_view.setStatusTip("Show the files as a grid of large thumbnails")
+        self.action_grid_view.toggled.connect(self.set_grid_mode)
+
         action_settings = QAction("Settings...", self)
         action_settings.setShortcut(QKeySequence.StandardKey.Preferences)
         action_settings.triggered.connect(self.open_settings_dialog)
@@ -81,11 +164,18 @@ class MainWindow(QMainWindow):
         file_menu.setObjectName("File") # Add this line
         file_menu.addAction(self.button_loadfiles)
         file_menu.addAction(action_save)
+        file_menu.addAction(self.action_undo_save)
+        file_menu.aboutToShow.connect(
+            lambda: self.action_undo_save.setEnabled(bool(self.exif_manager and self.exif_manager.can_undo))
+        )
         file_menu.addAction(action_clear_fields)
         file_menu.addAction(button_clearpresets)
         file_menu.addSeparator()
         file_menu.addAction(action_settings)
 
+        view_menu = menu.addMenu("View")
+        view_menu.addAction(self.action_grid_view)
+
     def _setup_preset_managers(self) -> None:
         """Initialize the preset managers for cameras and lenses."""
         self.camera_fields = {
@@ -153,22 +243,71 @@ class MainWindow(QMainWindow):
         file_dialog.setFileMode(QFileDialog.FileMode.AnyFile)
         
         if file_dialog.exec():
-            selected_paths = file_dialog.selectedFiles()
-            selected_files = []
-            import os
-            for p in selected_paths:
-                if os.path.isdir(p):
-                    for file in os.listdir(p):
-                        if file.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')):
-                            selected_files.append(os.path.join(p, file))
-                else:
-                    if p.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')):
-                        selected_files.append(p)
-            self.load_files(selected_files)
+            self.open_paths(file_dialog.selectedFiles())
 
     def onFilesDropped(self, files: list[str]) -> None:
-        """Handles files dropped onto the file list."""
-        self.load_files(files)
+        """Handles files and folders dropped onto the file list."""
+        self.open_paths(files)
+
+    def open_paths(self, paths: list[str]) -> None:
+        """
+        Replaces the file list with the images among ``paths``, searching folders recursively.
+
+        The folders are scanned in the background and the images are added in batches as
+        they are found, so the first ones can be viewed while a large archive is scanned.
+        """
+        self._cancel_folder_scan()
+        scanner = FolderScanner(paths)
+        scanner.signals.found.connect(partial(self._on_scan_found, scanner))
+        scanner.signals.progress.connect(partial(self._on_scan_progress, scanner))
+        scanner.signals.finished.connect(partial(self._on_scan_finished, scanner))
+        self._folder_scanner = scanner
+        self._scan_replaced_list = False
+        self.thread_pool.start(scanner)
+
+    def _cancel_folder_scan(self) -> None:
+        """Stops any folder scan that is still running."""
+        if self._folder_scanner:
+            self._folder_scanner.cancel()
+            self._folder_scanner = None
+
+    def _on_scan_found(self, scanner: FolderScanner, files: list[str]) -> None:
+        """Adds a batch of found images; the first batch replaces the list, which is sorted once the scan finishes."""
+        if scanner is not self._folder_scanner:
+            return  # A scan that has since been cancelled or replaced
+        if not self._scan_replaced_list:
+            self._scan_replaced_list = True
+            self.load_files(files)
+        else:
+            self.append_files(files)
+
+    def _on_scan_progress(self, scanner: FolderScanner, found: int, folders: int) -> None:
+        """Shows how far the folder scan has got."""
+        if scanner is self._folder_scanner:
+            self.statusBar().showMessage(f"Scanning: {found} images found in {folders} folders")
+
+    def _on_scan_finished(self, scanner: FolderScanner, found: int, folders: int) -> None:
+        """Reports the result of a completed folder scan."""
+        if scanner is not self._folder_scanner:
+            return
+        self._folder_scanner = None
+        # Batches arrive in the order the paths were walked; settle on the order load_files uses
+        new_rows = self.file_model.sort_files() if self._scan_replaced_list else {}
+        if new_rows:
+            self._move_row_states(new_rows)
+            self._preload_window = (0, -1)
+            self.on_visible_rows_changed(*(self.file_list.visibleRows() or (0, 0)))
+        if found:
+            self.statusBar().showMessage(f"Loaded {found} images", 3000)
+        else:
+            self.statusBar().showMessage("No images found.", 3000)
+
+    def _move_row_states(self, new_rows: Dict[int, int]) -> None:
+        """Carries the save state of each row over to the row its file moved to."""
+        self.files_done = [new_rows[row] for row in self.files_done]
+        self.files_pending = {new_rows[row]: count for row, count in self.files_pending.items()}
+        self.files_failed = {new_rows[row]: tags for row, tags in self.files_failed.items()}
+        self.files_mismatched = {new_rows[row] for row in self.files_mismatched}
 
     def load_files(self, files: list[str]) -> None:
         """Loads a list of files into the file list as thumbnails."""
@@ -176,89 +315,332 @@ class MainWindow(QMainWindow):
             return
 
         self.files_done = []
-        self.file_list.clear()
-        
-        for file_path in sorted(files):
-            pixmap = QPixmap(file_path)
-            icon = QIcon(pixmap)
-            item = QListWidgetItem(icon, path.basename(file_path))
-            item.setData(Qt.UserRole, file_path)  # Store full path
-            item.setData(Qt.UserRole + 1, False) # Initialize 'done' status to False
-            self.file_list.addItem(item)
+        self.files_pending = {}
+        self.files_failed = {}
+        self.files_mismatched = set()
+        self._cancel_thumbnail_loads()
+        self._cancel_metadata_preload()
+        self._cancel_prefetch()
+        self.file_model.set_files(sorted(files))
+
+        # The view reports the rows it shows once it is laid out; start with the top
+        self.on_visible_rows_changed(0, 0)
 
         if self.file_list.count() > 0:
             self.file_list.setCurrentRow(0)
         self.file_list.setFocus()
 
+    def append_files(self, files: list[str]) -> None:
+        """Adds files to the end of the file list, keeping the files already loaded and their state."""
+        first_new = self.file_list.count()
+        self.file_model.append_files(files)
+        if first_new <= self._preload_window[1]:
+            self._preload_window = (0, -1)  # The preloaded window gained rows; read them too
+        if first_new == 0 and self.file_list.count() > 0:
+            self.file_list.setCurrentRow(0)
+
+    def set_grid_mode(self, grid: bool) -> None:
+        """Shows the files as a grid of large thumbnails or as a list; thumbnails already decoded are kept."""
+        self.settings.setValue("grid_view", grid)
+        if self.action_grid_view.isChecked() != grid:
+            self.action_grid_view.setChecked(grid)
+        self.thumbnail_size_slider.setVisible(grid)
+        self.file_list.setGridMode(grid, self.thumbnail_size_slider.value())
+
+    def set_grid_icon_size(self, size: int) -> None:
+        """Resizes the thumbnails of the grid view."""
+        self.settings.setValue("grid_icon_size", size)
+        if self.file_list.isGridMode():
+            self.file_list.setGridMode(True, size)
+
+    def _thumbnail_tier(self) -> int:
+        """Returns the size tier that thumbnails are decoded at for the current icon size."""
+        needed = self.file_list.iconSize().width() * self.devicePixelRatio()
+        return next((tier for tier in THUMBNAIL_SIZE_TIERS if tier >= needed), THUMBNAIL_SIZE_TIERS[-1])
+
+    def on_visible_rows_changed(self, first: int, last: int) -> None:
+        """Loads thumbnails and metadata for the rows in and near the viewport only."""
+        tier = self._thumbnail_tier_shown = self._thumbnail_tier()
+        # Larger thumbnails are kept for fewer rows, and a full grid prefetches a screenful
+        keep = max(min(THUMBNAIL_KEEP_ROWS, THUMBNAIL_MEMORY_MAX_BYTES // (tier * tier * 4) // 2), last - first + 1)
+        prefetch = min(keep, max(THUMBNAIL_PREFETCH_ROWS, last - first + 1))
+        self._thumbnail_window = (first - keep, last + keep)
+        self.file_model.release_thumbnails(*self._thumbnail_window)
+        rows = self.file_model.take_thumbnail_requests(first - prefetch, last + prefetch, tier)
+        # Visible rows first, then outwards from the viewport
+        rows.sort(key=lambda row: max(first - row, row - last, 0))
+        self._start_thumbnail_loads(rows, tier)
+
+        window = (max(first - THUMBNAIL_PREFETCH_ROWS, 0), last + THUMBNAIL_PREFETCH_ROWS)
+        if window != self._preload_window:
+            self._preload_window = window
+            self._start_metadata_preload(self.file_model.files[window[0]:window[1] + 1])
+
+    def _start_thumbnail_loads(self, rows: list[int], tier: int = THUMBNAIL_SIZE_TIERS[0]) -> None:
+        """
+        Queues the decoding of the thumbnails of some rows, in batches and in the given
+        order; each one replaces its placeholder. Batches of visible rows jump the queue.
+        """
+        files = self.file_model.files
+        larger_tiers = [t for t in THUMBNAIL_SIZE_TIERS if t > tier]
+        visible = self.file_list.visibleRows() or (0, -1)
+        for start in range(0, len(rows), THUMBNAIL_BATCH_SIZE):
+            batch = rows[start:start + THUMBNAIL_BATCH_SIZE]
+            jobs = [(files[row], partial(self._is_thumbnail_unwanted, files, row, tier)) for row in batch]
+            priority = 1 if any(visible[0] <= row <= visible[1] for row in batch) else 0
+            self.thread_pool.start(
+                ThumbnailLoader(
+                    jobs, tier, self._thumbnail_signals, self.thumbnail_cache, larger_tiers, self.decode_pool
+                ),
+                priority
+            )
+
+    def _is_thumbnail_unwanted(self, files: list[str], row: int, tier: int = THUMBNAIL_SIZE_TIERS[0]) -> bool:
+        """
+        Returns whether a queued thumbnail is for a replaced list, a row scrolled far away,
+        or is smaller than the thumbnails now shown.
+        """
+        first, last = self._thumbnail_window
+        return files is not self.file_model.files or not first <= row <= last or tier < self._thumbnail_tier_shown
+
+    def _cancel_thumbnail_loads(self) -> None:
+        """Skips the thumbnails not decoded yet."""
+        self._thumbnail_window = (0, -1)
+
+    def _on_thumbnail_loaded(self, file_path: str, image: QImage, tier: int = THUMBNAIL_SIZE_TIERS[0]) -> None:
+        """Swaps a decoded thumbnail into its row of the file list."""
+        row = self.file_model.row_of(file_path)
+        if row is None or not self._thumbnail_window[0] <= row <= self._thumbnail_window[1]:
+            return  # Decoded for a list that has since been replaced, or scrolled away
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(self.devicePixelRatio())
+        self.file_model.set_thumbnail(row, pixmap, tier)
+
+    def _start_metadata_preload(self, files: list[str]) -> None:
+        """Reads the metadata of all loaded files in the background."""
+        self._cancel_metadata_preload()
+        if not self.exif_manager:
+            return
+        preloader = MetadataPreloader(self.exif_manager, files)
+        preloader.signals.progress.connect(self._on_metadata_preload_progress)
+        self._metadata_preloader = preloader
+        self.thread_pool.start(preloader)
+
+    def _cancel_metadata_preload(self) -> None:
+        """Stops any metadata preload that is still running."""
+        if self._metadata_preloader:
+            self._metadata_preloader.cancel()
+            self._metadata_preloader = None
+
+    def _on_metadata_preload_progress(self, done: int, total: int) -> None:
+        """Shows the progress of the background metadata read."""
+        self.statusBar().showMessage(f"Reading metadata: {done}/{total} files", 3000)
+
     def on_file_selection_changed(self) -> None:
         """Handles the selection of a file from the list."""
-        selected_items = self.file_list.selectedItems()
-        if not selected_items:
+        selected_rows = self.file_list.selectedRows()
+        if not selected_rows:
             self.pic.setText("No picture selected.")
             self.current_path = None
+            self._preview_image = QImage()
+            self._preview_loader = None
+            self._cancel_prefetch()
             return
 
-        # Use the first selected item for display purposes
-        item = selected_items[0]
-        file_path = item.data(Qt.UserRole)
-        is_done = self.file_list.row(item) in self.files_done
-        
+        # Use the first selected row for display purposes
+        file_path, is_done = self._get_clean_path(selected_rows[0])
+
         self.current_path = file_path
 
         if not self.exif_manager:
             self.open_settings_dialog()
             return
 
-        self._load_exif_data()
-        self._update_exif_info_view()
+        self._load_exif_data(populate_form=self.amend_mode.isChecked() or is_done)
         self._update_image_preview()
+        self._start_prefetch(selected_rows[0])
 
-        if (self.amend_mode.isChecked() or is_done) and self.current_exif:
-            logger.info("Populating form with existing image EXIF")
-            self.populate_exif(self.current_exif)
+    def _prefetch_rows(self, row: int) -> list[int]:
+        """
+        Returns the rows likely to be opened after ``row``: the next ones not done yet, in
+        the order _advance_to_next_file visits them, then the previous row.
+        """
+        n_files = self.file_list.count()
+        rows = []
+        for i in range(1, n_files):
+            next_row = (row + i) % n_files
+            if next_row not in self.files_done and next_row not in self.files_pending:
+                rows.append(next_row)
+                if len(rows) == PREFETCH_AHEAD_FILES:
+                    break
+        if row > 0 and row - 1 not in rows:
+            rows.append(row - 1)
+        return rows
+
+    def _start_prefetch(self, row: int) -> None:
+        """Replaces the running prefetch with one for the files likely to follow ``row``."""
+        self._cancel_prefetch()
+        file_paths = [self.file_model.file_path(r) for r in self._prefetch_rows(row)]
+        if not file_paths:
+            return
+        self._prefetcher = Prefetcher(
+            file_paths,
+            self.exif_manager,
+            self.preview_cache,
+            self._preview_size(),
+            self.thumbnail_cache,
+            QSize(self._thumbnail_tier(), self._thumbnail_tier()),
+            self.decode_pool,
+        )
+        self.thread_pool.start(self._prefetcher)
+
+    def _cancel_prefetch(self) -> None:
+        """Stops prefetching for files the user has moved away from."""
+        if self._prefetcher:
+            self._prefetcher.cancel()
+            self._prefetcher = None
 
-    def _get_clean_path(self, item: QListWidgetItem) -> Tuple[str, bool]:
-        """Gets the clean path from a list item and checks if it's marked as done."""
-        file_path = item.data(Qt.UserRole)
-        is_done = self.file_list.row(item) in self.files_done
-        return file_path, is_done
+    def _get_clean_path(self, row: int) -> Tuple[str, bool]:
+        """Gets the path of a list row and checks if it's marked as done."""
+        return self.file_model.file_path(row), row in self.files_done
 
     def _init_exif_manager(self):
         """Initializes the ExifManager with the path from settings."""
+        if getattr(self, "exif_manager", None):
+            self.exif_manager.close()
         exiftool_path = self.settings.value("exiftool")
         if exiftool_path and path.isfile(exiftool_path):
+            num_workers = int(self.settings.value("exiftool_workers", default_worker_count()))
+            use_native = setting_to_bool(self.settings.value("native_exif", True))
+            cache_mb = int(self.settings.value("metadata_cache_mb", METADATA_CACHE_MAX_BYTES // (1024 * 1024)))
             try:
-                self.exif_manager = ExifManager(exiftool_path)
+                self.exif_manager = ExifManager(
+                    exiftool_path, num_workers, use_native,
+                    cache_bytes=cache_mb * 1024 * 1024,
+                    index_path=self._settings_data_path(METADATA_INDEX_FILENAME),
+                    save_target=self.settings.value("save_target", SAVE_TARGET_EMBEDDED),
+                    verify_payload=setting_to_bool(self.settings.value("verify_payload", False)),
+                    journal=self.undo_journal,
+                )
             except ExifToolNotFound:
                 self.exif_manager = None
         else:
             self.exif_manager = None
 
-    def _load_exif_data(self) -> None:
-        """Loads EXIF data for the current file."""
+    def _init_thumbnail_cache(self) -> None:
+        """Opens the on-disk thumbnail cache with the size from settings."""
+        if getattr(self, "thumbnail_cache", None) is not None:
+            self.thumbnail_cache.close()
+        cache_mb = int(self.settings.value("thumbnail_cache_mb", THUMBNAIL_CACHE_MAX_BYTES // (1024 * 1024)))
+        self.thumbnail_cache = open_thumbnail_cache(
+            self._settings_data_path(THUMBNAIL_CACHE_FILENAME), cache_mb * 1024 * 1024
+        )
+
+    def _init_decode_pool(self) -> None:
+        """Starts or stops the worker processes that decode images, as set in settings."""
+        if getattr(self, "decode_pool", None) is not None:
+            self.decode_pool.close()
+        self.decode_pool = None
+        if setting_to_bool(self.settings.value("process_decoding", False)):
+            self.decode_pool = DecodePool(default_decode_workers())
+
+    def _settings_data_path(self, filename: str) -> Optional[str]:
+        """Returns a data file kept next to the settings file, such as the metadata index."""
+        settings_file = self.settings.fileName()
+        if not settings_file:
+            return None
+        settings_dir = path.dirname(settings_file)
         try:
-            self.current_exif = self.exif_manager.load_exif_data(self.current_path)
-            if self.current_exif:
-                message = f'Opened EXIF for "{self.current_path}"'
+            os.makedirs(settings_dir, exist_ok=True)
+        except OSError as e:
+            logger.warning(f'Cannot create settings directory "{settings_dir}": {e}')
+        return path.join(settings_dir, filename)
+
+    def _request_exif_data(self, profile: str, callback: Callable[[str, Dict[str, Any] | None], None]) -> None:
+        """
+        Reads the current file's metadata without blocking the GUI.
+
+        A request still queued for a previously selected file is cancelled, so files the
+        user has moved past are never read. ``callback(file_path, exif_data)`` runs on the
+        GUI thread, immediately when the data is cached, and only if the file is still
+        the current one.
+        """
+        file_path = self.current_path
+        previous = self._exif_requests.pop(profile, None)
+        if previous is not None:
+            previous.cancel()
+        try:
+            future = self.exif_manager.submit_load(file_path, profile)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+        self._exif_requests[profile] = future
+
+        def on_done(done: Future) -> None:
+            if self._exif_requests.get(profile) is done:
+                del self._exif_requests[profile]
+            if file_path != self.current_path:
+                return
+            try:
+                exif_data = done.result()
+            except ExifToolNotFound:
+                self.open_settings_dialog()
+                exif_data = None
+            except Exception as e:
+                error_message = f'Error: Exiftool operation failed for "{file_path}". {e}'
+                logger.error(error_message)
+                self.statusBar().showMessage(error_message, 5000)
+                exif_data = None
+            callback(file_path, exif_data)
+
+        self._future_bridge.watch(future, on_done)
+
+    def _cancel_exif_requests(self) -> None:
+        """Cancels all metadata reads that have not started yet."""
+        for future in self._exif_requests.values():
+            future.cancel()
+        self._exif_requests.clear()
+
+    def _load_exif_data(self, populate_form: bool = False) -> None:
+        """Loads EXIF data for the current file, then fills the info view (and the form)."""
+        self.current_exif = None
+        self.info.clear()
+
+        def on_loaded(file_path: str, exif_data: Dict[str, Any] | None) -> None:
+            self.current_exif = exif_data
+            if exif_data:
+                message = f'Opened EXIF for "{file_path}"'
                 logger.info(message)
                 self.statusBar().showMessage(message, 3000)
-        except ExifToolNotFound:
-            self.open_settings_dialog()
-            self.current_exif = None
-        except Exception as e:
-            error_message = f'Error: Exiftool operation failed for "{self.current_path}". {e}'
-            logger.error(error_message)
-            self.statusBar().showMessage(error_message, 5000)
-            self.current_exif = None
+            self._update_exif_info_view()
+            if populate_form and exif_data:
+                logger.info("Populating form with existing image EXIF")
+                self.populate_exif(exif_data)
+
+        self._request_exif_data(READ_PROFILE_FORM, on_loaded)
 
     def _update_exif_info_view(self) -> None:
-        """Updates the EXIF info view with the current EXIF data."""
+        """Updates the EXIF info view with the full EXIF data of the current file.
+
+        The full metadata dump is only read while the info pane is visible; otherwise the
+        view is left empty and filled in when the pane is shown again.
+        """
+        self.info.clear()
+        self.exif_info_path = None
+        if not self.current_exif or not self._is_exif_info_visible():
+            return
+        self.exif_info_path = self.current_path
+        self._request_exif_data(READ_PROFILE_FULL, self._show_exif_info)
+
+    def _show_exif_info(self, file_path: str, full_exif: Dict[str, Any] | None) -> None:
+        """Fills the EXIF info view, falling back to the form tags if the full read failed."""
+        full_exif = full_exif or self.current_exif
         self.info.clear()
-        if not self.current_exif:
+        if not full_exif:
             return
 
         data = {}
-        for k, v in sorted(self.current_exif.items()):
+        for k, v in sorted(full_exif.items()):
             if ":" in k:
                 prefix, name = k.split(":")
                 if name in ["ShutterSpeedValue", "ExposureTime"]:
@@ -283,27 +665,87 @@ class MainWindow(QMainWindow):
         if items:
             self.info.topLevelItem(0).setExpanded(True)
 
+    def _is_exif_info_visible(self) -> bool:
+        """Returns whether the EXIF info pane is shown and not collapsed in the splitter."""
+        return not self.info_scroll.isHidden() and self.h_splitter.sizes()[2] > 0
+
+    def on_splitter_moved(self, pos: int, index: int) -> None:
+        """Fills the EXIF info view once the pane is expanded again."""
+        if self.current_exif and self.exif_info_path != self.current_path and self._is_exif_info_visible():
+            self._update_exif_info_view()
+
     def _update_image_preview(self) -> None:
-        """Updates the image preview with the current image."""
-        try:
-            pixmap = QPixmap(self.current_path)
-            if pixmap.isNull():
-                raise ValueError("Could not load image.")
-            self.pic.setPixmap(pixmap.scaled(
-                self.pic.size(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            ))
-        except Exception as e:
-            logger.error(f"Could not load image: {e}")
+        """
+        Shows the preview of the current image.
+
+        Cached previews are shown at once; others are decoded on the thread pool and
+        shown when ready, so the GUI never waits for a large image to decode.
+        """
+        image = self.preview_cache.get(self.current_path, size=self._preview_size())
+        if image is not None:
+            self._preview_loader = None
+            self._preview_image = image
+            self._show_preview()
+            return
+        self._preview_image = QImage()
+        self.pic.setText("Loading preview...")
+        loader = PreviewLoader(self.current_path, self._preview_size(), self.preview_cache, self.decode_pool)
+        loader.signals.finished.connect(partial(self._on_preview_loaded, loader))
+        self._preview_loader = loader
+        self.thread_pool.start(loader, PREVIEW_LOAD_PRIORITY)
+
+    def _on_preview_loaded(self, loader: PreviewLoader) -> None:
+        """Shows a decoded preview if its file is still the current one."""
+        if loader is not self._preview_loader or loader.file_path != self.current_path:
+            return  # The selection has moved on
+        self._preview_loader = None
+        if loader.image.isNull():
+            logger.error(f'Could not load image "{loader.file_path}"')
             self.pic.setText("No picture selected.")
-    
+            return
+        self._preview_image = loader.image
+        self._show_preview()
+
+    def _preview_size(self) -> QSize:
+        """Returns the size previews are decoded at: the largest the pane can show, so resizes rescale from memory."""
+        return QSize(IMAGE_PREVIEW_MAX_WIDTH, IMAGE_PREVIEW_MAX_HEIGHT) * self.devicePixelRatio()
+
+    def _show_preview(self, smooth: bool = True) -> None:
+        """Scales the decoded preview to the pane; a fast transform is used while resizing."""
+        if self._preview_image.isNull() or not self.current_path:
+            return
+        mode = Qt.TransformationMode.SmoothTransformation if smooth else Qt.TransformationMode.FastTransformation
+        self.pic.setPixmap(QPixmap.fromImage(self._preview_image.scaled(
+            self.pic.size(),
+            Qt.AspectRatioMode.KeepAspectRatio,
+            mode
+        )))
+
     def resizeEvent(self, event: QResizeEvent) -> None:
-        """Handles the window resize event to update the image preview."""
+        """Rescales the preview from memory, quickly now and smoothly once resizing pauses."""
         if self.current_path:
-            self._update_image_preview()
+            self._show_preview(smooth=False)
+            self._preview_resize_timer.start()
         super().resizeEvent(event)
 
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """Stops background work and shuts down the exiftool process when the window closes."""
+        self._cancel_folder_scan()
+        self._cancel_metadata_preload()
+        self._cancel_thumbnail_loads()
+        self._cancel_prefetch()
+        self._cancel_exif_requests()
+        self.flush_pending_saves()
+        self.thread_pool.waitForDone()
+        if self.exif_manager:
+            self.exif_manager.close()
+        self.undo_journal.close()
+        if self.thumbnail_cache is not None:
+            self.thumbnail_cache.close()
+        if self.decode_pool is not None:
+            self.decode_pool.close()
+        super().closeEvent(event)
+
     def adjust_datetime(self, d: int, h: int, m: int) -> None:
         """Adjusts the datetime by the given days, hours, and minutes."""
         new_dt = self.datetime.dateTime().addDays(d).addSecs(3600*h+60*m)
@@ -343,8 +785,8 @@ class MainWindow(QMainWindow):
 
     def save(self) -> None:
         """Saves the EXIF data to the selected file(s)."""
-        selected_items = self.file_list.selectedItems()
-        if not selected_items:
+        selected_rows = self.file_list.selectedRows()
+        if not selected_rows:
             self.statusBar().showMessage("No files selected.", 3000)
             return
 
@@ -353,14 +795,9 @@ class MainWindow(QMainWindow):
 
         tags_to_save = self._prepare_exif_tags()
         
-        saved_rows = []
-        for item in selected_items:
-            file_path, _ = self._get_clean_path(item)
-            if self._execute_save(file_path, tags_to_save):
-                saved_rows.append(self.file_list.row(item))
-
-        if saved_rows:
-            self._advance_to_next_file(saved_rows)
+        rows_by_path = {self._get_clean_path(row)[0]: row for row in selected_rows}
+        if self._queue_save(rows_by_path, tags_to_save):
+            self._advance_to_next_file(list(rows_by_path.values()))
 
     def _validate_all_numeric_inputs(self) -> bool:
         """Validates all numeric input fields."""
@@ -414,52 +851,180 @@ class MainWindow(QMainWindow):
         }
         return {k: v for k, v in tags.items() if v}
 
-    def _execute_save(self, file_path: str, tags: Dict[str, str]) -> bool:
-        """Executes the save operation using exiftool."""
+    def _queue_save(self, rows_by_path: Dict[str, int], tags: Dict[str, str]) -> bool:
+        """
+        Queues a save in the background and marks its rows as pending.
+
+        The row is flipped to done or to error once the write has been committed, so the
+        workflow can move on while the file is written.
+        """
         if not self.exif_manager:
             self.open_settings_dialog()
             return False
+        for row in rows_by_path.values():
+            self.files_failed.pop(row, None)
+            self.files_pending[row] = self.files_pending.get(row, 0) + 1
+            self._set_row_state(row, PENDING_ICON)
         try:
-            if self.exif_manager.save_exif_data(file_path, tags):
-                message = f'Saved EXIF to file: {file_path}'
-                logger.info(message)
-                self.statusBar().showMessage(message, 3000)
-                return True
-            return False
+            future = self.exif_manager.submit_save(list(rows_by_path), tags)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+        self._pending_saves.add(future)
+        self._future_bridge.watch(future, lambda done: self._on_save_finished(rows_by_path, tags, done))
+        return True
+
+    def _on_save_finished(self, rows_by_path: Dict[str, int], tags: Dict[str, str], future: Future) -> None:
+        """Marks the rows of a finished background save as done or failed."""
+        self._pending_saves.discard(future)
+        try:
+            results = future.result()
         except ExifToolNotFound:
             self.open_settings_dialog()
-            return False
+            results = {}
         except Exception as e:
-            error_message = f'Error: Failed to save EXIF to "{file_path}". {e}'
+            error_message = f'Error: Failed to save EXIF to {len(rows_by_path)} files. {e}'
             logger.error(error_message)
             self.statusBar().showMessage(error_message, 5000)
-            return False
+            results = {}
+
+        saved = []
+        for file_path in rows_by_path:
+            # Rows move when a folder scan sorts the list, so look the file up again
+            row = self.file_model.row_of(file_path)
+            if row is None or row not in self.files_pending:
+                continue  # The file list was reloaded while the save was queued
+            pending = self.files_pending.get(row, 0) - 1
+            if pending > 0:
+                self.files_pending[row] = pending
+            else:
+                self.files_pending.pop(row, None)
+            if results.get(file_path) == SAVE_MODE_PAYLOAD_CHANGED:
+                self.files_mismatched.add(row)
+                if row in self.files_done:
+                    self.files_done.remove(row)
+                self.file_model.set_done(row, False)
+            elif results.get(file_path):
+                self.files_mismatched.discard(row)
+                saved.append(file_path)
+                if row not in self.files_done:
+                    self.files_done.append(row)
+                self.file_model.set_done(row, True)
+            else:
+                self.files_failed[row] = tags
+                if row in self.files_done:
+                    self.files_done.remove(row)
+                self.file_model.set_done(row, False)
+            self._update_row_state(row)
+
+        mismatched = sum(1 for mode in results.values() if mode == SAVE_MODE_PAYLOAD_CHANGED)
+        failed = len(rows_by_path) - len(saved) - mismatched
+        modes = Counter(results[file_path] for file_path in saved)
+        if len(rows_by_path) == 1 and saved:
+            message = f'Saved EXIF to file ({results[saved[0]]}): {saved[0]}'
+        else:
+            message = f'Saved EXIF to {len(saved)} files'
+            if modes:
+                message += ": " + ", ".join(f"{count} {mode}" for mode, count in sorted(modes.items()))
+        if failed:
+            message += f' ({failed} failed, right-click to retry)'
+        if mismatched:
+            message += f' (image data changed in {mismatched} files, marked {MISMATCH_ICON.strip()})'
+        logger.info(message)
+        self.statusBar().showMessage(message, 5000 if failed or mismatched else 3000)
+
+    def undo_last_save(self) -> None:
+        """Restores the values replaced by the most recent save, in the background."""
+        if not self.exif_manager:
+            self.open_settings_dialog()
+            return
+        if not self.exif_manager.can_undo:
+            self.statusBar().showMessage("Nothing to undo", 3000)
+            return
+        future = self.exif_manager.submit_undo()
+        self._pending_saves.add(future)
+        self._future_bridge.watch(future, self._on_undo_finished)
+
+    def _on_undo_finished(self, future: Future) -> None:
+        """Marks the rows of an undone save as no longer done and shows the restored values."""
+        self._pending_saves.discard(future)
+        try:
+            results = future.result()
+        except Exception as e:
+            error_message = f'Error: Failed to undo the last save. {e}'
+            logger.error(error_message)
+            self.statusBar().showMessage(error_message, 5000)
+            return
+
+        restored = {file_path for file_path, mode in results.items() if mode}
+        for file_path in restored:
+            row = self.file_model.row_of(file_path)
+            if row is None:
+                continue
+            if row in self.files_done:
+                self.files_done.remove(row)
+            self.file_model.set_done(row, False)
+            self._update_row_state(row)
+        if self.current_path in restored:
+            self._load_exif_data(populate_form=True)
+
+        message = f'Undid last save on {len(restored)} files'
+        if len(restored) < len(results):
+            message += f' ({len(results) - len(restored)} failed, undo again to retry)'
+        logger.info(message)
+        self.statusBar().showMessage(message, 5000)
+
+    def _update_row_state(self, row: int) -> None:
+        """Shows whether a row is being saved, failed to save, or is done."""
+        if row in self.files_pending:
+            self._set_row_state(row, PENDING_ICON)
+        elif row in self.files_failed:
+            self._set_row_state(row, ERROR_ICON)
+        elif row in self.files_mismatched:
+            self._set_row_state(row, MISMATCH_ICON)
+        elif row in self.files_done:
+            self._set_row_state(row, DONE_ICON)
+        else:
+            self._set_row_state(row, "")
+
+    def _set_row_state(self, row: int, icon: str) -> None:
+        """Replaces the state marker in front of a row's file name."""
+        self.file_model.set_marker(row, icon)
+
+    def retry_failed_saves(self, rows: list[int] | None = None) -> None:
+        """Queues the failed saves of the given rows (or of all failed rows) again."""
+        rows = list(self.files_failed) if rows is None else [r for r in rows if r in self.files_failed]
+        for row in rows:
+            self._queue_save({self.file_model.file_path(row): row}, self.files_failed[row])
+
+    def flush_pending_saves(self) -> None:
+        """Blocks until every queued save has been written."""
+        if self._pending_saves:
+            logger.info(f"Waiting for {len(self._pending_saves)} queued saves")
+            wait(list(self._pending_saves))
+
+    def on_file_list_context_menu(self, pos) -> None:
+        """Offers to retry failed saves from the file list's context menu."""
+        menu = QMenu(self)
+        row = self.file_list.indexAt(pos).row()
+        retry_row = menu.addAction("Retry Save")
+        retry_row.setEnabled(row in self.files_failed)
+        retry_row.triggered.connect(lambda: self.retry_failed_saves([row]))
+        retry_all = menu.addAction("Retry All Failed Saves")
+        retry_all.setEnabled(bool(self.files_failed))
+        retry_all.triggered.connect(lambda: self.retry_failed_saves())
+        menu.exec(self.file_list.viewport().mapToGlobal(pos))
 
     def _advance_to_next_file(self, saved_rows: list[int]) -> None:
         """Advances the selection to the next file in the list that has not been processed."""
-        last_saved_row = -1
-        for row in saved_rows:
-            if row not in self.files_done:
-                item = self.file_list.item(row)
-                item.setData(Qt.UserRole + 1, True) # Mark item as done
-                
-                # Update the filename display to include the tickmark
-                current_text = item.text()
-                if not current_text.startswith(DONE_ICON):
-                    item.setText(DONE_ICON + current_text)
-                
-                self.file_list.model().dataChanged.emit(self.file_list.model().index(row, 0), self.file_list.model().index(row, 0), [Qt.UserRole + 1])
-                self.files_done.append(row)
-            last_saved_row = max(last_saved_row, row)
-
+        last_saved_row = max(saved_rows, default=-1)
         n_files = self.file_list.count()
-        if len(self.files_done) < n_files:
-            start_row = last_saved_row if last_saved_row != -1 else self.file_list.currentRow()
-            for i in range(1, n_files):
-                next_row = (start_row + i) % n_files
-                if next_row not in self.files_done:
-                    self.file_list.setCurrentRow(next_row)
-                    break
+        start_row = last_saved_row if last_saved_row != -1 else self.file_list.currentRow()
+        for i in range(1, n_files):
+            next_row = (start_row + i) % n_files
+            if next_row not in self.files_done and next_row not in self.files_pending:
+                self.file_list.setCurrentRow(next_row)
+                break
         
         self.file_list.setFocus()
     
@@ -532,6 +1097,8 @@ class MainWindow(QMainWindow):
         dialog = SettingsDialog(self)
         if dialog.exec():
             self._init_exif_manager()
+            self._init_thumbnail_cache()
+            self._init_decode_pool()
 
     def clear_presets(self) -> None:
         """Clears all saved camera and lens presets."""
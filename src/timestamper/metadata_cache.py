@@ -0,0 +1,153 @@
+"""An in-memory LRU cache of parsed metadata for the Timestamper application."""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from os import path
+from typing import Any, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FileSignature(NamedTuple):
+    """The stat fields that change whenever a file (or its sidecar) is modified or replaced."""
+    size: int
+    mtime_ns: int
+    inode: int
+    sidecar_mtime_ns: int = 0  # -1 if the sidecar is missing, 0 if sidecars are not read
+
+
+def file_signature(file_path: str, sidecar_path: Optional[str] = None) -> Optional[FileSignature]:
+    """
+    Returns the current signature of a file, or None if it cannot be stat'ed.
+
+    Args:
+        file_path: The file.
+        sidecar_path: A sidecar whose contents are merged into the file's metadata, so
+            creating, changing or deleting it changes the signature too.
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    sidecar_mtime_ns = 0
+    if sidecar_path is not None:
+        try:
+            sidecar_mtime_ns = os.stat(sidecar_path).st_mtime_ns
+        except OSError:
+            sidecar_mtime_ns = -1
+    return FileSignature(st.st_size, st.st_mtime_ns, st.st_ino, sidecar_mtime_ns)
+
+
+def normalize_path(file_path: str) -> str:
+    """Returns the normalized absolute path used to key cached metadata."""
+    return path.normcase(path.abspath(file_path))
+
+
+def estimate_size(data: Dict[str, Any]) -> int:
+    """Roughly estimates the memory held by a metadata dictionary, in bytes."""
+    return sum(100 + len(k) + len(str(v)) for k, v in data.items())
+
+
+class _CacheEntry(NamedTuple):
+    signature: Optional[FileSignature]
+    data: Dict[str, Any]
+    size: int
+
+
+class MetadataCache:
+    """
+    A thread-safe LRU cache of metadata keyed by (profile, path).
+
+    Every entry remembers the file signature taken before the file was read. A lookup
+    compares it with the file's current signature, so a file changed on disk is never
+    served from the cache. Entries are evicted least recently used first once either
+    the entry or the byte budget is exceeded.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        """Initializes an empty cache with the given budgets."""
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self._entries: "OrderedDict[tuple[str, str], _CacheEntry]" = OrderedDict()
+        self._profiles: set[str] = set()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Returns the number of cached entries."""
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Returns the estimated size of all cached entries."""
+        return self._bytes
+
+    def get(self, file_path: str, profile: str, signature: Optional[FileSignature] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached metadata of a file if it is unchanged on disk.
+
+        Args:
+            file_path: The file to look up.
+            profile: The read profile the metadata was read with.
+            signature: The file's current signature, if the caller already has it.
+        """
+        key = (profile, normalize_path(file_path))
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if signature is None:
+            signature = file_signature(file_path)
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return None
+            if entry.signature != signature:
+                logger.debug(f'Cached {profile} metadata for "{file_path}" is stale')
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.data
+
+    def put(self, file_path: str, profile: str, data: Dict[str, Any], signature: Optional[FileSignature]) -> None:
+        """
+        Caches metadata read from a file.
+
+        Args:
+            file_path: The file that was read.
+            profile: The read profile the metadata was read with.
+            data: The metadata.
+            signature: The file's signature taken *before* it was read, so a change made
+                during the read makes the entry stale instead of hiding the change.
+        """
+        key = (profile, normalize_path(file_path))
+        entry = _CacheEntry(signature, data, estimate_size(data))
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._profiles.add(profile)
+            self._bytes += entry.size
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, file_path: str) -> None:
+        """Forgets the metadata of a file for every profile."""
+        normalized = normalize_path(file_path)
+        with self._lock:
+            for profile in self._profiles:
+                self._remove((profile, normalized))
+
+    def clear(self) -> None:
+        """Forgets all cached metadata."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        """Removes an entry; the lock must be held."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
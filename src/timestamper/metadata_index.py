@@ -0,0 +1,136 @@
+"""A persistent SQLite index of parsed metadata for the Timestamper application."""
+
+import json
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .constants import METADATA_INDEX_VERSION
+from .metadata_cache import FileSignature, normalize_path
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_QUERY_CHUNK_SIZE = 500
+
+
+class MetadataIndex:
+    """
+    Keeps the parsed metadata of every file read in earlier sessions on disk.
+
+    Each row holds a file's metadata for one read profile, together with the stat
+    signature the file had when it was read. Callers compare that signature with the
+    file's current one, so only new or changed files have to be read again.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Opens (or creates) the index database.
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened.
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        try:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != METADATA_INDEX_VERSION:
+                # Rows written by another version may hold a different set of tags
+                self._conn.execute("DROP TABLE IF EXISTS metadata")
+                self._conn.execute(f"PRAGMA user_version={METADATA_INDEX_VERSION}")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS metadata (
+                    path TEXT NOT NULL,
+                    profile TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    sidecar_mtime_ns INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (path, profile)
+                )"""
+            )
+            self._conn.commit()
+        except sqlite3.Error:
+            self._conn.close()
+            raise
+        logger.info(f'Opened metadata index "{db_path}"')
+
+    def get_many(self, file_paths: Iterable[str], profile: str) -> Dict[str, Tuple[FileSignature, Dict[str, Any]]]:
+        """
+        Looks up several files.
+
+        Returns:
+            A mapping of each indexed file path to its stored signature and metadata.
+        """
+        by_key = {normalize_path(file_path): file_path for file_path in file_paths}
+        keys = list(by_key)
+        results = {}
+        try:
+            with self._lock:
+                for i in range(0, len(keys), _QUERY_CHUNK_SIZE):
+                    chunk = keys[i:i + _QUERY_CHUNK_SIZE]
+                    rows = self._conn.execute(
+                        "SELECT path, size, mtime_ns, inode, sidecar_mtime_ns, data FROM metadata "
+                        f"WHERE profile = ? AND path IN ({','.join('?' * len(chunk))})",
+                        [profile, *chunk],
+                    ).fetchall()
+                    for key, *signature, data in rows:
+                        results[by_key[key]] = (FileSignature(*signature), json.loads(data))
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Error reading metadata index: {e}")
+        return results
+
+    def put_many(self, entries: List[Tuple[str, FileSignature, Dict[str, Any]]], profile: str) -> None:
+        """Stores the metadata and signatures of several files in one transaction."""
+        rows = [
+            (normalize_path(file_path), profile, *signature, json.dumps(data))
+            for file_path, signature, data in entries
+            if signature is not None
+        ]
+        if not rows:
+            return
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO metadata "
+                    "(path, profile, size, mtime_ns, inode, sidecar_mtime_ns, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error writing metadata index: {e}")
+
+    def invalidate_many(self, file_paths: Iterable[str]) -> None:
+        """Forgets the metadata of several files for every profile."""
+        rows = [(normalize_path(file_path),) for file_path in file_paths]
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM metadata WHERE path = ?", rows)
+        except sqlite3.Error as e:
+            logger.error(f"Error writing metadata index: {e}")
+
+    def __len__(self) -> int:
+        """Returns the number of indexed (file, profile) rows."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM metadata").fetchone()[0]
+
+    def close(self) -> None:
+        """Closes the database."""
+        with self._lock:
+            self._conn.close()
+
+
+def open_metadata_index(db_path: Optional[str]) -> Optional[MetadataIndex]:
+    """Opens the metadata index, or returns None (logging why) if it is unavailable."""
+    if not db_path:
+        return None
+    try:
+        return MetadataIndex(db_path)
+    except sqlite3.Error as e:
+        logger.warning(f'Metadata index "{db_path}" unavailable, continuing without it: {e}')
+        return None
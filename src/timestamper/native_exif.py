@@ -0,0 +1,841 @@
+"""Pure-Python reading and writing of the form tags in JPEG and TIFF files.
+
+Only the fixed set of tags Timestamper edits is supported. Anything this module cannot
+handle safely (other formats, BigTIFF, unknown tags, oversized APP1 segments) raises
+NativeExifUnsupported so the caller can fall back to exiftool.
+
+Values are returned the way ``exiftool -G -n`` reports them, so the results can be used
+interchangeably with exiftool's form profile.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from fractions import Fraction
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from .constants import SAVE_MODE_APPENDED, SAVE_MODE_IN_PLACE, SAVE_MODE_REWRITTEN
+
+# TIFF field types
+BYTE, ASCII, SHORT, LONG, RATIONAL = 1, 2, 3, 4, 5
+SBYTE, UNDEFINED, SSHORT, SLONG, SRATIONAL = 6, 7, 8, 9, 10
+FLOAT, DOUBLE, IFD = 11, 12, 13
+TYPE_SIZES = {
+    BYTE: 1, ASCII: 1, SHORT: 2, LONG: 4, RATIONAL: 8, SBYTE: 1, UNDEFINED: 1,
+    SSHORT: 2, SLONG: 4, SRATIONAL: 8, FLOAT: 4, DOUBLE: 8, IFD: 4,
+}
+
+IFD0 = "IFD0"
+EXIF_IFD = "ExifIFD"
+EXIF_IFD_POINTER = 0x8769
+STRIP_OFFSETS, STRIP_BYTE_COUNTS = 0x0111, 0x0117
+TILE_OFFSETS, TILE_BYTE_COUNTS = 0x0144, 0x0145
+MAX_IFD_CHAIN = 1024  # Pages followed when hashing a multi-page TIFF
+
+# Image structure tags
+NEW_SUBFILE_TYPE = 0x00FE
+REDUCED_IMAGE = 0x1  # NewSubfileType bit of a reduced-resolution copy of another page
+IMAGE_WIDTH, IMAGE_LENGTH, BITS_PER_SAMPLE = 0x0100, 0x0101, 0x0102
+COMPRESSION, PHOTOMETRIC = 0x0103, 0x0106
+SAMPLES_PER_PIXEL, ROWS_PER_STRIP, PLANAR_CONFIGURATION = 0x0115, 0x0116, 0x011C
+PREDICTOR, TILE_WIDTH, TILE_LENGTH = 0x013D, 0x0142, 0x0143
+SUB_IFDS = 0x014A
+JPEG_INTERCHANGE_FORMAT, JPEG_INTERCHANGE_FORMAT_LENGTH = 0x0201, 0x0202
+JPEG_COMPRESSIONS = (6, 7)  # Old-style and new-style JPEG
+
+# Tag name -> (IFD, tag id, field type, fixed count or None for strings)
+NATIVE_TAGS: Dict[str, tuple[str, int, int, Optional[int]]] = {
+    "Make": (IFD0, 0x010F, ASCII, None),
+    "Model": (IFD0, 0x0110, ASCII, None),
+    "ExposureTime": (EXIF_IFD, 0x829A, RATIONAL, 1),
+    "FNumber": (EXIF_IFD, 0x829D, RATIONAL, 1),
+    "ISO": (EXIF_IFD, 0x8827, SHORT, 1),
+    "DateTimeOriginal": (EXIF_IFD, 0x9003, ASCII, None),
+    "OffsetTime": (EXIF_IFD, 0x9010, ASCII, None),
+    "OffsetTimeOriginal": (EXIF_IFD, 0x9011, ASCII, None),
+    "ShutterSpeedValue": (EXIF_IFD, 0x9201, SRATIONAL, 1),
+    "MaxApertureValue": (EXIF_IFD, 0x9205, RATIONAL, 1),
+    "FocalLength": (EXIF_IFD, 0x920A, RATIONAL, 1),
+    "LensInfo": (EXIF_IFD, 0xA432, RATIONAL, 4),
+    "LensMake": (EXIF_IFD, 0xA433, ASCII, None),
+    "LensModel": (EXIF_IFD, 0xA434, ASCII, None),
+    "LensSerialNumber": (EXIF_IFD, 0xA435, ASCII, None),
+}
+
+EXIF_HEADER = b"Exif\x00\x00"
+APP1_MAX_LENGTH = 0xFFFF - 2  # Segment length field counts itself
+MAX_IFD_ENTRIES = 1000
+# Precedes IFDs appended to a TIFF structure, followed by its original end and the area length
+APPEND_MARKER = b"Timestamper\x00"
+APPEND_HEADER_LENGTH = len(APPEND_MARKER) + 8
+
+
+class NativeExifUnsupported(Exception):
+    """Raised when a file or tag cannot be handled without exiftool."""
+    pass
+
+
+class _Entry(NamedTuple):
+    """One IFD entry; ``field`` holds the raw 4-byte value/offset field."""
+    tag: int
+    type: int
+    count: int
+    field: bytes
+    offset: int  # Block-relative position of the 12-byte entry
+
+
+class TiffPage(NamedTuple):
+    """The layout of one page of a TIFF file; tiled pages have no strips, striped ones no tiles."""
+    width: int
+    height: int
+    compression: int
+    photometric: int
+    samples_per_pixel: int
+    bits_per_sample: tuple[int, ...]
+    planar_configuration: int
+    rows_per_strip: int
+    strip_offsets: tuple[int, ...]
+    strip_byte_counts: tuple[int, ...]
+    byte_order: str = "<"  # struct/NumPy prefix of the file's byte order
+    predictor: int = 1
+    tile_width: int = 0
+    tile_length: int = 0
+    tile_offsets: tuple[int, ...] = ()
+    tile_byte_counts: tuple[int, ...] = ()
+    subfile_type: int = 0  # NewSubfileType flags
+
+    def reduces(self, main: "TiffPage") -> bool:
+        """Checks that this page is flagged as a reduced-resolution image and is smaller than ``main``."""
+        return bool(self.subfile_type & REDUCED_IMAGE) and self.width < main.width and self.height < main.height
+
+
+class _TiffBlock:
+    """A parsed TIFF structure (a TIFF file or the payload of a JPEG Exif APP1 segment)."""
+
+    def __init__(self, buf, start: int, end: int):
+        """Parses IFD0 and the Exif IFD of the TIFF structure in ``buf[start:end]``."""
+        self.buf = buf
+        self.start = start
+        self.end = end
+        header = bytes(buf[start:start + 8])
+        if len(header) < 8:
+            raise NativeExifUnsupported("Truncated TIFF header")
+        if header[:4] == b"II*\x00":
+            self.byte_order = "<"
+        elif header[:4] == b"MM\x00*":
+            self.byte_order = ">"
+        else:
+            raise NativeExifUnsupported("Not a classic TIFF structure")
+        self.ifd0_offset = self._unpack("I", 4)
+        self.ifd0, self.ifd0_next = self._parse_ifd(self.ifd0_offset)
+        self.exif_ifd: Dict[int, _Entry] = {}
+        pointer = self.ifd0.get(EXIF_IFD_POINTER)
+        if pointer is not None:
+            self.exif_ifd, _ = self._parse_ifd(self._unpack("I", 0, pointer.field))
+
+    def _unpack(self, fmt: str, offset: int, data: Optional[bytes] = None) -> Any:
+        """Unpacks one value at a block-relative offset (or from ``data``)."""
+        if data is not None:
+            return struct.unpack_from(self.byte_order + fmt, data, offset)[0]
+        return struct.unpack_from(self.byte_order + fmt, self.buf, self.start + offset)[0]
+
+    def _parse_ifd(self, offset: int) -> tuple[Dict[int, _Entry], int]:
+        """Parses the IFD at a block-relative offset into entries and the next-IFD offset."""
+        size = self.end - self.start
+        if offset < 8 or offset + 2 > size:
+            raise NativeExifUnsupported(f"IFD offset {offset} out of range")
+        count = self._unpack("H", offset)
+        if count > MAX_IFD_ENTRIES or offset + 2 + 12 * count + 4 > size:
+            raise NativeExifUnsupported("Corrupt IFD")
+        entries = {}
+        for i in range(count):
+            pos = self.start + offset + 2 + 12 * i
+            tag, type_, n = struct.unpack_from(self.byte_order + "HHI", self.buf, pos)
+            entries[tag] = _Entry(tag, type_, n, bytes(self.buf[pos + 8:pos + 12]), pos - self.start)
+        next_offset = self._unpack("I", offset + 2 + 12 * count)
+        return entries, next_offset
+
+    def value_bytes(self, entry: _Entry) -> bytes:
+        """Returns the raw value bytes of an entry, following its offset if stored out of line."""
+        length = TYPE_SIZES.get(entry.type, 1) * entry.count
+        if length <= 4:
+            return entry.field[:length]
+        offset = self._unpack("I", 0, entry.field)
+        if offset + length > self.end - self.start:
+            raise NativeExifUnsupported(f"Value of tag 0x{entry.tag:04x} out of range")
+        return bytes(self.buf[self.start + offset:self.start + offset + length])
+
+    def entries_for(self, ifd: str) -> Dict[int, _Entry]:
+        """Returns the entries of IFD0 or the Exif IFD."""
+        return self.ifd0 if ifd == IFD0 else self.exif_ifd
+
+
+def read_form_tags(file_path: str) -> Dict[str, Any]:
+    """
+    Reads the form tags of a JPEG or TIFF file.
+
+    Returns:
+        A dictionary shaped like exiftool's ``-G -n`` output: ``SourceFile`` plus an
+        ``EXIF:<Tag>`` key for every form tag present in the file.
+
+    Raises:
+        NativeExifUnsupported: If the file is not a JPEG or classic TIFF file.
+        OSError: If the file cannot be read.
+    """
+    exif_data: Dict[str, Any] = {"SourceFile": file_path}
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise NativeExifUnsupported("Empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            block = _find_tiff_block(mm)
+            if block is None:
+                return exif_data
+            for name, (ifd, tag, _, _) in NATIVE_TAGS.items():
+                entry = block.entries_for(ifd).get(tag)
+                if entry is not None:
+                    value = _decode_value(name, block, entry)
+                    if value is not None:
+                        exif_data[f"EXIF:{name}"] = value
+            del block  # Release exported mmap buffers before the map closes
+    return exif_data
+
+
+def write_form_tags(file_path: str, tags: Dict[str, str]) -> str:
+    """
+    Writes form tags to a JPEG or TIFF file without exiftool.
+
+    When every changed tag already exists and its new value fits in the space of the old
+    one, only those entries and values are overwritten in place. Otherwise a TIFF file
+    gets a new IFD0 and Exif IFD appended at its end, and the header is then pointed at
+    them, so the image data is never moved or rewritten. IFDs appended by earlier saves
+    are dead once replaced; their space is reused when the new IFDs fit in it, so repeated
+    saves do not keep growing the file. A JPEG file gets a new Exif APP1 segment built the
+    same way, without the IFDs earlier saves appended, and is replaced atomically.
+    Existing entries (including their out-of-line values) are reused, so MakerNotes,
+    thumbnails and other offset-based data stay valid. An empty value removes the tag.
+
+    Returns:
+        The save mode: SAVE_MODE_IN_PLACE, SAVE_MODE_APPENDED or SAVE_MODE_REWRITTEN.
+
+    Raises:
+        NativeExifUnsupported: If the file or any tag value needs exiftool.
+        OSError: If the file cannot be read or written.
+    """
+    for name in tags:
+        if name not in NATIVE_TAGS:
+            raise NativeExifUnsupported(f"Tag {name} is not supported natively")
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise NativeExifUnsupported("Empty file")
+        kind = f.read(4)
+    if kind[:2] != b"\xff\xd8" and kind not in (b"II*\x00", b"MM\x00*"):
+        raise NativeExifUnsupported("Only JPEG and classic TIFF files are supported natively")
+    if _patch_in_place(file_path, tags):
+        return SAVE_MODE_IN_PLACE
+    if kind[:2] == b"\xff\xd8":
+        _write_jpeg(file_path, tags)
+        return SAVE_MODE_REWRITTEN
+    _write_tiff(file_path, tags)
+    return SAVE_MODE_APPENDED
+
+
+def payload_digest(file_path: str) -> str:
+    """
+    Hashes the image data of a JPEG or TIFF file, leaving out all metadata.
+
+    For a JPEG file that is every segment except APPn and COM, followed by the
+    entropy-coded scans up to EOI; for a TIFF file, the strips or tiles of every page in
+    the IFD chain, in order. Moving that data (as a rewrite does) keeps the digest, while
+    changing it does not. The file is mapped, not copied, and nothing is decoded.
+
+    Raises:
+        NativeExifUnsupported: If the file is not a JPEG or classic TIFF file.
+        OSError: If the file cannot be read.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise NativeExifUnsupported("Empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                if bytes(mm[:2]) == b"\xff\xd8":
+                    _hash_jpeg_payload(mm, view, digest)
+                elif bytes(mm[:4]) in (b"II*\x00", b"MM\x00*"):
+                    _hash_tiff_payload(mm, view, digest)
+                else:
+                    raise NativeExifUnsupported("Only JPEG and classic TIFF files can be verified")
+    return digest.hexdigest()
+
+
+def tiff_pages(file_path: str) -> List[TiffPage]:
+    """
+    Describes the pages in the IFD chain of a TIFF file, in order.
+
+    The index of a page in the result is its image number for ``QImageReader.jumpToImage``.
+
+    Raises:
+        NativeExifUnsupported: If the file is not a classic TIFF file.
+        OSError: If the file cannot be read.
+    """
+    with open(file_path, "rb") as f:
+        if f.read(4) not in (b"II*\x00", b"MM\x00*"):
+            raise NativeExifUnsupported("Not a classic TIFF file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            block = _TiffBlock(mm, 0, len(mm))
+            pages = [_tiff_page(block, entries) for entries in _ifd_chain(block)]
+            del block  # Release exported mmap buffers before the map closes
+    return pages
+
+
+def embedded_jpegs(file_path: str) -> List[tuple[int, int]]:
+    """
+    Finds the reduced-resolution JPEG images embedded in a JPEG or TIFF file.
+
+    These are the EXIF thumbnail (and any other JPEGInterchangeFormat image) and
+    single-strip JPEG pages after the first, in the IFD chain and in SubIFDs, which is
+    where TIFF-based formats keep their previews. Such pages must be flagged as reduced
+    images and be smaller than the first page, so the frames of a multi-page file are
+    never taken for previews.
+
+    Returns:
+        The (file offset, length) of each embedded image; none are decoded.
+
+    Raises:
+        NativeExifUnsupported: If the file is not a JPEG or classic TIFF file.
+        OSError: If the file cannot be read.
+    """
+    ranges = []
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise NativeExifUnsupported("Empty file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            block = _find_tiff_block(mm)
+            if block is None:
+                return ranges
+            chain = list(_ifd_chain(block))
+            sub_ifds = chain[0].get(SUB_IFDS)
+            if sub_ifds is not None and sub_ifds.type in (LONG, IFD):
+                fmt = f"{block.byte_order}{sub_ifds.count}I"
+                for offset in struct.unpack(fmt, block.value_bytes(sub_ifds)):
+                    chain.append(block._parse_ifd(offset)[0])
+            size = block.end - block.start
+            main = _tiff_page(block, chain[0])
+            for index, entries in enumerate(chain):
+                start, length = entries.get(JPEG_INTERCHANGE_FORMAT), entries.get(JPEG_INTERCHANGE_FORMAT_LENGTH)
+                if start is not None and length is not None:
+                    offset, count = _unpack_array(block, start)[0], _unpack_array(block, length)[0]
+                elif index > 0:
+                    page = _tiff_page(block, entries)
+                    if (
+                        not page.reduces(main)
+                        or page.compression not in JPEG_COMPRESSIONS
+                        or len(page.strip_byte_counts) != 1
+                    ):
+                        continue
+                    offset, count = page.strip_offsets[0], page.strip_byte_counts[0]
+                else:
+                    continue
+                if 0 < count and offset + count <= size:
+                    ranges.append((block.start + offset, count))
+            del block  # Release exported mmap buffers before the map closes
+    return ranges
+
+
+def _ifd_chain(block: _TiffBlock):
+    """Yields the entries of each IFD in the chain starting at IFD0."""
+    entries, next_offset = block.ifd0, block.ifd0_next
+    seen = {block.ifd0_offset}
+    for _ in range(MAX_IFD_CHAIN):
+        yield entries
+        if not next_offset or next_offset in seen:
+            return
+        seen.add(next_offset)
+        entries, next_offset = block._parse_ifd(next_offset)
+
+
+def _tiff_page(block: _TiffBlock, entries: Dict[int, _Entry]) -> TiffPage:
+    """Collects the image structure tags of one IFD, with the TIFF defaults for missing ones."""
+    def values(tag: int, default: tuple[int, ...]) -> tuple[int, ...]:
+        entry = entries.get(tag)
+        return default if entry is None else _unpack_array(block, entry)
+
+    samples_per_pixel = values(SAMPLES_PER_PIXEL, (1,))[0]
+    height = values(IMAGE_LENGTH, (0,))[0]
+    strip_offsets, strip_byte_counts = (), ()
+    tile_offsets, tile_byte_counts = (), ()
+    if TILE_OFFSETS in entries:
+        tile_offsets = values(TILE_OFFSETS, ())
+        tile_byte_counts = values(TILE_BYTE_COUNTS, ())
+    else:
+        strip_offsets = values(STRIP_OFFSETS, ())
+        strip_byte_counts = values(STRIP_BYTE_COUNTS, ())
+    return TiffPage(
+        width=values(IMAGE_WIDTH, (0,))[0],
+        height=height,
+        compression=values(COMPRESSION, (1,))[0],
+        photometric=values(PHOTOMETRIC, (-1,))[0],
+        samples_per_pixel=samples_per_pixel,
+        bits_per_sample=values(BITS_PER_SAMPLE, (1,) * samples_per_pixel),
+        planar_configuration=values(PLANAR_CONFIGURATION, (1,))[0],
+        rows_per_strip=min(values(ROWS_PER_STRIP, (height,))[0], height),
+        strip_offsets=strip_offsets,
+        strip_byte_counts=strip_byte_counts,
+        byte_order=block.byte_order,
+        predictor=values(PREDICTOR, (1,))[0],
+        tile_width=values(TILE_WIDTH, (0,))[0],
+        tile_length=values(TILE_LENGTH, (0,))[0],
+        tile_offsets=tile_offsets,
+        tile_byte_counts=tile_byte_counts,
+        subfile_type=values(NEW_SUBFILE_TYPE, (0,))[0],
+    )
+
+
+def _hash_jpeg_payload(mm: mmap.mmap, view: memoryview, digest) -> None:
+    """Feeds the non-metadata segments and the scans of a JPEG file to a hash."""
+    size = len(mm)
+    pos = 2
+    while pos + 2 <= size:
+        if mm[pos] != 0xFF:
+            raise NativeExifUnsupported("Corrupt JPEG segment structure")
+        marker = mm[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+            continue
+        if marker == 0xD9:
+            return
+        if marker == 0xDA:  # Everything from the first scan on is image data
+            end = mm.rfind(b"\xff\xd9", pos)
+            digest.update(view[pos:size if end < 0 else end + 2])
+            return
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        if pos + 4 > size:
+            raise NativeExifUnsupported("Truncated JPEG segment")
+        end = pos + 2 + struct.unpack_from(">H", mm, pos + 2)[0]
+        if end > size:
+            raise NativeExifUnsupported("Truncated JPEG segment")
+        if not (0xE0 <= marker <= 0xEF or marker == 0xFE):
+            digest.update(view[pos:end])
+        pos = end
+
+
+def _hash_tiff_payload(mm: mmap.mmap, view: memoryview, digest) -> None:
+    """Feeds the strips or tiles of every page of a TIFF file to a hash."""
+    block = _TiffBlock(mm, 0, len(mm))
+    for entries in _ifd_chain(block):
+        if TILE_OFFSETS in entries:
+            offsets, counts = entries[TILE_OFFSETS], entries.get(TILE_BYTE_COUNTS)
+        else:
+            offsets, counts = entries.get(STRIP_OFFSETS), entries.get(STRIP_BYTE_COUNTS)
+        if offsets is not None:
+            if counts is None or counts.count != offsets.count:
+                raise NativeExifUnsupported("Strip or tile byte counts missing")
+            for start, length in zip(_unpack_array(block, offsets), _unpack_array(block, counts)):
+                if start + length > len(mm):
+                    raise NativeExifUnsupported("Strip or tile out of range")
+                digest.update(view[start:start + length])
+    del block  # Release exported mmap buffers before the map closes
+
+
+def _unpack_array(block: _TiffBlock, entry: _Entry) -> tuple[int, ...]:
+    """Returns the values of a SHORT or LONG array entry."""
+    if entry.type not in (SHORT, LONG):
+        raise NativeExifUnsupported(f"Unexpected type {entry.type} for tag 0x{entry.tag:04x}")
+    fmt = "H" if entry.type == SHORT else "I"
+    return struct.unpack(f"{block.byte_order}{entry.count}{fmt}", block.value_bytes(entry))
+
+
+def _find_tiff_block(buf) -> Optional[_TiffBlock]:
+    """Returns the TIFF structure holding the EXIF data of a JPEG or TIFF buffer."""
+    if bytes(buf[:2]) == b"\xff\xd8":
+        segment = _find_exif_segment(buf)[0]
+        if segment is None:
+            return None
+        start, end = segment
+        return _TiffBlock(buf, start + 4 + len(EXIF_HEADER), end)
+    if bytes(buf[:4]) in (b"II*\x00", b"MM\x00*"):
+        return _TiffBlock(buf, 0, len(buf))
+    raise NativeExifUnsupported("Only JPEG and classic TIFF files are supported natively")
+
+
+def _find_exif_segment(buf) -> tuple[Optional[tuple[int, int]], int]:
+    """
+    Scans the JPEG header segments.
+
+    Returns:
+        The (start, end) byte range of the first Exif APP1 segment, or None, and the
+        offset where a new Exif segment should be inserted.
+    """
+    size = len(buf)
+    pos = 2
+    insert_at = 2
+    while pos + 4 <= size:
+        if buf[pos] != 0xFF:
+            raise NativeExifUnsupported("Corrupt JPEG segment structure")
+        marker = buf[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+            continue
+        if marker in (0xDA, 0xD9):  # Start of scan / end of image
+            break
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # Markers without a length
+            pos += 2
+            continue
+        length = struct.unpack_from(">H", buf, pos + 2)[0]
+        end = pos + 2 + length
+        if end > size:
+            raise NativeExifUnsupported("Truncated JPEG segment")
+        if marker == 0xE1 and bytes(buf[pos + 4:pos + 4 + len(EXIF_HEADER)]) == EXIF_HEADER:
+            return (pos, end), pos
+        if marker == 0xE0 and pos == insert_at:  # Keep a leading JFIF APP0 first
+            insert_at = end
+        pos = end
+    return None, insert_at
+
+
+def _format_number(value: float, digits: int = 10) -> Any:
+    """Formats a number the way exiftool prints it: rounded, and an int when integral."""
+    value = float(f"{value:.{digits}g}")
+    return int(value) if value.is_integer() else value
+
+
+def _decode_value(name: str, block: _TiffBlock, entry: _Entry) -> Any:
+    """Decodes a form tag value into exiftool's ``-n`` representation."""
+    data = block.value_bytes(entry)
+    bo = block.byte_order
+    if entry.type == ASCII:
+        return data.split(b"\x00", 1)[0].decode("utf-8", "replace").rstrip(" ")
+    if entry.type in (RATIONAL, SRATIONAL):
+        fmt = bo + ("II" if entry.type == RATIONAL else "ii")
+        return form_value(name, [struct.unpack_from(fmt, data, 8 * i) for i in range(entry.count)])
+    if entry.type in (SHORT, LONG, SSHORT, SLONG, BYTE):
+        fmt = {SHORT: "H", LONG: "I", SSHORT: "h", SLONG: "i", BYTE: "B"}[entry.type]
+        return struct.unpack_from(bo + fmt, data, 0)[0]
+    return None
+
+
+def form_value(name: str, rationals: List[tuple[int, int]]) -> Any:
+    """Converts the stored (numerator, denominator) pairs of a tag to exiftool's ``-n`` value."""
+    values: List[Any] = []
+    for num, den in rationals:
+        if den == 0:
+            values.append("undef" if num == 0 else "inf")
+        else:
+            values.append(_format_number(num / den))
+    if name == "LensInfo":
+        return " ".join(str(v) for v in values)
+    value = values[0]
+    if isinstance(value, str):
+        return value
+    if name == "ShutterSpeedValue":
+        return _format_number(2 ** -value if abs(value) < 100 else 0, 15)
+    if name == "MaxApertureValue":
+        return _format_number(2 ** (value / 2), 15)
+    return value
+
+
+def form_rationals(name: str, value: str) -> List[tuple[int, int]]:
+    """
+    Converts a form value of a rational tag to the (numerator, denominator) pairs to store.
+
+    Raises:
+        NativeExifUnsupported: If the value cannot be represented.
+    """
+    if name == "LensInfo":
+        parts = value.split()
+        if len(parts) != 4:
+            raise NativeExifUnsupported(f"LensInfo needs four values, got {value!r}")
+        numbers = [_parse_number(p) for p in parts]
+    else:
+        numbers = [_parse_number(value)]
+    if name == "ShutterSpeedValue":  # Stored as APEX Tv = -log2(seconds)
+        if numbers[0] <= 0:
+            raise NativeExifUnsupported(f"Invalid shutter speed {value!r}")
+        numbers = [Fraction(-math.log2(numbers[0]))]
+    elif name == "MaxApertureValue":  # Stored as APEX Av = 2 * log2(f-number)
+        if numbers[0] <= 0:
+            raise NativeExifUnsupported(f"Invalid aperture {value!r}")
+        numbers = [Fraction(2 * math.log2(numbers[0]))]
+    signed = NATIVE_TAGS[name][2] == SRATIONAL
+    return [_to_rational(n, signed) for n in numbers]
+
+
+def _parse_number(value: str) -> Fraction:
+    """Parses a decimal or fraction string such as "2.8" or "1/250"."""
+    try:
+        if "/" in value:
+            num, den = value.split("/", 1)
+            return Fraction(num.strip()) / Fraction(den.strip())
+        return Fraction(value.strip())
+    except (ValueError, ZeroDivisionError):
+        raise NativeExifUnsupported(f"Cannot convert {value!r} to a number")
+
+
+def _to_rational(value: Fraction, signed: bool) -> tuple[int, int]:
+    """Converts a fraction to a 32-bit (signed or unsigned) rational."""
+    limit = 0x7FFFFFFF if signed else 0xFFFFFFFF
+    if not signed and value < 0:
+        raise NativeExifUnsupported(f"Negative value {value} for an unsigned rational")
+    max_den = limit
+    while abs(value.numerator) > limit or value.denominator > limit:
+        value = value.limit_denominator(max_den)
+        max_den //= 10
+        if max_den < 1:
+            raise NativeExifUnsupported(f"Value {value} does not fit a rational")
+    return value.numerator, value.denominator
+
+
+def _encode_value(name: str, value: str, byte_order: str) -> tuple[int, int, bytes]:
+    """Encodes a form value as a (field type, count, value bytes) triple."""
+    _, _, type_, count = NATIVE_TAGS[name]
+    if type_ == ASCII:
+        data = value.encode("utf-8") + b"\x00"
+        return ASCII, len(data), data
+    if type_ == SHORT:
+        number = _parse_number(value)
+        if number.denominator != 1 or not 0 <= number <= 0xFFFF:
+            raise NativeExifUnsupported(f"{name} value {value!r} does not fit a SHORT")
+        return SHORT, 1, struct.pack(byte_order + "H", int(number))
+
+    fmt = byte_order + ("ii" if type_ == SRATIONAL else "II")
+    data = b"".join(struct.pack(fmt, *pair) for pair in form_rationals(name, value))
+    return type_, count, data
+
+
+def _build_ifds(
+    block: _TiffBlock, tags: Dict[str, str], base: int, relocate_from: Optional[int] = None
+) -> tuple[bytes, int]:
+    """
+    Builds a new IFD0 and Exif IFD holding the updated tags.
+
+    Unchanged entries are copied verbatim, so their out-of-line values keep pointing at
+    the existing data, except values at or after block-relative offset ``relocate_from``,
+    which are copied into the new area. The new IFDs and any new values are laid out from
+    block-relative offset ``base``.
+
+    Returns:
+        The bytes to place at ``base`` and the offset of the new IFD0.
+    """
+    bo = block.byte_order
+    new_values: Dict[str, Dict[int, tuple[int, int, bytes]]] = {IFD0: {}, EXIF_IFD: {}}
+    removed: Dict[str, set[int]] = {IFD0: set(), EXIF_IFD: set()}
+    for name, value in tags.items():
+        ifd, tag, _, _ = NATIVE_TAGS[name]
+        if value == "":
+            removed[ifd].add(tag)
+        else:
+            new_values[ifd][tag] = _encode_value(name, value, bo)
+
+    def merged(ifd: str) -> Dict[int, Any]:
+        entries: Dict[int, Any] = {}
+        for tag, entry in block.entries_for(ifd).items():
+            if tag in removed[ifd]:
+                continue
+            if (
+                relocate_from is not None
+                and TYPE_SIZES.get(entry.type, 1) * entry.count > 4
+                and block._unpack("I", 0, entry.field) >= relocate_from
+            ):
+                entries[tag] = (entry.type, entry.count, block.value_bytes(entry))
+            else:
+                entries[tag] = entry
+        entries.update(new_values[ifd])
+        return entries
+
+    ifd0 = merged(IFD0)
+    exif_ifd = merged(EXIF_IFD)
+    if exif_ifd:
+        ifd0[EXIF_IFD_POINTER] = None  # Filled in once the Exif IFD position is known
+    else:
+        ifd0.pop(EXIF_IFD_POINTER, None)
+
+    ifd0_offset = base
+    exif_offset = ifd0_offset + 2 + 12 * len(ifd0) + 4
+    data_offset = exif_offset + (2 + 12 * len(exif_ifd) + 4 if exif_ifd else 0)
+    extra = bytearray()
+
+    def serialize(entries: Dict[int, Any], next_ifd: int) -> bytes:
+        out = bytearray(struct.pack(bo + "H", len(entries)))
+        for tag in sorted(entries):
+            entry = entries[tag]
+            if tag == EXIF_IFD_POINTER and entry is None:
+                out += struct.pack(bo + "HHII", tag, LONG, 1, exif_offset)
+            elif isinstance(entry, _Entry):
+                out += struct.pack(bo + "HHI", entry.tag, entry.type, entry.count) + entry.field
+            else:
+                type_, count, data = entry
+                if len(data) <= 4:
+                    field = data.ljust(4, b"\x00")
+                else:
+                    field = struct.pack(bo + "I", data_offset + len(extra))
+                    extra.extend(data)
+                    if len(extra) % 2:
+                        extra.append(0)
+                out += struct.pack(bo + "HHI", tag, type_, count) + field
+        out += struct.pack(bo + "I", next_ifd)
+        return bytes(out)
+
+    ifd0_bytes = serialize(ifd0, block.ifd0_next)
+    exif_bytes = serialize(exif_ifd, 0) if exif_ifd else b""
+    if data_offset + len(extra) > 0xFFFFFFFF:
+        raise NativeExifUnsupported("File too large for 32-bit TIFF offsets")
+    return ifd0_bytes + exif_bytes + bytes(extra), ifd0_offset
+
+
+def _plan_patches(block: _TiffBlock, tags: Dict[str, str]) -> Optional[List[tuple[int, bytes]]]:
+    """
+    Plans an in-place update of existing entries.
+
+    Returns:
+        (block-relative offset, bytes) writes, value bytes before the entries that point
+        at them, or None if a tag has to be added or removed or a value has outgrown its
+        space.
+    """
+    bo = block.byte_order
+    value_writes = []
+    entry_writes = []
+    for name, value in tags.items():
+        ifd, tag, _, _ = NATIVE_TAGS[name]
+        entry = block.entries_for(ifd).get(tag)
+        if value == "":
+            if entry is not None:
+                return None
+            continue
+        if entry is None:
+            return None
+        type_, count, data = _encode_value(name, value, bo)
+        old_length = TYPE_SIZES.get(entry.type, 1) * entry.count
+        if type_ == entry.type and count == entry.count and data == block.value_bytes(entry):
+            continue  # Already holds this value
+        if len(data) <= 4:
+            field = data.ljust(4, b"\x00")
+        elif old_length > 4 and len(data) <= old_length:
+            field = entry.field
+            value_offset = block._unpack("I", 0, entry.field)
+            value_writes.append((value_offset, data.ljust(old_length, b"\x00")))
+        else:
+            return None
+        entry_writes.append((entry.offset, struct.pack(bo + "HHI", tag, type_, count) + field))
+    return value_writes + entry_writes
+
+
+def _patch_in_place(file_path: str, tags: Dict[str, str]) -> bool:
+    """Overwrites changed values inside the existing metadata; returns False if they do not fit."""
+    with open(file_path, "r+b") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            block = _find_tiff_block(mm)
+            if block is None:
+                return False
+            patches = _plan_patches(block, tags)
+            start = block.start
+            del block
+        if patches is None:
+            return False
+        for offset, data in patches:
+            f.seek(start + offset)
+            f.write(data)
+        f.flush()
+    return True
+
+
+def _appended_area(block: _TiffBlock, size: int) -> Optional[tuple[int, int]]:
+    """
+    Finds the IFDs appended by an earlier save, if the header still points at them.
+
+    Returns:
+        The original end of the file and the start of the live appended area, or None
+        if IFD0 was not appended by this module or anything follows it.
+    """
+    start = block.ifd0_offset - APPEND_HEADER_LENGTH
+    if start < 8 or bytes(block.buf[start:start + len(APPEND_MARKER)]) != APPEND_MARKER:
+        return None
+    original_end = block._unpack("I", start + len(APPEND_MARKER))
+    length = block._unpack("I", start + len(APPEND_MARKER) + 4)
+    if not 8 <= original_end <= start or block.ifd0_offset + length != size:
+        return None
+    return original_end, start
+
+
+def _write_tiff(file_path: str, tags: Dict[str, str]) -> None:
+    """
+    Appends updated IFDs to a TIFF file and repoints its header at them.
+
+    The area of earlier appended IFDs is reused when the new ones fit in the dead space
+    before the live area, and the file is then truncated after them.
+    """
+    with open(file_path, "r+b") as f:
+        size = os.fstat(f.fileno()).st_size
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            block = _TiffBlock(mm, 0, size)
+            appended = _appended_area(block, size)
+            if appended is not None:
+                original_end, live_start = appended
+                start = original_end
+                area, ifd0_offset = _build_ifds(block, tags, start + APPEND_HEADER_LENGTH, original_end)
+                if start + APPEND_HEADER_LENGTH + len(area) > live_start:
+                    start = size + (size % 2)
+                    area, ifd0_offset = _build_ifds(block, tags, start + APPEND_HEADER_LENGTH, original_end)
+            else:
+                original_end = start = size + (size % 2)
+                area, ifd0_offset = _build_ifds(block, tags, start + APPEND_HEADER_LENGTH)
+            byte_order = block.byte_order
+            del block
+        header = APPEND_MARKER + struct.pack(byte_order + "II", original_end, len(area))
+        f.seek(min(start, size))
+        f.write(b"\x00" * max(start - size, 0) + header + area)
+        f.flush()
+        # The header write is the commit point: until it happens the file is unchanged
+        f.seek(4)
+        f.write(struct.pack(byte_order + "I", ifd0_offset))
+        f.flush()
+        end = start + APPEND_HEADER_LENGTH + len(area)
+        if end < size:
+            f.truncate(end)  # Drop the IFDs the header no longer points at
+
+
+def _write_jpeg(file_path: str, tags: Dict[str, str]) -> None:
+    """Rebuilds the Exif APP1 segment of a JPEG file and atomically replaces the file."""
+    with open(file_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            segment, insert_at = _find_exif_segment(mm)
+            if segment is not None:
+                seg_start, seg_end = segment
+                tiff = bytearray(mm[seg_start + 4 + len(EXIF_HEADER):seg_end])
+            else:
+                seg_start = seg_end = insert_at
+                # An empty little-endian TIFF structure: header plus an IFD0 with no entries
+                tiff = bytearray(b"II*\x00" + struct.pack("<I", 8) + b"\x00" * 6)
+            block = _TiffBlock(bytes(tiff), 0, len(tiff))
+            appended = _appended_area(block, len(tiff))
+            if appended is not None:
+                # The segment is rebuilt anyway, so the IFDs of earlier saves are dropped
+                original_end = appended[0]
+                area, ifd0_offset = _build_ifds(block, tags, original_end + APPEND_HEADER_LENGTH, original_end)
+            else:
+                original_end = len(tiff) + (len(tiff) % 2)
+                area, ifd0_offset = _build_ifds(block, tags, original_end + APPEND_HEADER_LENGTH)
+            header = APPEND_MARKER + struct.pack(block.byte_order + "II", original_end, len(area))
+            tiff = tiff[:original_end].ljust(original_end, b"\x00") + header + area
+            struct.pack_into(block.byte_order + "I", tiff, 4, ifd0_offset)
+            payload = EXIF_HEADER + bytes(tiff)
+            if len(payload) + 2 > APP1_MAX_LENGTH:
+                raise NativeExifUnsupported("Exif data does not fit in one APP1 segment")
+            app1 = b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload
+
+            directory = os.path.dirname(os.path.abspath(file_path))
+            fd, temp_path = tempfile.mkstemp(prefix=".timestamper-", suffix=".jpg", dir=directory)
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    out.write(mm[:seg_start])
+                    out.write(app1)
+                    out.write(mm[seg_end:])
+                shutil.copymode(file_path, temp_path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+    os.replace(temp_path, file_path)
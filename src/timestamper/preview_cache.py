@@ -0,0 +1,115 @@
+"""An in-memory LRU cache of decoded preview images for the Timestamper application."""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QImage
+
+from .metadata_cache import FileSignature, file_signature, normalize_path
+
+logger = logging.getLogger(__name__)
+
+
+class _PreviewEntry(NamedTuple):
+    signature: Optional[FileSignature]
+    image: QImage
+    size: Optional[QSize]  # The bounds the image was decoded to fit
+
+
+class PreviewCache:
+    """
+    A thread-safe LRU cache of decoded preview sources, bounded by their size in bytes.
+
+    Each image is decoded once at the largest size the preview pane can show; resizing
+    the pane rescales it from memory. Like MetadataCache, every entry remembers the
+    file's signature, so a file changed on disk is decoded again. Entries also remember
+    the size they were decoded for, so a preview is decoded again rather than upscaled
+    when a larger one is needed, such as after moving to a higher-density screen.
+    """
+
+    def __init__(self, max_bytes: int):
+        """Initializes an empty cache with the given byte budget."""
+        self.max_bytes = max(1, max_bytes)
+        self._entries: "OrderedDict[str, _PreviewEntry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Returns the number of cached previews."""
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Returns the size of all cached images."""
+        return self._bytes
+
+    def get(
+        self, file_path: str, signature: Optional[FileSignature] = None, size: Optional[QSize] = None
+    ) -> Optional[QImage]:
+        """
+        Returns the cached preview of a file if it is unchanged on disk.
+
+        Args:
+            file_path: The file to look up.
+            signature: The file's current signature, if the caller already has it.
+            size: The bounds the preview is needed for; a preview decoded for smaller
+                bounds is not returned.
+        """
+        key = normalize_path(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or not _covers(entry.size, size):
+            return None
+        if signature is None:
+            signature = file_signature(file_path)
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return None
+            if entry.signature != signature:
+                logger.debug(f'Cached preview of "{file_path}" is stale')
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.image
+
+    def put(
+        self, file_path: str, image: QImage, signature: Optional[FileSignature], size: Optional[QSize] = None
+    ) -> None:
+        """
+        Caches a decoded preview, evicting the least recently used ones past the budget.
+
+        Args:
+            file_path: The file that was decoded.
+            image: The decoded preview.
+            signature: The file's signature taken *before* it was decoded.
+            size: The bounds the preview was decoded to fit, or None if unknown.
+        """
+        key = normalize_path(file_path)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _PreviewEntry(signature, image, size)
+            self._bytes += image.sizeInBytes()
+            while len(self._entries) > 1 and self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Forgets all cached previews."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        """Removes an entry; the lock must be held."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.image.sizeInBytes()
+
+
+def _covers(decoded: Optional[QSize], needed: Optional[QSize]) -> bool:
+    """Checks whether a preview decoded for ``decoded`` bounds serves ``needed`` ones."""
+    if needed is None or decoded is None:
+        return True
+    return decoded.width() >= needed.width() and decoded.height() >= needed.height()
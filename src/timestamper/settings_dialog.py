@@ -1,6 +1,18 @@
-from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QFileDialog, QLabel
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QFileDialog, QLabel, QSpinBox, QCheckBox, QComboBox
 from PySide6.QtCore import QSettings
 
+from .constants import (
+    EXIFTOOL_WORKERS_MAX,
+    METADATA_CACHE_MAX_BYTES,
+    METADATA_CACHE_MB_MAX,
+    SAVE_TARGET_EMBEDDED,
+    SAVE_TARGET_SIDECAR,
+    THUMBNAIL_CACHE_MAX_BYTES,
+    THUMBNAIL_CACHE_MB_MAX
+)
+from .exif_manager import default_worker_count
+from .utils import setting_to_bool
+
 class SettingsDialog(QDialog):
     """A dialog for configuring application settings."""
 
@@ -14,6 +26,9 @@ class SettingsDialog(QDialog):
         self.setLayout(self.layout)
 
         self._create_exiftool_widgets()
+        self._create_worker_widgets()
+        self._create_save_target_widgets()
+        self._create_save_button()
 
     def _create_exiftool_widgets(self):
         """Creates widgets for configuring the exiftool path."""
@@ -39,6 +54,87 @@ class SettingsDialog(QDialog):
 
         self.layout.addLayout(exiftool_layout)
 
+    def _create_worker_widgets(self):
+        """Creates widgets for configuring the exiftool workers and the metadata and thumbnail caches."""
+        workers_layout = QHBoxLayout()
+        label = QLabel("exiftool workers:")
+        label.setToolTip("Number of exiftool processes used to read and write files in parallel.")
+        workers_layout.addWidget(label)
+
+        self.exiftool_workers_spin = QSpinBox()
+        self.exiftool_workers_spin.setRange(1, EXIFTOOL_WORKERS_MAX)
+        self.exiftool_workers_spin.setValue(int(self.settings.value("exiftool_workers", default_worker_count())))
+        workers_layout.addWidget(self.exiftool_workers_spin)
+
+        self.layout.addLayout(workers_layout)
+
+        cache_layout = QHBoxLayout()
+        label = QLabel("Metadata cache (MB):")
+        label.setToolTip("Memory used to keep the metadata of recently viewed files.")
+        cache_layout.addWidget(label)
+
+        self.metadata_cache_spin = QSpinBox()
+        self.metadata_cache_spin.setRange(1, METADATA_CACHE_MB_MAX)
+        self.metadata_cache_spin.setValue(
+            int(self.settings.value("metadata_cache_mb", METADATA_CACHE_MAX_BYTES // (1024 * 1024)))
+        )
+        cache_layout.addWidget(self.metadata_cache_spin)
+
+        self.layout.addLayout(cache_layout)
+
+        thumbnail_cache_layout = QHBoxLayout()
+        label = QLabel("Thumbnail cache (MB):")
+        label.setToolTip("Disk space used to keep thumbnails, so reopened folders need no decoding.")
+        thumbnail_cache_layout.addWidget(label)
+
+        self.thumbnail_cache_spin = QSpinBox()
+        self.thumbnail_cache_spin.setRange(1, THUMBNAIL_CACHE_MB_MAX)
+        self.thumbnail_cache_spin.setValue(
+            int(self.settings.value("thumbnail_cache_mb", THUMBNAIL_CACHE_MAX_BYTES // (1024 * 1024)))
+        )
+        thumbnail_cache_layout.addWidget(self.thumbnail_cache_spin)
+
+        self.layout.addLayout(thumbnail_cache_layout)
+
+        self.native_exif_check = QCheckBox("Read and write JPEG/TIFF EXIF without exiftool")
+        self.native_exif_check.setToolTip("Faster; files this cannot handle still use exiftool.")
+        self.native_exif_check.setChecked(setting_to_bool(self.settings.value("native_exif", True)))
+        self.layout.addWidget(self.native_exif_check)
+
+        self.process_decoding_check = QCheckBox("Decode thumbnails and previews in separate processes")
+        self.process_decoding_check.setToolTip(
+            "Uses every core when scanning large folders, at the cost of memory for one process per core."
+        )
+        self.process_decoding_check.setChecked(setting_to_bool(self.settings.value("process_decoding", False)))
+        self.layout.addWidget(self.process_decoding_check)
+
+    def _create_save_target_widgets(self):
+        """Creates widgets for choosing where the form tags are saved."""
+        target_layout = QHBoxLayout()
+        label = QLabel("Save metadata to:")
+        label.setToolTip(
+            "An XMP sidecar leaves the image untouched, so saving large scans costs a few KB."
+        )
+        target_layout.addWidget(label)
+
+        self.save_target_combo = QComboBox()
+        self.save_target_combo.addItem("Image file (EXIF)", SAVE_TARGET_EMBEDDED)
+        self.save_target_combo.addItem("XMP sidecar file", SAVE_TARGET_SIDECAR)
+        index = self.save_target_combo.findData(self.settings.value("save_target", SAVE_TARGET_EMBEDDED))
+        self.save_target_combo.setCurrentIndex(max(index, 0))
+        target_layout.addWidget(self.save_target_combo)
+
+        self.layout.addLayout(target_layout)
+
+        self.verify_payload_check = QCheckBox("Verify image data after saving")
+        self.verify_payload_check.setToolTip(
+            "Hashes the JPEG/TIFF image data before and after each write and flags files where it changed."
+        )
+        self.verify_payload_check.setChecked(setting_to_bool(self.settings.value("verify_payload", False)))
+        self.layout.addWidget(self.verify_payload_check)
+
+    def _create_save_button(self):
+        """Creates the button that saves the settings."""
         save_button = QPushButton("Save")
         save_button.setObjectName("save_button")
         save_button.clicked.connect(self.save_settings)
@@ -56,4 +152,11 @@ class SettingsDialog(QDialog):
     def save_settings(self):
         """Saves the settings and closes the dialog."""
         self.settings.setValue("exiftool", self.exiftool_path_edit.text())
+        self.settings.setValue("exiftool_workers", self.exiftool_workers_spin.value())
+        self.settings.setValue("native_exif", self.native_exif_check.isChecked())
+        self.settings.setValue("process_decoding", self.process_decoding_check.isChecked())
+        self.settings.setValue("metadata_cache_mb", self.metadata_cache_spin.value())
+        self.settings.setValue("thumbnail_cache_mb", self.thumbnail_cache_spin.value())
+        self.settings.setValue("save_target", self.save_target_combo.currentData())
+        self.settings.setValue("verify_payload", self.verify_payload_check.isChecked())
         self.accept()
@@ -0,0 +1,281 @@
+"""A persistent cache of encoded thumbnails in a pack file for the Timestamper application."""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from os import path
+from typing import NamedTuple, Optional
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QSize
+from PySide6.QtGui import QImage
+
+from .metadata_cache import normalize_path
+
+logger = logging.getLogger(__name__)
+
+PACK_MAGIC = b"TSTC"
+PACK_HEADER = struct.Struct("<4sHI")  # Magic, key length, image length
+INDEX_VERSION = 1
+JPEG_QUALITY = 85
+# Compaction only pays off once the pack holds at least this much dead space
+COMPACT_MIN_BYTES = 1024 * 1024
+
+
+class _PackEntry(NamedTuple):
+    mtime_ns: int
+    offset: int  # Start of the record in the pack file
+    length: int  # Length of the whole record, header included
+
+
+class ThumbnailCache:
+    """
+    A thread-safe LRU cache of thumbnails, keyed by (path, thumbnail size, mtime).
+
+    Thumbnails are stored as JPEG (PNG if they have an alpha channel) records appended
+    to a pack file, which is read through mmap, so a hit costs decoding a few KB and no
+    look at the source image. The index of live records is kept in memory in LRU order
+    and written next to the pack on close; records appended after the index was last
+    written are recovered by scanning the pack. Replaced and evicted records stay in the
+    pack as dead space until it outgrows the live data, when the pack is compacted.
+    """
+
+    def __init__(self, pack_path: str, max_bytes: int):
+        """
+        Opens (or creates) the pack file and its index.
+
+        Raises:
+            OSError: If the pack file cannot be opened.
+        """
+        self.pack_path = pack_path
+        self.index_path = pack_path + ".index"
+        self.max_bytes = max(1, max_bytes)
+        self._entries: "OrderedDict[tuple[str, int, int], _PackEntry]" = OrderedDict()
+        self._live_bytes = 0
+        self._lock = threading.Lock()
+        self._map: Optional[mmap.mmap] = None
+        self._file = open(pack_path, "a+b")
+        try:
+            self._load_index()
+        except BaseException:
+            self._file.close()
+            raise
+        logger.info(f'Opened thumbnail cache "{pack_path}" with {len(self._entries)} thumbnails')
+
+    def __len__(self) -> int:
+        """Returns the number of cached thumbnails."""
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Returns the size of the live records in the pack."""
+        return self._live_bytes
+
+    def get(self, file_path: str, size: QSize, mtime_ns: int) -> Optional[QImage]:
+        """Returns the cached thumbnail of a file if it was made at ``mtime_ns``, or None."""
+        key = (normalize_path(file_path), size.width(), size.height())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._file.closed:
+                return None
+            if entry.mtime_ns != mtime_ns:
+                self._remove(key)
+                return None
+            data = self._read_record(entry, key)
+            if data is None:
+                logger.debug(f'Thumbnail record for "{file_path}" is unreadable')
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+        image = QImage.fromData(data)
+        return None if image.isNull() else image
+
+    def put(self, file_path: str, size: QSize, mtime_ns: int, image: QImage) -> None:
+        """Encodes and appends a thumbnail, evicting the least recently used ones if needed."""
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        if image.hasAlphaChannel():
+            image.save(buffer, "PNG")
+        else:
+            image.save(buffer, "JPG", JPEG_QUALITY)
+        key = (normalize_path(file_path), size.width(), size.height())
+        record_key = json.dumps([*key, mtime_ns]).encode("utf-8")
+        record = PACK_HEADER.pack(PACK_MAGIC, len(record_key), data.size()) + record_key + bytes(data)
+        with self._lock:
+            if self._file.closed:
+                return
+            try:
+                offset = self._file.seek(0, os.SEEK_END)
+                self._file.write(record)
+                self._file.flush()
+            except OSError as e:
+                logger.error(f"Error writing thumbnail cache: {e}")
+                return
+            self._remove(key)
+            self._entries[key] = _PackEntry(mtime_ns, offset, len(record))
+            self._live_bytes += len(record)
+            while len(self._entries) > 1 and self._live_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+            dead_bytes = offset + len(record) - self._live_bytes
+            if dead_bytes > max(self._live_bytes, COMPACT_MIN_BYTES):
+                self._compact()
+
+    def close(self) -> None:
+        """Writes the index and closes the pack."""
+        with self._lock:
+            if self._file.closed:
+                return
+            try:
+                self._write_index()
+            except OSError as e:
+                logger.error(f"Error writing thumbnail cache index: {e}")
+            self._close_map()
+            self._file.close()
+
+    def _remove(self, key: tuple[str, int, int]) -> None:
+        """Drops an entry, leaving its record as dead space; the caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._live_bytes -= entry.length
+
+    def _read_record(self, entry: _PackEntry, key: tuple[str, int, int]) -> Optional[bytes]:
+        """Returns the image bytes of a record if it is intact and belongs to ``key``."""
+        end = entry.offset + entry.length
+        if self._map is None or len(self._map) < end:
+            self._close_map()
+            self._file.flush()
+            size = os.fstat(self._file.fileno()).st_size
+            if size < end:
+                return None
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, key_length, data_length = PACK_HEADER.unpack_from(self._map, entry.offset)
+        start = entry.offset + PACK_HEADER.size
+        if magic != PACK_MAGIC or PACK_HEADER.size + key_length + data_length != entry.length:
+            return None
+        try:
+            record_key = json.loads(self._map[start:start + key_length])
+        except ValueError:
+            return None
+        if record_key != [*key, entry.mtime_ns]:
+            return None
+        return self._map[start + key_length:end]
+
+    def _close_map(self) -> None:
+        """Unmaps the pack; the caller holds the lock."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _load_index(self) -> None:
+        """Loads the index, then recovers records appended after it was written."""
+        pack_size = os.fstat(self._file.fileno()).st_size
+        scan_from = 0
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION and index["pack_size"] <= pack_size:
+                for file_path, width, height, mtime_ns, offset, length in index["entries"]:
+                    self._entries[(file_path, width, height)] = _PackEntry(mtime_ns, offset, length)
+                    self._live_bytes += length
+                scan_from = index["pack_size"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f'Thumbnail cache index "{self.index_path}" is unreadable, rebuilding it: {e}')
+            self._entries.clear()
+            self._live_bytes = 0
+        if scan_from < pack_size:
+            self._scan(scan_from, pack_size)
+
+    def _scan(self, offset: int, pack_size: int) -> None:
+        """Indexes the records from ``offset`` on, cutting the pack at the first torn one."""
+        self._file.seek(offset)
+        while offset < pack_size:
+            header = self._file.read(PACK_HEADER.size)
+            if len(header) < PACK_HEADER.size:
+                break
+            magic, key_length, data_length = PACK_HEADER.unpack(header)
+            length = PACK_HEADER.size + key_length + data_length
+            if magic != PACK_MAGIC or offset + length > pack_size:
+                break
+            try:
+                file_path, width, height, mtime_ns = json.loads(self._file.read(key_length))
+            except (ValueError, TypeError):
+                break
+            self._file.seek(data_length, os.SEEK_CUR)
+            key = (file_path, width, height)
+            self._remove(key)
+            self._entries[key] = _PackEntry(mtime_ns, offset, length)
+            self._live_bytes += length
+            offset += length
+        if offset < pack_size:
+            logger.warning(f'Thumbnail cache "{self.pack_path}" has a torn record at {offset}, truncating')
+            self._file.truncate(offset)
+
+    def _write_index(self) -> None:
+        """Replaces the index file with the current entries; the caller holds the lock."""
+        self._file.flush()
+        index = {
+            "version": INDEX_VERSION,
+            "pack_size": os.fstat(self._file.fileno()).st_size,
+            "entries": [[*key, *entry] for key, entry in self._entries.items()],
+        }
+        fd, tmp = tempfile.mkstemp(dir=path.dirname(path.abspath(self.index_path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(index, f, separators=(",", ":"))
+            os.replace(tmp, self.index_path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def _compact(self) -> None:
+        """Rewrites the pack with only the live records; the caller holds the lock."""
+        fd, tmp = tempfile.mkstemp(dir=path.dirname(path.abspath(self.pack_path)), suffix=".tmp")
+        entries: "OrderedDict[tuple[str, int, int], _PackEntry]" = OrderedDict()
+        try:
+            with os.fdopen(fd, "wb") as out:
+                self._file.flush()
+                for key, entry in self._entries.items():
+                    self._file.seek(entry.offset)
+                    record = self._file.read(entry.length)
+                    if len(record) != entry.length:
+                        continue
+                    entries[key] = _PackEntry(entry.mtime_ns, out.tell(), entry.length)
+                    out.write(record)
+            self._close_map()
+            self._file.close()
+            os.replace(tmp, self.pack_path)
+        except BaseException as e:
+            if path.exists(tmp):
+                os.remove(tmp)
+            if self._file.closed:
+                self._file = open(self.pack_path, "a+b")
+            if isinstance(e, OSError):
+                logger.error(f"Error compacting thumbnail cache: {e}")
+                return
+            raise
+        self._file = open(self.pack_path, "a+b")
+        self._entries = entries
+        self._live_bytes = sum(entry.length for entry in entries.values())
+        logger.debug(f"Compacted thumbnail cache to {self._live_bytes} bytes")
+        try:
+            self._write_index()
+        except OSError as e:
+            logger.error(f"Error writing thumbnail cache index: {e}")
+
+
+def open_thumbnail_cache(pack_path: Optional[str], max_bytes: int) -> Optional[ThumbnailCache]:
+    """Opens the thumbnail cache, or returns None (logging why) if it is unavailable."""
+    if not pack_path:
+        return None
+    try:
+        return ThumbnailCache(pack_path, max_bytes)
+    except OSError as e:
+        logger.warning(f'Thumbnail cache "{pack_path}" unavailable, continuing without it: {e}')
+        return None
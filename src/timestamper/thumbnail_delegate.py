@@ -9,8 +9,9 @@ class ThumbnailDelegate(QStyledItemDelegate):
         """Returns the size hint for the item, adjusting for padding."""
         # Get the default size hint
         size = super().sizeHint(option, index)
-        # Set a fixed height to reduce vertical padding
-        size.setHeight(40)
+        # Set a fixed height to reduce vertical padding; the grid sizes its own cells
+        if not self.parent().isGridMode():
+            size.setHeight(40)
         return size
     def paint(self, painter, option, index):
         # Let the base class handle the default painting
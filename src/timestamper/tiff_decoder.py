@@ -0,0 +1,229 @@
+"""Memory-bounded decoding of large TIFF pages at reduced resolution.
+
+Film scans are often 16-bit TIFFs of several hundred megabytes, far too large to decode
+whole for a preview. These decoders stream the page's strips or tiles from a memory map
+a bounded number of rows at a time, average each block of factor × factor pixels with
+NumPy, and scale 16-bit samples to 8 bits, so only the reduced image is ever held.
+"""
+
+import logging
+import mmap
+import zlib
+from typing import Iterator, Optional
+
+import numpy as np
+from PySide6.QtGui import QImage
+
+from .native_exif import TiffPage
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_NONE = 1
+COMPRESSION_DEFLATE = (8, 32946)  # Adobe and legacy codes for zlib
+PREDICTOR_NONE, PREDICTOR_HORIZONTAL = 1, 2
+# Compressed input is fed to zlib in pieces of this size
+INFLATE_PIECE_BYTES = 1024 * 1024
+
+# (Photometric interpretation, samples per pixel) -> format of the decoded image
+_FORMATS = {
+    (1, 1): QImage.Format.Format_Grayscale8,  # BlackIsZero
+    (2, 3): QImage.Format.Format_RGB888,
+    (2, 4): QImage.Format.Format_RGBA8888,
+}
+
+
+def can_decode(page: TiffPage) -> bool:
+    """Checks that a page is interleaved 8- or 16-bit grey or RGB, uncompressed or Deflate."""
+    bits = set(page.bits_per_sample)
+    if (
+        (page.photometric, page.samples_per_pixel) not in _FORMATS
+        or page.planar_configuration != 1
+        or len(bits) != 1 or bits.pop() not in (8, 16)
+        or page.compression not in (COMPRESSION_NONE, *COMPRESSION_DEFLATE)
+        or page.predictor not in (PREDICTOR_NONE, PREDICTOR_HORIZONTAL)
+        or page.width <= 0 or page.height <= 0
+    ):
+        return False
+    if page.tile_offsets:
+        return (
+            page.tile_width > 0 and page.tile_length > 0
+            and len(page.tile_offsets) == len(page.tile_byte_counts)
+            == -(-page.width // page.tile_width) * -(-page.height // page.tile_length)
+        )
+    return (
+        bool(page.strip_offsets) and page.rows_per_strip > 0
+        and len(page.strip_offsets) == len(page.strip_byte_counts)
+    )
+
+
+def decode_reduced(file_path: str, page: TiffPage, factor: int, max_bytes: int) -> Optional[QImage]:
+    """
+    Decodes a TIFF page at 1/``factor`` of its size by averaging blocks of pixels.
+
+    Edge pixels that do not fill a whole block are dropped. Pages are read a bounded
+    number of rows (or one tile) at a time; the working buffers, on top of the reduced
+    image itself, stay within about ``max_bytes``.
+
+    Returns:
+        The reduced image, or None if the page cannot be decoded this way.
+    """
+    if factor < 1 or not can_decode(page) or page.width < factor or page.height < factor:
+        return None
+    dtype = np.dtype(np.uint8) if page.bits_per_sample[0] == 8 else np.dtype(page.byte_order + "u2")
+    averager = _BlockAverager(page.width, page.height, page.samples_per_pixel, factor)
+    try:
+        with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if page.tile_offsets:
+                _decode_tiles(mm, page, dtype, averager)
+            else:
+                _decode_strips(mm, page, dtype, averager, max_bytes)
+    except (OSError, ValueError, zlib.error) as e:
+        logger.debug(f'Could not decode TIFF page of "{file_path}": {e}')
+        return None
+    return averager.image(dtype.itemsize * 8, _FORMATS[(page.photometric, page.samples_per_pixel)])
+
+
+class _BlockAverager:
+    """Accumulates the sums of factor × factor blocks of pixels from regions decoded in any order."""
+
+    def __init__(self, width: int, height: int, samples: int, factor: int):
+        """Initializes the sums of a ``width`` × ``height`` image reduced by ``factor``."""
+        self.factor = factor
+        self.width = width // factor * factor  # Pixels covered by whole blocks
+        self.height = height // factor * factor
+        self.sums = np.zeros((height // factor, width // factor, samples), np.uint64)
+
+    def add(self, y: int, x: int, pixels: np.ndarray) -> None:
+        """Adds a decoded region of shape (rows, columns, samples) whose top-left pixel is (y, x)."""
+        pixels = pixels[:max(self.height - y, 0), :max(self.width - x, 0)]
+        if not pixels.size:
+            return
+        k = self.factor
+        # Reduce along each axis at the block boundaries inside the region
+        row_starts = self._block_starts(y, pixels.shape[0])
+        column_starts = self._block_starts(x, pixels.shape[1])
+        sums = np.add.reduceat(pixels, row_starts, axis=0, dtype=np.uint64)
+        sums = np.add.reduceat(sums, column_starts, axis=1)
+        self.sums[y // k:y // k + len(row_starts), x // k:x // k + len(column_starts)] += sums
+
+    def _block_starts(self, start: int, length: int) -> np.ndarray:
+        """Returns the offsets in a region of length ``length`` at ``start`` where blocks begin."""
+        first = -start % self.factor
+        starts = np.arange(first, length, self.factor)
+        return starts if first == 0 else np.concatenate(([0], starts))
+
+    def image(self, bits: int, image_format: QImage.Format) -> QImage:
+        """Returns the block averages as an 8-bit image."""
+        divisor = self.factor * self.factor * (257 if bits == 16 else 1)  # 65535 / 257 == 255
+        pixels = ((self.sums + divisor // 2) // divisor).astype(np.uint8)
+        height, width, samples = pixels.shape
+        image = QImage(pixels.tobytes(), width, height, width * samples, image_format)
+        return image.copy()  # Detach from the Python buffer
+
+
+def _decode_strips(mm: mmap.mmap, page: TiffPage, dtype: np.dtype, averager: _BlockAverager, max_bytes: int) -> None:
+    """Feeds the rows of a striped page to the averager, a bounded number at a time."""
+    samples = page.samples_per_pixel
+    row_bytes = page.width * samples * dtype.itemsize
+    # The raw rows, the predictor's copy and the 64-bit partial sums share the budget
+    chunk_rows = max(1, max_bytes // (row_bytes * 6))
+    for strip, (offset, byte_count) in enumerate(zip(page.strip_offsets, page.strip_byte_counts)):
+        y = strip * page.rows_per_strip
+        if y >= averager.height:
+            break
+        rows = min(page.rows_per_strip, page.height - y)
+        strip_end = y + rows
+        if page.compression == COMPRESSION_NONE:
+            if byte_count < rows * row_bytes or offset + rows * row_bytes > len(mm):
+                raise ValueError("Strip is truncated")
+            chunks = _read_uncompressed(mm, offset, rows * row_bytes, chunk_rows * row_bytes)
+        else:
+            chunks = _rechunk(_inflate(mm, offset, byte_count, chunk_rows * row_bytes), chunk_rows * row_bytes)
+        for data in chunks:
+            count = min(len(data) // row_bytes, strip_end - y)
+            if count <= 0:
+                break
+            pixels = np.frombuffer(data, dtype, count * page.width * samples).reshape(count, page.width, samples)
+            averager.add(y, 0, _undo_predictor(pixels, page))
+            y += count
+
+
+def _decode_tiles(mm: mmap.mmap, page: TiffPage, dtype: np.dtype, averager: _BlockAverager) -> None:
+    """Feeds the tiles of a tiled page to the averager one at a time."""
+    samples = page.samples_per_pixel
+    tile_bytes = page.tile_width * page.tile_length * samples * dtype.itemsize
+    tiles_across = -(-page.width // page.tile_width)
+    for index, (offset, byte_count) in enumerate(zip(page.tile_offsets, page.tile_byte_counts)):
+        y = index // tiles_across * page.tile_length
+        x = index % tiles_across * page.tile_width
+        if y >= averager.height or x >= averager.width:
+            continue
+        if page.compression == COMPRESSION_NONE:
+            if byte_count < tile_bytes or offset + tile_bytes > len(mm):
+                raise ValueError("Tile is truncated")
+            data = mm[offset:offset + tile_bytes]
+            _release(mm, offset, offset + tile_bytes)
+        else:
+            data = b"".join(_inflate(mm, offset, byte_count, tile_bytes))
+        if len(data) < tile_bytes:
+            raise ValueError("Tile is truncated")
+        pixels = np.frombuffer(data, dtype, tile_bytes // dtype.itemsize)
+        averager.add(y, x, _undo_predictor(pixels.reshape(page.tile_length, page.tile_width, samples), page))
+
+
+def _undo_predictor(pixels: np.ndarray, page: TiffPage) -> np.ndarray:
+    """Reverses horizontal differencing, which stores each sample as the difference to its left neighbour."""
+    if page.predictor != PREDICTOR_HORIZONTAL or page.compression == COMPRESSION_NONE:
+        return pixels
+    return np.cumsum(pixels, axis=1, dtype=pixels.dtype)  # Wraps around like the encoder's subtraction
+
+
+def _read_uncompressed(mm: mmap.mmap, offset: int, length: int, chunk_bytes: int) -> Iterator[bytes]:
+    """Yields a range of the map in chunks, dropping each one's pages once it has been copied."""
+    for start in range(offset, offset + length, chunk_bytes):
+        end = min(start + chunk_bytes, offset + length)
+        data = mm[start:end]
+        _release(mm, start, end)
+        yield data
+
+
+def _inflate(mm: mmap.mmap, offset: int, length: int, max_output: int) -> Iterator[bytes]:
+    """Yields the decompressed contents of a zlib stream in pieces of at most ``max_output`` bytes."""
+    if offset + length > len(mm):
+        raise ValueError("Compressed data is truncated")
+    decompressor = zlib.decompressobj()
+    for start in range(offset, offset + length, INFLATE_PIECE_BYTES):
+        end = min(start + INFLATE_PIECE_BYTES, offset + length)
+        data = mm[start:end]
+        _release(mm, start, end)
+        while data and not decompressor.eof:
+            output = decompressor.decompress(data, max_output)
+            if output:
+                yield output
+            data = decompressor.unconsumed_tail
+        if decompressor.eof:
+            break
+    output = decompressor.flush()
+    if output:
+        yield output
+
+
+def _rechunk(pieces: Iterator[bytes], chunk_bytes: int) -> Iterator[bytes]:
+    """Regroups a stream of byte strings into chunks of ``chunk_bytes`` (the last may be shorter)."""
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += piece
+        while len(buffer) >= chunk_bytes:
+            yield bytes(buffer[:chunk_bytes])
+            del buffer[:chunk_bytes]
+    if buffer:
+        yield bytes(buffer)
+
+
+def _release(mm: mmap.mmap, start: int, end: int) -> None:
+    """Lets the OS drop the mapped pages of a range that has been read, so they do not count as resident."""
+    if not hasattr(mmap, "MADV_DONTNEED"):
+        return
+    start -= start % mmap.PAGESIZE
+    if end > start:
+        mm.madvise(mmap.MADV_DONTNEED, start, end - start)
@@ -1,6 +1,6 @@
 """UI management for the Timestamper application."""
 
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import (
     QAbstractItemView,
@@ -17,7 +17,7 @@ from PySide6.QtWidgets import (
     QComboBox,
     QTreeWidget,
     QSplitter,
-    QListWidget,
+    QSlider,
     QStyle,
 )
 from datetime import datetime
@@ -26,10 +26,14 @@ from .constants import (
     IMAGE_PREVIEW_MAX_WIDTH,
     IMAGE_PREVIEW_MAX_HEIGHT,
     DONE_ICON,
-    DT_CONTROL_LIST
+    DT_CONTROL_LIST,
+    GRID_ICON_SIZE_MIN,
+    GRID_ICON_SIZE_MAX,
+    GRID_ICON_SIZE_DEFAULT,
 )
 from .OffsetSpinBox import DoubleOffsetSpinBox
-from .drag_drop_list_widget import DragDropListWidget
+from .drag_drop_list_view import DragDropListView
+from .file_list_model import FileListModel
 from .thumbnail_delegate import ThumbnailDelegate
 
 
@@ -54,20 +58,47 @@ class UIManager:
     
     def _create_file_widgets(self):
         """Create file list and related widgets."""
-        self.main_window.file_list = DragDropListWidget()
-        self.main_window.file_list.setViewMode(QListWidget.ListMode)
-        self.main_window.file_list.setIconSize(QSize(32, 32))
+        placeholder = self.main_window.style().standardIcon(QStyle.StandardPixmap.SP_FileIcon)
+        self.main_window.file_model = FileListModel(placeholder, self.main_window)
+        self.main_window.file_list = DragDropListView()
+        self.main_window.file_list.setModel(self.main_window.file_model)
+        self.main_window.file_list.setUniformItemSizes(True)
         self.main_window.file_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
-        self.main_window.file_list.itemSelectionChanged.connect(self.main_window.on_file_selection_changed)
+        self.main_window.file_list.selectionModel().selectionChanged.connect(
+            lambda *_: self.main_window.on_file_selection_changed()
+        )
         self.main_window.file_list.filesDropped.connect(self.main_window.onFilesDropped)
+        self.main_window.file_list.visibleRowsChanged.connect(self.main_window.on_visible_rows_changed)
         self.main_window.file_list.setItemDelegate(ThumbnailDelegate(self.main_window.file_list))
+        self.main_window.file_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.main_window.file_list.customContextMenuRequested.connect(self.main_window.on_file_list_context_menu)
         
         file_list_scroll = QScrollArea()
         file_list_scroll.setWidget(self.main_window.file_list)
         file_list_scroll.setWidgetResizable(True)
         self.main_window.file_list_scroll = file_list_scroll
+
+        # Thumbnail size of the grid view; hidden while the list is shown
+        slider = QSlider(Qt.Orientation.Horizontal)
+        slider.setRange(GRID_ICON_SIZE_MIN, GRID_ICON_SIZE_MAX)
+        slider.setSingleStep(16)
+        slider.setPageStep(32)
+        slider.setValue(int(self.settings.value("grid_icon_size", GRID_ICON_SIZE_DEFAULT)))
+        slider.setToolTip("Thumbnail size")
+        slider.valueChanged.connect(self.main_window.set_grid_icon_size)
+        self.main_window.thumbnail_size_slider = slider
+
+        file_pane = QWidget()
+        layout_file_pane = QVBoxLayout(file_pane)
+        layout_file_pane.setContentsMargins(0, 0, 0, 0)
+        layout_file_pane.addWidget(file_list_scroll, 1)
+        layout_file_pane.addWidget(slider)
+        self.main_window.file_pane = file_pane
         
         self.main_window.files_done = []
+        self.main_window.files_pending = {}  # row -> number of queued saves
+        self.main_window.files_failed = {}  # row -> tags of the failed save
+        self.main_window.files_mismatched = set()  # rows whose image data changed in a save
         self.main_window.done_icon = DONE_ICON
     
     def _create_image_widgets(self):
@@ -78,6 +109,7 @@ class UIManager:
         self.main_window.pic.setMaximumHeight(IMAGE_PREVIEW_MAX_HEIGHT)
         self.main_window.current_path = None
         self.main_window.current_exif = None
+        self.main_window.exif_info_path = None
     
     def _create_info_widgets(self):
         """Create EXIF info display widgets."""
@@ -198,10 +230,12 @@ class UIManager:
         """Set up all layouts and add widgets to the main window."""
         # Main horizontal splitter
         h_splitter = QSplitter(Qt.Horizontal)
-        h_splitter.addWidget(self.main_window.file_list_scroll)
+        h_splitter.addWidget(self.main_window.file_pane)
         h_splitter.addWidget(self.main_window.pic)
         h_splitter.addWidget(self.main_window.info_scroll)
         h_splitter.setSizes([200, 400, 200])
+        h_splitter.splitterMoved.connect(self.main_window.on_splitter_moved)
+        self.main_window.h_splitter = h_splitter
         
         # Main layout
         layout_main = QVBoxLayout()
@@ -0,0 +1,146 @@
+"""A journal of the tag values saves replaced, for undoing them in the Timestamper application."""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class UndoJournal:
+    """
+    A stack of saves, each recorded as the previous values of the tags it wrote.
+
+    Only the tags a save touched are recorded, and files whose previous values were
+    identical share one group, so a session of undo history costs kilobytes however
+    large the files are. Entries are kept as JSON lines in a file; only their offsets
+    are held in memory, and popping an entry truncates the file.
+    """
+
+    def __init__(self, journal_file, journal_path: Optional[str] = None):
+        """
+        Starts an empty journal.
+
+        Args:
+            journal_file: A binary file opened for reading and writing; its current
+                contents are discarded.
+            journal_path: The path of ``journal_file``, removed when the journal is
+                closed; None for anonymous files.
+        """
+        self._file = journal_file
+        self._path = journal_path
+        self._file.seek(0)
+        self._file.truncate()
+        self._offsets: List[int] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Returns the number of saves that can be undone."""
+        return len(self._offsets)
+
+    def record(self, previous: Dict[str, Dict[str, str]]) -> None:
+        """
+        Pushes a save.
+
+        Args:
+            previous: For each saved file, the value each written tag had before the
+                save; an empty string means the tag did not exist.
+        """
+        if not previous:
+            return
+        groups: Dict[str, List[str]] = {}
+        for file_path, values in previous.items():
+            groups.setdefault(json.dumps(values, sort_keys=True), []).append(file_path)
+        entry = [{"previous": json.loads(values), "files": files} for values, files in groups.items()]
+        line = json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n"
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            self._offsets.append(offset)
+
+    def pop(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """Removes the most recent save and returns its previous values by file, or None."""
+        with self._lock:
+            if not self._offsets:
+                return None
+            offset = self._offsets.pop()
+            self._file.seek(offset)
+            line = self._file.read()
+            self._file.seek(offset)
+            self._file.truncate()
+        previous = {}
+        for group in json.loads(line):
+            for file_path in group["files"]:
+                previous[file_path] = group["previous"]
+        return previous
+
+    def close(self) -> None:
+        """Closes the journal file and removes it; the history only lasts a session."""
+        with self._lock:
+            self._file.close()
+            if self._path:
+                try:
+                    os.remove(self._path)
+                except OSError as e:
+                    logger.warning(f'Could not remove undo journal "{self._path}": {e}')
+
+
+def remove_stale_journals(directory: str, filename_template: str) -> None:
+    """
+    Removes the journals of sessions that ended without closing them, such as by crashing.
+
+    Args:
+        directory: The folder holding the journals.
+        filename_template: The journal file name, with a ``{pid}`` field for the process
+            that owns it.
+    """
+    prefix, _, suffix = filename_template.partition("{pid}")
+    try:
+        names = os.listdir(directory)
+    except OSError as e:
+        logger.warning(f'Could not look for stale undo journals in "{directory}": {e}')
+        return
+    for name in names:
+        pid = name[len(prefix):len(name) - len(suffix)]
+        if not name.startswith(prefix) or not name.endswith(suffix) or not pid.isdigit():
+            continue
+        if int(pid) == os.getpid() or _process_exists(int(pid)):
+            continue
+        try:
+            os.remove(os.path.join(directory, name))
+            logger.info(f'Removed the undo journal of an ended session: "{name}"')
+        except OSError as e:
+            # On Windows a running session's journal is open, so it cannot be removed
+            logger.debug(f'Could not remove undo journal "{name}": {e}')
+
+
+def _process_exists(pid: int) -> bool:
+    """Checks whether a process is running; always False on Windows, where removal fails instead."""
+    if os.name == "nt":
+        return False  # os.kill would terminate the process
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Running, but owned by someone else
+    return True
+
+
+def open_undo_journal(journal_path: Optional[str]) -> UndoJournal:
+    """
+    Starts a session's undo journal, falling back to an anonymous temporary file.
+
+    The file at ``journal_path`` is emptied, so it must belong to this process alone.
+    """
+    if journal_path:
+        try:
+            return UndoJournal(open(journal_path, "w+b"), journal_path)
+        except OSError as e:
+            logger.warning(f'Undo journal "{journal_path}" unavailable, using a temporary file: {e}')
+    return UndoJournal(tempfile.TemporaryFile())
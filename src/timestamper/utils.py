@@ -1,6 +1,12 @@
 """Utility functions for the Timestamper application."""
 
 import logging
+import math
+import re
+from fractions import Fraction
+from typing import Any
+
+from .constants import NUMERIC_TAGS, OFFSET_TAGS, TAG_VALUE_REL_TOLERANCE
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +53,71 @@ def format_as_offset(x: float) -> str:
     return offset
 
 
+def setting_to_bool(value) -> bool:
+    """Converts a QSettings value to a bool; INI-backed settings return "true"/"false" strings."""
+    if isinstance(value, str):
+        return value.lower() in ("true", "1", "yes")
+    return bool(value)
+
+
+def _parse_tag_number(text: str) -> float | None:
+    """Parses a decimal or fraction string such as "2.8" or "1/250", or returns None."""
+    try:
+        return float(Fraction(text))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def _offset_minutes(text: str) -> int | None:
+    """Parses a timezone offset such as "+10:00", "-0530" or "Z" into minutes, or returns None."""
+    if text == "Z":
+        return 0
+    match = re.fullmatch(r"([+-])(\d{1,2}):?(\d{2})", text)
+    if not match:
+        return None
+    minutes = int(match.group(2)) * 60 + int(match.group(3))
+    return -minutes if match.group(1) == "-" else minutes
+
+
+def tag_values_equal(tag: str, current: Any, new: str) -> bool:
+    """
+    Checks whether a file already carries a value about to be written.
+
+    Args:
+        tag: The tag name, without group (e.g. "FNumber").
+        current: The file's value as read with exiftool's ``-n``, or None if it is missing.
+        new: The value to write; empty means the tag is to be removed.
+    """
+    new_text = str(new).strip()
+    current_text = "" if current is None else str(current).strip()
+    if current_text == new_text:
+        return True
+    if not current_text or not new_text:
+        return False
+    if tag in OFFSET_TAGS:
+        minutes = _offset_minutes(current_text)
+        return minutes is not None and minutes == _offset_minutes(new_text)
+    if tag == "DateTimeOriginal":
+        # "2023:01:01 12:00" equals "2023:01:01 12:00:00"; only the numbers matter
+        current_fields = [int(x) for x in re.findall(r"\d+", current_text)]
+        new_fields = [int(x) for x in re.findall(r"\d+", new_text)]
+        pad = max(len(current_fields), len(new_fields))
+        return current_fields + [0] * (pad - len(current_fields)) == new_fields + [0] * (pad - len(new_fields))
+    if tag in NUMERIC_TAGS:
+        current_parts = current_text.split()
+        new_parts = new_text.split()
+        if len(current_parts) != len(new_parts):
+            return False
+        for a, b in zip(current_parts, new_parts):
+            if a == b:
+                continue
+            x, y = _parse_tag_number(a), _parse_tag_number(b)
+            if x is None or y is None or not math.isclose(x, y, rel_tol=TAG_VALUE_REL_TOLERANCE, abs_tol=1e-9):
+                return False
+        return True
+    return False
+
+
 def validate_numeric_input(field_name: str, text_value: str) -> bool:
     """Validates that a given text value can be cast to a float."""
     if text_value == "":
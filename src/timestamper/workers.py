@@ -0,0 +1,366 @@
+"""Background tasks run on a QThreadPool for the Timestamper application."""
+
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional, Sequence
+
+from PySide6.QtCore import QObject, QRunnable, QSize, Qt, Signal
+from PySide6.QtGui import QImage
+
+from .constants import READ_PROFILE_FORM
+from .decode_pool import DecodePool
+from .exif_manager import ExifManager
+from .file_scanner import scan_images
+from .image_loader import load_scaled_image
+from .metadata_cache import FileSignature, file_signature
+from .preview_cache import PreviewCache
+from .thumbnail_cache import ThumbnailCache
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataPreloaderSignals(QObject):
+    """Signals emitted by a MetadataPreloader."""
+    progress = Signal(int, int)
+    finished = Signal()
+
+
+class MetadataPreloader(QRunnable):
+    """Reads the metadata of a working set of files into the ExifManager's metadata cache."""
+
+    def __init__(self, exif_manager: ExifManager, file_paths: list[str]):
+        """Initializes the preloader for the given files."""
+        super().__init__()
+        self.exif_manager = exif_manager
+        self.file_paths = list(file_paths)
+        self.signals = MetadataPreloaderSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stops the preload after the chunks currently being read."""
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        """Returns whether the preload has been cancelled."""
+        return self._cancelled.is_set()
+
+    def run(self) -> None:
+        """Reads the metadata in chunks, reporting progress after each one."""
+        try:
+            self.exif_manager.preload_exif_data(
+                self.file_paths,
+                progress_callback=self.signals.progress.emit,
+                is_cancelled=self.is_cancelled,
+            )
+        except Exception as e:
+            logger.error(f"Error preloading EXIF: {e}")
+        finally:
+            self.signals.finished.emit()
+
+
+class FolderScannerSignals(QObject):
+    """Signals emitted by a FolderScanner."""
+    found = Signal(list)
+    progress = Signal(int, int)  # Images found, folders scanned
+    finished = Signal(int, int)
+
+
+class FolderScanner(QRunnable):
+    """Searches files and folders for images recursively, emitting them in batches as they are found."""
+
+    def __init__(self, paths: list[str]):
+        """Initializes the scanner for the given files and folders."""
+        super().__init__()
+        self.paths = list(paths)
+        self.signals = FolderScannerSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stops the scan at the next folder entry."""
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        """Returns whether the scan has been cancelled."""
+        return self._cancelled.is_set()
+
+    def run(self) -> None:
+        """Walks the folders, emitting each batch of images and the progress so far."""
+        found = folders = 0
+        try:
+            for batch, folders in scan_images(self.paths, self.is_cancelled):
+                if self.is_cancelled():
+                    return
+                if batch:
+                    found += len(batch)
+                    self.signals.found.emit(batch)
+                self.signals.progress.emit(found, folders)
+        except Exception as e:
+            logger.error(f"Error scanning folders: {e}")
+        finally:
+            self.signals.finished.emit(found, folders)
+
+
+class ThumbnailLoaderSignals(QObject):
+    """Signals emitted by ThumbnailLoaders; one instance is shared by all loaders."""
+    loaded = Signal(str, QImage, int)
+
+
+class ThumbnailLoader(QRunnable):
+    """Decodes the thumbnails of a batch of files off the GUI thread."""
+
+    def __init__(
+        self,
+        jobs: Sequence[tuple[str, Callable[[], bool]]],
+        tier: int,
+        signals: ThumbnailLoaderSignals,
+        cache: Optional[ThumbnailCache] = None,
+        larger_tiers: Sequence[int] = (),
+        decode_pool: Optional[DecodePool] = None,
+    ):
+        """
+        Initializes the loader.
+
+        Args:
+            jobs: The images to decode, in order, each with a function that returns True
+                once its thumbnail is no longer wanted (the list was replaced, the row
+                scrolled far away, or larger thumbnails are now shown); checked before and
+                after decoding.
+            tier: The thumbnails are decoded to fit within a square of this size.
+            signals: Emits ``loaded(file_path, image, tier)`` for each thumbnail.
+            cache: Thumbnails are taken from here when the file is unchanged, and
+                stored here after decoding.
+            larger_tiers: Cached thumbnails of these sizes are scaled down rather than
+                decoding the file when there is none of ``tier`` itself.
+            decode_pool: Decodes the files in worker processes, if enabled.
+        """
+        super().__init__()
+        self.jobs = list(jobs)
+        self.tier = tier
+        self.signals = signals
+        self.cache = cache
+        self.larger_tiers = list(larger_tiers)
+        self.decode_pool = decode_pool
+
+    def run(self) -> None:
+        """Decodes (or fetches from the cache) each thumbnail and emits it, unless it was cancelled."""
+        for file_path, is_cancelled in self.jobs:
+            if is_cancelled():
+                continue
+            try:
+                image = self._load(file_path)
+            except Exception as e:
+                logger.error(f'Error loading thumbnail for "{file_path}": {e}')
+                continue
+            if not image.isNull() and not is_cancelled():
+                self.signals.loaded.emit(file_path, image, self.tier)
+
+    def _load(self, file_path: str) -> QImage:
+        """Returns the thumbnail of a file from the cache, scaled from a larger cached one, or decoded."""
+        size = QSize(self.tier, self.tier)
+        if self.cache is None:
+            return self._decode(file_path, size)
+        mtime_ns = os.stat(file_path).st_mtime_ns
+        image = self.cache.get(file_path, size, mtime_ns)
+        if image is not None:
+            return image
+        for tier in self.larger_tiers:
+            image = self.cache.get(file_path, QSize(tier, tier), mtime_ns)
+            if image is not None:
+                return image.scaled(
+                    size.boundedTo(image.size()), Qt.AspectRatioMode.KeepAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation,
+                )
+        image = self._decode(file_path, size)
+        if not image.isNull():
+            self.cache.put(file_path, size, mtime_ns, image)
+        return image
+
+    def _decode(self, file_path: str, size: QSize) -> QImage:
+        """Decodes a thumbnail in this thread or in the decode pool."""
+        if self.decode_pool is None:
+            return load_scaled_image(file_path, size)
+        # The queued signal copies the image in C++, which would not keep its shared memory mapped
+        return self.decode_pool.decode(file_path, size).copy()
+
+
+def cached_preview(
+    file_path: str,
+    signature: Optional[FileSignature],
+    size: QSize,
+    preview_cache: PreviewCache,
+    decode_pool: Optional[DecodePool] = None,
+) -> QImage:
+    """Returns a file's preview from the cache, or decodes it, in the decode pool if enabled, and caches it."""
+    image = preview_cache.get(file_path, signature, size)
+    if image is not None:
+        return image
+    if decode_pool is None:
+        image = load_scaled_image(file_path, size)
+    else:
+        image = decode_pool.decode(file_path, size)
+    if not image.isNull():
+        preview_cache.put(file_path, image, signature, size)
+    return image
+
+
+class PreviewLoaderSignals(QObject):
+    """Signals emitted by a PreviewLoader."""
+    finished = Signal()
+
+
+class PreviewLoader(QRunnable):
+    """
+    Decodes the preview of the selected file off the GUI thread.
+
+    The decoded image is left in ``image`` rather than passed through the signal, so a
+    preview decoded into shared memory by the decode pool reaches the GUI uncopied.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        size: QSize,
+        preview_cache: PreviewCache,
+        decode_pool: Optional[DecodePool] = None,
+    ):
+        """Initializes the loader for a file's preview decoded to fit within ``size``."""
+        super().__init__()
+        self.file_path = file_path
+        self.size = size
+        self.preview_cache = preview_cache
+        self.decode_pool = decode_pool
+        self.image = QImage()
+        self.signals = PreviewLoaderSignals()
+
+    def run(self) -> None:
+        """Decodes the preview into the preview cache and reports that ``image`` is ready."""
+        try:
+            self.image = cached_preview(
+                self.file_path, file_signature(self.file_path), self.size, self.preview_cache, self.decode_pool
+            )
+        except Exception as e:
+            logger.error(f'Error loading preview of "{self.file_path}": {e}')
+        finally:
+            self.signals.finished.emit()
+
+
+class Prefetcher(QRunnable):
+    """
+    Warms the caches for the files the user is likely to open next.
+
+    The metadata reads are queued on the exiftool workers first, then the previews are
+    decoded here in order, each one also providing the file's thumbnail. Cancelling
+    stops the decoding between files and drops the reads no worker has started.
+    """
+
+    def __init__(
+        self,
+        file_paths: list[str],
+        exif_manager: Optional[ExifManager],
+        preview_cache: PreviewCache,
+        preview_size: QSize,
+        thumbnail_cache: Optional[ThumbnailCache] = None,
+        thumbnail_size: Optional[QSize] = None,
+        decode_pool: Optional[DecodePool] = None,
+    ):
+        """
+        Initializes the prefetcher.
+
+        Args:
+            file_paths: The files to warm, most likely next first.
+            exif_manager: Reads the form tags into its metadata cache, if available.
+            preview_cache: Receives the decoded previews.
+            preview_size: The size previews are decoded at; it must match the preview pane's.
+            thumbnail_cache: Receives thumbnails scaled down from the previews, if available.
+            thumbnail_size: The size of the file list's thumbnails.
+            decode_pool: Decodes the previews in worker processes, if enabled.
+        """
+        super().__init__()
+        self.file_paths = list(file_paths)
+        self.exif_manager = exif_manager
+        self.preview_cache = preview_cache
+        self.preview_size = preview_size
+        self.thumbnail_cache = thumbnail_cache
+        self.thumbnail_size = thumbnail_size
+        self.decode_pool = decode_pool
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._futures: list[Future] = []
+
+    def cancel(self) -> None:
+        """Stops the prefetch after the file being decoded and drops queued metadata reads."""
+        self._cancelled.set()
+        with self._lock:
+            for future in self._futures:
+                future.cancel()
+            self._futures.clear()
+
+    def is_cancelled(self) -> bool:
+        """Returns whether the prefetch has been cancelled."""
+        return self._cancelled.is_set()
+
+    def run(self) -> None:
+        """Queues the metadata reads, then decodes the previews and thumbnails in order."""
+        if self.exif_manager is not None:
+            for file_path in self.file_paths:
+                with self._lock:
+                    if self.is_cancelled():
+                        return
+                    try:
+                        self._futures.append(self.exif_manager.submit_load(file_path, READ_PROFILE_FORM))
+                    except Exception as e:
+                        logger.error(f'Error prefetching EXIF for "{file_path}": {e}')
+        for file_path in self.file_paths:
+            if self.is_cancelled():
+                return
+            try:
+                self._prefetch_images(file_path)
+            except Exception as e:
+                logger.error(f'Error prefetching preview for "{file_path}": {e}')
+
+    def _prefetch_images(self, file_path: str) -> None:
+        """Decodes a file's preview into the preview cache and its thumbnail into the thumbnail cache."""
+        signature = file_signature(file_path)
+        if signature is None:
+            return
+        image = cached_preview(file_path, signature, self.preview_size, self.preview_cache, self.decode_pool)
+        if image.isNull():
+            return
+        if self.thumbnail_cache is None or self.thumbnail_size is None:
+            return
+        if self.thumbnail_cache.get(file_path, self.thumbnail_size, signature.mtime_ns) is None:
+            thumbnail = image.scaled(
+                self.thumbnail_size.boundedTo(image.size()),
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            )
+            self.thumbnail_cache.put(file_path, self.thumbnail_size, signature.mtime_ns, thumbnail)
+
+
+class FutureBridge(QObject):
+    """Delivers finished concurrent futures to callbacks on the thread that owns the bridge."""
+    finished = Signal(object, object)
+
+    def __init__(self, parent=None):
+        """Initializes the bridge; callbacks run on the thread of ``parent`` (the GUI thread)."""
+        super().__init__(parent)
+        self.finished.connect(self._on_finished)
+
+    def watch(self, future: Future, callback: Callable[[Future], None]) -> None:
+        """Calls ``callback(future)`` once the future is done, unless it was cancelled.
+
+        An already finished future is delivered immediately.
+        """
+        def emit(done: Future) -> None:
+            try:
+                self.finished.emit(done, callback)
+            except RuntimeError:
+                pass  # The bridge was deleted while the future was in flight
+        future.add_done_callback(emit)
+
+    def _on_finished(self, future: Future, callback: Callable[[Future], None]) -> None:
+        """Runs the callback of a finished future on the bridge's thread."""
+        if not future.cancelled():
+            callback(future)
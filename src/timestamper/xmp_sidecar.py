@@ -0,0 +1,339 @@
+"""
+XMP sidecar files for the Timestamper application.
+
+A sidecar holds the form tags in a small ``.xmp`` file next to the image, so saving
+them costs a few kilobytes however large the image is. Values use the standard XMP
+mappings of the EXIF tags (the ``tiff``, ``exif`` and ``exifEX`` namespaces); the time
+zone offset is folded into ``exif:DateTimeOriginal``, as XMP dates carry their own.
+"""
+
+import os
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+from fractions import Fraction
+from os import path
+from typing import Any, Dict, List, Optional
+
+from .constants import IMAGE_EXTENSIONS, OFFSET_TAGS, XMP_SIDECAR_EXTENSION
+from . import native_exif
+from .native_exif import NativeExifUnsupported
+
+X_NS = "adobe:ns:meta/"
+RDF_NS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+TIFF_NS = "http://ns.adobe.com/tiff/1.0/"
+EXIF_NS = "http://ns.adobe.com/exif/1.0/"
+EXIFEX_NS = "http://cipa.jp/exif/1.0/"
+
+_PREFIXES = {"x": X_NS, "rdf": RDF_NS, "tiff": TIFF_NS, "exif": EXIF_NS, "exifEX": EXIFEX_NS}
+# Namespaces other applications commonly leave in sidecars, so a rewrite keeps their
+# prefixes. ElementTree's prefix table is process-wide, so it is only filled at import;
+# any other namespace is written with a generated prefix, which XMP readers accept.
+_FOREIGN_PREFIXES = {
+    "xmp": "http://ns.adobe.com/xap/1.0/",
+    "xmpMM": "http://ns.adobe.com/xap/1.0/mm/",
+    "xmpRights": "http://ns.adobe.com/xap/1.0/rights/",
+    "stEvt": "http://ns.adobe.com/xap/1.0/sType/ResourceEvent#",
+    "stRef": "http://ns.adobe.com/xap/1.0/sType/ResourceRef#",
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "photoshop": "http://ns.adobe.com/photoshop/1.0/",
+    "crs": "http://ns.adobe.com/camera-raw-settings/1.0/",
+    "aux": "http://ns.adobe.com/exif/1.0/aux/",
+    "lr": "http://ns.adobe.com/lightroom/1.0/",
+    "Iptc4xmpCore": "http://iptc.org/std/Iptc4xmpCore/1.0/xmlns/",
+    "Iptc4xmpExt": "http://iptc.org/std/Iptc4xmpExt/2008-02-29/",
+    "darktable": "http://darktable.sf.net/",
+    "digiKam": "http://www.digikam.org/ns/1.0/",
+}
+
+# Form tag -> (namespace, XMP property, value kind)
+SIDECAR_TAGS: Dict[str, tuple[str, str, str]] = {
+    "Make": (TIFF_NS, "Make", "text"),
+    "Model": (TIFF_NS, "Model", "text"),
+    "DateTimeOriginal": (EXIF_NS, "DateTimeOriginal", "date"),
+    "ExposureTime": (EXIF_NS, "ExposureTime", "rational"),
+    "FNumber": (EXIF_NS, "FNumber", "rational"),
+    "ISO": (EXIF_NS, "ISOSpeedRatings", "integer-seq"),
+    "ShutterSpeedValue": (EXIF_NS, "ShutterSpeedValue", "rational"),
+    "MaxApertureValue": (EXIF_NS, "MaxApertureValue", "rational"),
+    "FocalLength": (EXIF_NS, "FocalLength", "rational"),
+    "LensInfo": (EXIFEX_NS, "LensSpecification", "rational-seq"),
+    "LensMake": (EXIFEX_NS, "LensMake", "text"),
+    "LensModel": (EXIFEX_NS, "LensModel", "text"),
+    "LensSerialNumber": (EXIFEX_NS, "LensSerialNumber", "text"),
+}
+
+_EXIF_DATE = re.compile(r"(\d{4}):(\d{2}):(\d{2})[ T](\d{2}):(\d{2})(?::(\d{2}))?(\.\d+)?")
+_XMP_DATE = re.compile(
+    r"(\d{4})(?:-(\d{2})(?:-(\d{2})(?:T(\d{2}):(\d{2})(?::(\d{2}))?(\.\d+)?)?)?)?"
+    r"(Z|[+-]\d{2}:\d{2})?$"
+)
+_OFFSET = re.compile(r"[+-]\d{2}:\d{2}$")
+
+
+class XmpSidecarError(Exception):
+    """Raised when a sidecar cannot be parsed or a value cannot be stored in one."""
+    pass
+
+
+def sidecar_path(file_path: str) -> str:
+    """
+    Returns the sidecar of an image.
+
+    It is named like exiftool and Lightroom name them (``IMG_0001.xmp``), unless another
+    image shares the name, such as a JPEG next to its TIFF scan; then each image gets its
+    own sidecar named like darktable names them (``IMG_0001.jpg.xmp``). A sidecar with
+    that longer name is always used once it exists.
+    """
+    full_name = file_path + XMP_SIDECAR_EXTENSION
+    stem, extension = path.splitext(file_path)
+    if path.exists(full_name) or _has_namesake(stem, extension):
+        return full_name
+    return stem + XMP_SIDECAR_EXTENSION
+
+
+def _has_namesake(stem: str, extension: str) -> bool:
+    """Checks whether an image with another extension shares the name of an image."""
+    return any(
+        path.exists(stem + other) or path.exists(stem + other.upper())
+        for other in IMAGE_EXTENSIONS if other != extension.lower()
+    )
+
+
+def read_sidecar(file_path: str) -> Dict[str, Any]:
+    """
+    Reads the form tags stored in an image's sidecar.
+
+    Returns:
+        An ``EXIF:<Tag>`` key for every form tag in the sidecar, with values shaped like
+        exiftool's ``-n`` output; empty if there is no sidecar.
+
+    Raises:
+        XmpSidecarError: If the sidecar is not valid XMP.
+        OSError: If the sidecar exists but cannot be read.
+    """
+    try:
+        root = _parse(sidecar_path(file_path))
+    except FileNotFoundError:
+        return {}
+    exif_data: Dict[str, Any] = {}
+    for name, (ns, prop, kind) in SIDECAR_TAGS.items():
+        raw = _get_property(root, ns, prop)
+        if raw is None:
+            continue
+        try:
+            if kind == "date":
+                date_time, offset = _from_xmp_date(raw)
+                exif_data[f"EXIF:{name}"] = date_time
+                if offset:
+                    exif_data["EXIF:OffsetTimeOriginal"] = offset
+                    exif_data["EXIF:OffsetTime"] = offset
+            else:
+                exif_data[f"EXIF:{name}"] = _decode(name, kind, raw)
+        except (ValueError, ZeroDivisionError) as e:
+            raise XmpSidecarError(f"Invalid {prop} {raw!r} in sidecar") from e
+    return exif_data
+
+
+def write_sidecar(file_path: str, tags: Dict[str, str]) -> None:
+    """
+    Writes form tags to an image's sidecar, creating it if needed.
+
+    Only the given tags are changed; everything else already in the sidecar, such as
+    another application's develop settings, is kept. An empty value removes the tag.
+    The sidecar is replaced atomically, and the image itself is never opened.
+
+    Raises:
+        XmpSidecarError: If a tag is unknown, a value cannot be stored (including an
+            offset when neither ``tags`` nor the sidecar has a date to carry it), or the
+            existing sidecar is not valid XMP.
+        OSError: If the sidecar cannot be read or written.
+    """
+    for name in tags:
+        # Offsets are stored as part of exif:DateTimeOriginal rather than on their own
+        if name not in SIDECAR_TAGS and name not in OFFSET_TAGS:
+            raise XmpSidecarError(f"Tag {name} cannot be stored in a sidecar")
+    target = sidecar_path(file_path)
+    try:
+        root = _parse(target)
+    except FileNotFoundError:
+        root = _new_packet()
+    description = _first_description(root)
+
+    date_tags = {"DateTimeOriginal", *OFFSET_TAGS}
+    if date_tags & tags.keys():
+        ns, prop, _ = SIDECAR_TAGS["DateTimeOriginal"]
+        old = _get_property(root, ns, prop)
+        try:
+            old_date, old_offset = _from_xmp_date(old) if old else ("", "")
+        except ValueError:
+            old_date, old_offset = "", ""
+        date_time = tags.get("DateTimeOriginal", old_date)
+        offset = tags.get("OffsetTimeOriginal", tags.get("OffsetTime", old_offset))
+        if not date_time and offset and OFFSET_TAGS & tags.keys():
+            raise XmpSidecarError("A time zone offset cannot be stored without DateTimeOriginal")
+        _remove_property(root, ns, prop)
+        if date_time:
+            _add_text(description, ns, prop, _to_xmp_date(date_time, offset))
+
+    for name, value in tags.items():
+        if name in date_tags:
+            continue
+        ns, prop, kind = SIDECAR_TAGS[name]
+        _remove_property(root, ns, prop)
+        if value == "":
+            continue
+        try:
+            if kind == "text":
+                _add_text(description, ns, prop, value)
+            elif kind == "rational":
+                _add_text(description, ns, prop, _format_rationals(name, value)[0])
+            elif kind == "rational-seq":
+                _add_seq(description, ns, prop, _format_rationals(name, value))
+            else:
+                _add_seq(description, ns, prop, [str(int(float(value)))])
+        except (NativeExifUnsupported, ValueError, OverflowError) as e:
+            raise XmpSidecarError(f"Cannot store {name}={value!r} in a sidecar: {e}") from e
+
+    _write_atomic(target, root)
+
+
+def _parse(sidecar: str) -> ET.Element:
+    """Parses a sidecar into its root element."""
+    try:
+        root = ET.parse(sidecar).getroot()
+    except ET.ParseError as e:
+        raise XmpSidecarError(f'Invalid XMP sidecar "{sidecar}": {e}') from e
+    if root.tag == f"{{{RDF_NS}}}RDF":
+        return root
+    if root.tag == f"{{{X_NS}}}xmpmeta" and root.find(f"{{{RDF_NS}}}RDF") is not None:
+        return root
+    raise XmpSidecarError(f'"{sidecar}" is not an XMP sidecar')
+
+
+def _new_packet() -> ET.Element:
+    """Returns an empty XMP packet with one rdf:Description."""
+    root = ET.Element(f"{{{X_NS}}}xmpmeta")
+    rdf = ET.SubElement(root, f"{{{RDF_NS}}}RDF")
+    ET.SubElement(rdf, f"{{{RDF_NS}}}Description", {f"{{{RDF_NS}}}about": ""})
+    return root
+
+
+def _descriptions(root: ET.Element) -> List[ET.Element]:
+    """Returns every rdf:Description of a packet."""
+    return list(root.iter(f"{{{RDF_NS}}}Description"))
+
+
+def _first_description(root: ET.Element) -> ET.Element:
+    """Returns the rdf:Description new properties are added to, creating it if needed."""
+    descriptions = _descriptions(root)
+    if descriptions:
+        return descriptions[0]
+    rdf = root if root.tag == f"{{{RDF_NS}}}RDF" else root.find(f"{{{RDF_NS}}}RDF")
+    return ET.SubElement(rdf, f"{{{RDF_NS}}}Description", {f"{{{RDF_NS}}}about": ""})
+
+
+def _get_property(root: ET.Element, ns: str, prop: str) -> Optional[str]:
+    """
+    Returns a property as text, whether stored as an attribute or an element.
+
+    Arrays are returned as their items joined by spaces.
+    """
+    key = f"{{{ns}}}{prop}"
+    for description in _descriptions(root):
+        if key in description.attrib:
+            return description.attrib[key]
+        element = description.find(key)
+        if element is not None:
+            items = [li.text or "" for li in element.iter(f"{{{RDF_NS}}}li")]
+            return " ".join(items) if items else (element.text or "")
+    return None
+
+
+def _remove_property(root: ET.Element, ns: str, prop: str) -> None:
+    """Removes every occurrence of a property."""
+    key = f"{{{ns}}}{prop}"
+    for description in _descriptions(root):
+        description.attrib.pop(key, None)
+        for element in description.findall(key):
+            description.remove(element)
+
+
+def _add_text(description: ET.Element, ns: str, prop: str, value: str) -> None:
+    """Adds a simple property."""
+    ET.SubElement(description, f"{{{ns}}}{prop}").text = value
+
+
+def _add_seq(description: ET.Element, ns: str, prop: str, values: List[str]) -> None:
+    """Adds an ordered array property."""
+    seq = ET.SubElement(ET.SubElement(description, f"{{{ns}}}{prop}"), f"{{{RDF_NS}}}Seq")
+    for value in values:
+        ET.SubElement(seq, f"{{{RDF_NS}}}li").text = value
+
+
+def _write_atomic(target: str, root: ET.Element) -> None:
+    """Writes a packet next to the target and renames it over the target."""
+    ET.indent(root, space=" ")
+    fd, tmp = tempfile.mkstemp(dir=path.dirname(path.abspath(target)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            ET.ElementTree(root).write(f, encoding="utf-8", xml_declaration=False)
+            f.write(b"\n")
+        os.replace(tmp, target)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def _format_rationals(name: str, value: str) -> List[str]:
+    """Formats a form value as the XMP rationals of its EXIF encoding."""
+    return [f"{num}/{den}" for num, den in native_exif.form_rationals(name, value)]
+
+
+def _decode(name: str, kind: str, raw: str) -> Any:
+    """Converts a stored property to the value exiftool reports with ``-n``."""
+    if kind == "text":
+        return raw
+    if kind == "integer-seq":
+        return int(raw.split()[0])
+    pairs = []
+    for item in raw.split():
+        num, _, den = item.partition("/")
+        if den:
+            pairs.append((int(num), int(den)))
+        else:
+            fraction = Fraction(num)
+            pairs.append((fraction.numerator, fraction.denominator))
+    return native_exif.form_value(name, pairs)
+
+
+def _to_xmp_date(date_time: str, offset: str) -> str:
+    """Converts an EXIF date ("YYYY:MM:DD HH:MM:SS") and offset to an XMP date."""
+    match = _EXIF_DATE.fullmatch(date_time.strip())
+    if not match:
+        raise XmpSidecarError(f"Invalid date {date_time!r}")
+    year, month, day, hour, minute, second, fraction = match.groups()
+    result = f"{year}-{month}-{day}T{hour}:{minute}:{second or '00'}{fraction or ''}"
+    if offset:
+        if not _OFFSET.match(offset):
+            raise XmpSidecarError(f"Invalid time zone offset {offset!r}")
+        result += offset
+    return result
+
+
+def _from_xmp_date(value: str) -> tuple[str, str]:
+    """Converts an XMP date to an EXIF date and offset (empty if the date has none)."""
+    match = _XMP_DATE.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid XMP date {value!r}")
+    year, month, day, hour, minute, second, fraction, zone = match.groups()
+    date_time = (
+        f"{year}:{month or '01'}:{day or '01'} "
+        f"{hour or '00'}:{minute or '00'}:{second or '00'}{fraction or ''}"
+    )
+    offset = "+00:00" if zone == "Z" else (zone or "")
+    return date_time, offset
+
+
+for _prefix, _uri in {**_FOREIGN_PREFIXES, **_PREFIXES}.items():
+    ET.register_namespace(_prefix, _uri)
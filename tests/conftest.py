@@ -1,8 +1,25 @@
 import pytest
 from PySide6.QtCore import QSettings
 import os
+from concurrent.futures import Future
 from unittest.mock import MagicMock
 
+
+def finished_future(fn, *args):
+    """Calls fn now and returns its outcome as a finished future, like a cached submit_load."""
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def wire_background_calls(exif_manager):
+    """Routes a mocked ExifManager's submit_load/submit_save through its synchronous mocks."""
+    exif_manager.submit_load.side_effect = lambda *args: finished_future(exif_manager.load_exif_data, *args)
+    exif_manager.submit_save.side_effect = lambda *args: finished_future(exif_manager.save_exif_data_batch, *args)
+
 # Mock QSettings for testing
 @pytest.fixture
 def mock_settings(monkeypatch):
@@ -22,19 +39,32 @@ def mock_settings(monkeypatch):
             if key in self._data:
                 del self._data[key]
 
+        def fileName(self):
+            return ""
+
     monkeypatch.setattr(QSettings, '__init__', MockQSettings.__init__)
     monkeypatch.setattr(QSettings, 'value', MockQSettings.value)
     monkeypatch.setattr(QSettings, 'setValue', MockQSettings.setValue)
     monkeypatch.setattr(QSettings, 'remove', MockQSettings.remove)
+    monkeypatch.setattr(QSettings, 'fileName', MockQSettings.fileName)
     return MockQSettings("Test", "Timestamper")
 
 # Global fixture to mock external dependencies like exiftool and file system checks
 @pytest.fixture(autouse=True)
-def mock_external_dependencies(monkeypatch):
+def mock_external_dependencies(monkeypatch, tmp_path):
+    # Keep the thumbnail cache, metadata index and undo journal out of the user's settings directory
+    monkeypatch.setattr(
+        'src.timestamper.main.MainWindow._settings_data_path', lambda self, filename: str(tmp_path / filename)
+    )
+
     # Mock exiftool.ExifToolHelper
     class MockExifToolHelper:
         def __init__(self, executable):
-            pass
+            self.running = False
+        def run(self):
+            self.running = True
+        def terminate(self):
+            self.running = False
         def __enter__(self):
             return self
         def __exit__(self, exc_type, exc_val, exc_tb):
@@ -42,6 +72,8 @@ def mock_external_dependencies(monkeypatch):
         def get_metadata(self, path):
             # Return a basic dict for any file, as expected by _update_exif_info_view
             return {'SourceFile': path}
+        def get_tags(self, path, tags, params=None):
+            return {'SourceFile': path}
         def set_tags(self, path, tags, params):
             pass
 
@@ -0,0 +1,82 @@
+import gc
+import os
+from multiprocessing import resource_tracker
+import pytest
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QColor, QImage
+from src.timestamper import decode_pool as decode_pool_module
+from src.timestamper.decode_pool import DecodePool
+
+
+@pytest.fixture
+def pool():
+    """A pool of two decoding processes, stopped after the test."""
+    decode_pool = DecodePool(2)
+    yield decode_pool
+    decode_pool.close()
+
+
+def _shared_blocks():
+    """Return the names of the shared memory blocks on the system, where they are visible."""
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+def test_images_are_decoded_in_worker_processes(tmp_path, qapp, pool):
+    """Test that a worker decodes a scaled image and hands its pixels back through shared memory."""
+    file_path = str(tmp_path / "wide.jpg")
+    image = QImage(400, 200, QImage.Format.Format_RGB32)
+    image.fill(QColor(0, 0, 255))
+    assert image.save(file_path)
+    blocks = _shared_blocks()
+
+    decoded = pool.decode(file_path, QSize(64, 64))
+    assert (decoded.width(), decoded.height()) == (64, 32)
+
+    # The image stays valid while only a copy of it remains, and its block is freed
+    thumbnail = decoded.scaled(QSize(32, 16))
+    del decoded
+    gc.collect()
+    assert thumbnail.pixelColor(10, 10).blue() > 240
+    assert not {name for name in _shared_blocks() - blocks if not name.startswith("sem.")}
+
+
+def test_undecodable_files_give_a_null_image(tmp_path, qapp, pool):
+    """Test that files a worker cannot decode yield a null image instead of raising."""
+    file_path = tmp_path / "broken.jpg"
+    file_path.write_bytes(b"not an image")
+    assert pool.decode(str(file_path), QSize(64, 64)).isNull()
+
+
+def test_a_closed_pool_decodes_in_process(tmp_path, qapp, pool):
+    """Test that decoding falls back to this process once the workers are unavailable."""
+    file_path = str(tmp_path / "photo.jpg")
+    image = QImage(100, 100, QImage.Format.Format_RGB32)
+    image.fill(QColor(255, 0, 0))
+    assert image.save(file_path)
+
+    pool.close()
+    assert pool.decode(file_path, QSize(50, 50)).size() == QSize(50, 50)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="Shared memory is only tracked on POSIX")
+def test_always_tracked_blocks_are_unregistered_once_per_process(tmp_path, qapp, monkeypatch):
+    """Test that, where every block is tracked, each process balances its registrations."""
+    file_path = str(tmp_path / "photo.jpg")
+    image = QImage(100, 100, QImage.Format.Format_RGB32)
+    image.fill(QColor(0, 255, 0))
+    assert image.save(file_path)
+    registered = []
+    unregistered = []
+    register, unregister = resource_tracker.register, resource_tracker.unregister
+    monkeypatch.setattr(decode_pool_module, "_ALWAYS_TRACKED", True)
+    monkeypatch.setattr(resource_tracker, "register", lambda name, rtype: (registered.append(name), register(name, rtype)))
+    monkeypatch.setattr(resource_tracker, "unregister", lambda name, rtype: (unregistered.append(name), unregister(name, rtype)))
+
+    # Run the worker's half in this process: it creates the block and hands it over
+    shared = decode_pool_module._decode_to_shared_memory(file_path, 50, 50)
+    assert registered == unregistered == [f"/{shared.name}"]
+
+    # Attaching registers the block again and unlinking it unregisters it
+    decoded = decode_pool_module._wrap_shared_image(shared)
+    assert decoded.pixelColor(10, 10).green() > 240
+    assert registered == unregistered == [f"/{shared.name}"] * 2
@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import patch
 from PySide6.QtCore import QSettings, Qt
 from PySide6.QtWidgets import QApplication, QPushButton, QMessageBox
+from src.timestamper.constants import SAVE_TARGET_SIDECAR
 from src.timestamper.main import MainWindow
 from src.timestamper.settings_dialog import SettingsDialog
 
@@ -43,3 +44,26 @@ def test_settings_dialog(qtbot, app):
 
     # Clean up
     settings.clear()
+
+
+def test_settings_dialog_saves_worker_count(qtbot, app, mock_settings):
+    """Test that the exiftool worker pool size is saved from the dialog."""
+    dialog = SettingsDialog()
+    qtbot.addWidget(dialog)
+
+    dialog.exiftool_workers_spin.setValue(3)
+    dialog.native_exif_check.setChecked(False)
+    dialog.process_decoding_check.setChecked(True)
+    dialog.metadata_cache_spin.setValue(64)
+    dialog.thumbnail_cache_spin.setValue(32)
+    dialog.save_target_combo.setCurrentIndex(dialog.save_target_combo.findData(SAVE_TARGET_SIDECAR))
+    dialog.verify_payload_check.setChecked(True)
+    qtbot.mouseClick(dialog.findChild(QPushButton, "save_button"), Qt.LeftButton)
+
+    assert int(dialog.settings.value("exiftool_workers")) == 3
+    assert dialog.settings.value("native_exif") is False
+    assert dialog.settings.value("process_decoding") is True
+    assert int(dialog.settings.value("metadata_cache_mb")) == 64
+    assert int(dialog.settings.value("thumbnail_cache_mb")) == 32
+    assert dialog.settings.value("save_target") == SAVE_TARGET_SIDECAR
+    assert dialog.settings.value("verify_payload") is True
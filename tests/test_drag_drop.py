@@ -2,7 +2,7 @@ import pytest
 from PySide6.QtCore import QUrl, QMimeData, Qt
 from PySide6.QtGui import QDropEvent
 from PySide6.QtWidgets import QApplication
-from src.timestamper.drag_drop_list_widget import DragDropListWidget
+from src.timestamper.drag_drop_list_view import DragDropListView
 import os
 
 @pytest.fixture
@@ -13,9 +13,9 @@ def app(qtbot):
         test_app = QApplication([])
     return test_app
 
-def test_drag_drop_list_widget(qtbot, app):
-    """Test the DragDropListWidget."""
-    widget = DragDropListWidget()
+def test_drag_drop_list_view(qtbot, app):
+    """Test the DragDropListView."""
+    widget = DragDropListView()
     qtbot.addWidget(widget)
 
     # Create a dummy file
@@ -44,3 +44,45 @@ def test_drag_drop_list_widget(qtbot, app):
 
     # Clean up
     os.remove(file_path)
+
+
+def test_visible_rows_are_reported_after_scrolling(qtbot, app):
+    """Test that the view reports the rows in its viewport once scrolling settles."""
+    from PySide6.QtCore import QStringListModel
+    widget = DragDropListView()
+    qtbot.addWidget(widget)
+    widget.setUniformItemSizes(True)
+    widget.setModel(QStringListModel([f"image{i}.jpg" for i in range(1000)]))
+    widget.resize(200, 200)
+    widget.show()
+
+    with qtbot.waitSignal(widget.visibleRowsChanged) as blocker:
+        widget.scrollTo(widget.model().index(500, 0), DragDropListView.ScrollHint.PositionAtTop)
+    first, last = blocker.args
+    assert first == 500 and 500 < last < 1000
+    assert widget.visibleRows() == (first, last)
+
+
+def test_visible_rows_in_grid_mode(qtbot, app):
+    """Test that the rows reported in grid mode are exactly the cells in the viewport."""
+    from PySide6.QtCore import QStringListModel
+    widget = DragDropListView()
+    qtbot.addWidget(widget)
+    widget.setUniformItemSizes(True)
+    widget.setModel(QStringListModel([f"image{i}.jpg" for i in range(5000)]))
+    widget.setGridMode(True, 64)
+    widget.resize(400, 300)
+    widget.show()
+    qtbot.waitExposed(widget)
+    assert widget.isGridMode() and widget.iconSize().width() == 64
+
+    widget.scrollTo(widget.model().index(2500, 0), DragDropListView.ScrollHint.PositionAtCenter)
+    first, last = widget.visibleRows()
+    viewport = widget.viewport().rect()
+    shown = [row for row in range(first - 50, last + 50)
+             if widget.visualRect(widget.model().index(row, 0)).intersects(viewport)]
+    assert (first, last) == (shown[0], shown[-1])
+    assert first <= 2500 <= last
+
+    widget.setGridMode(False, 64)
+    assert not widget.isGridMode() and widget.iconSize().width() == 32
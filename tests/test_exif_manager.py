@@ -0,0 +1,531 @@
+import asyncio
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from exiftool.exceptions import ExifToolNotRunning
+from src.timestamper.constants import (
+    FORM_READ_PARAMS,
+    FORM_TAGS,
+    READ_PROFILE_FULL,
+    SAVE_MODE_IN_PLACE,
+    SAVE_MODE_PAYLOAD_CHANGED,
+    SAVE_MODE_REWRITTEN,
+    SAVE_MODE_SIDECAR,
+    SAVE_MODE_UNCHANGED,
+    SAVE_TARGET_SIDECAR
+)
+from src.timestamper import native_exif
+from src.timestamper.exif_manager import ExifManager, ExifToolNotFound
+from src.timestamper.undo_journal import open_undo_journal
+
+
+@pytest.fixture
+def helper_factory():
+    """Patch ExifToolHelper with a factory that records every process it starts."""
+    helpers = []
+
+    def make_helper(executable):
+        helper = MagicMock()
+        helper.running = False
+        helper.run.side_effect = lambda: setattr(helper, "running", True)
+        helper.get_metadata.side_effect = lambda path: [{"SourceFile": path}]
+        helper.get_tags.side_effect = lambda path, tags, params: [{"SourceFile": path}]
+        helpers.append(helper)
+        return helper
+
+    with patch('exiftool.ExifToolHelper', side_effect=make_helper):
+        yield helpers
+
+
+def test_exiftool_process_is_reused(helper_factory):
+    """Test that reads and writes share one lazily started exiftool process."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1)
+    assert helper_factory == []
+
+    assert manager.load_exif_data("a.jpg") == {"SourceFile": "a.jpg"}
+    assert manager.save_exif_data("a.jpg", {"Make": "Nikon"})
+    assert manager.load_exif_data("b.jpg") == {"SourceFile": "b.jpg"}
+
+    assert len(helper_factory) == 1
+    helper_factory[0].run.assert_called_once()
+
+
+def test_exiftool_process_restarts_after_crash(helper_factory):
+    """Test that a dead exiftool process is replaced and the request retried."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1)
+    manager.load_exif_data("a.jpg")
+
+    helper_factory[0].get_tags.side_effect = ExifToolNotRunning("died")
+    assert manager.load_exif_data("b.jpg") == {"SourceFile": "b.jpg"}
+    assert len(helper_factory) == 2
+
+
+def test_close_terminates_exiftool(helper_factory):
+    """Test that closing the manager stops the exiftool process."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1)
+    manager.load_exif_data("a.jpg")
+    manager.close()
+
+    helper_factory[0].terminate.assert_called_once()
+
+
+def test_missing_exiftool_raises():
+    """Test that a missing executable is reported as ExifToolNotFound."""
+    with patch('exiftool.ExifToolHelper', side_effect=FileNotFoundError):
+        manager = ExifManager("/no/such/exiftool")
+        with pytest.raises(ExifToolNotFound):
+            manager.load_exif_data("a.jpg")
+
+
+def test_requests_for_a_file_use_the_same_worker(helper_factory):
+    """Test that every request for one file is routed to one worker."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=4)
+    paths = [f"/scans/frame_{i:02d}.tif" for i in range(36)]
+
+    assert {manager._worker_for(p) for p in paths} == set(manager._workers)
+    for p in paths:
+        assert manager._worker_for(p) is manager._worker_for(p)
+    manager.close()
+
+
+def test_load_many_runs_across_workers(helper_factory):
+    """Test that reading many files spreads them over the pool."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=3)
+    paths = [f"/scans/frame_{i:02d}.tif" for i in range(12)]
+
+    loaded = manager.load_exif_data_many(paths)
+    assert loaded == {p: {"SourceFile": p} for p in paths}
+    assert 1 < len(helper_factory) <= 3
+    manager.close()
+
+
+def test_batch_save_uses_one_argfile_execution_per_worker():
+    """Test that a batch save runs one exiftool execution per worker and reports per file."""
+    paths = [f"/scans/frame_{i:02d}.tif" for i in range(36)]
+    argfiles = []
+
+    def execute(*params):
+        with open(params[params.index("-@") + 1], encoding="utf-8") as f:
+            argfiles.append(f.read().splitlines())
+        return ""
+
+    with patch('exiftool.ExifToolHelper', side_effect=lambda executable: _batch_helper(execute)):
+        manager = ExifManager("/mock/path/to/exiftool", num_workers=2)
+        results = manager.save_exif_data_batch(paths, {"Make": "Nikon"})
+        manager.close()
+
+    assert results == {p: SAVE_MODE_REWRITTEN for p in paths}
+    assert len(argfiles) == 2
+    assert all(args[0] == "-Make=Nikon" for args in argfiles)
+    assert sorted(p for args in argfiles for p in args[1:]) == paths
+
+
+def test_batch_save_reports_failed_files(helper_factory):
+    """Test that files named in exiftool error lines are reported as not saved."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1)
+    paths = ["/scans/a.tif", "/scans/b.tif", "/scans/c.tif"]
+    manager.load_exif_data(paths[0])
+    helper = helper_factory[0]
+    helper.last_stderr = "Error: File not found - /scans/b.tif"
+
+    results = manager.save_exif_data_batch(paths, {"Make": "Nikon"})
+    assert results == {"/scans/a.tif": SAVE_MODE_REWRITTEN, "/scans/b.tif": None, "/scans/c.tif": SAVE_MODE_REWRITTEN}
+    helper.execute.assert_called_once()
+    manager.close()
+
+
+def test_batch_save_matches_error_paths_normalized(helper_factory):
+    """Test that error lines naming a file differently still fail it, and unmatched ones fail the batch."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1)
+    paths = ["/scans/a - copy.tif", "/scans/b.tif"]
+    manager.load_exif_data(paths[0])
+    helper = helper_factory[0]
+    helper.last_stderr = "Error: Not a valid TIFF - /scans/./a - copy.tif"
+
+    results = manager.save_exif_data_batch(paths, {"Make": "Nikon"})
+    assert results == {"/scans/a - copy.tif": None, "/scans/b.tif": SAVE_MODE_REWRITTEN}
+
+    helper.last_stderr = "Error: Something went wrong - somewhere else"
+    results = manager.save_exif_data_batch(paths, {"Make": "Canon"})
+    assert results == {"/scans/a - copy.tif": None, "/scans/b.tif": None}
+    manager.close()
+
+
+def test_batch_save_writes_only_changed_tags():
+    """Test that tags a file already carries are not written and unchanged files are skipped."""
+    paths = ["/scans/a.tif", "/scans/b.tif", "/scans/c.tif"]
+    current = {
+        "/scans/a.tif": {"EXIF:Make": "Nikon", "EXIF:FNumber": 5.6, "EXIF:ExposureTime": 0.004},
+        "/scans/b.tif": {"EXIF:Make": "Nikon", "EXIF:FNumber": 8, "EXIF:ExposureTime": 0.004},
+        "/scans/c.tif": {},
+    }
+    argfiles = []
+
+    def execute(*params):
+        with open(params[params.index("-@") + 1], encoding="utf-8") as f:
+            argfiles.append(f.read().splitlines())
+        return ""
+
+    helper = _batch_helper(execute)
+    helper.get_tags.side_effect = lambda files, tags, params: [{"SourceFile": f, **current[f]} for f in files]
+    with patch('exiftool.ExifToolHelper', return_value=helper):
+        manager = ExifManager("/mock/path/to/exiftool", num_workers=1)
+        results = manager.save_exif_data_batch(paths, {"Make": "Nikon", "FNumber": "5.6", "ExposureTime": "1/250"})
+        manager.close()
+
+    assert results == {
+        "/scans/a.tif": SAVE_MODE_UNCHANGED,
+        "/scans/b.tif": SAVE_MODE_REWRITTEN,
+        "/scans/c.tif": SAVE_MODE_REWRITTEN,
+    }
+    assert sorted(argfiles) == [
+        ["-FNumber=5.6", "/scans/b.tif"],
+        ["-Make=Nikon", "-FNumber=5.6", "-ExposureTime=1/250", "/scans/c.tif"],
+    ]
+
+
+def _batch_helper(execute):
+    """Returns a running helper whose execute is the given function."""
+    helper = MagicMock()
+    helper.running = True
+    helper.last_stderr = ""
+    helper.execute.side_effect = execute
+    return helper
+
+
+def test_preload_reads_in_chunks_and_serves_selection_from_store():
+    """Test that preloading batches reads per worker and later reads are dictionary lookups."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=2)
+    paths = [f"/scans/frame_{i:02d}.tif" for i in range(10)]
+    progress = []
+
+    with patch('exiftool.ExifToolHelper') as helper_class:
+        helper = helper_class.return_value
+        helper.running = True
+        helper.get_tags.side_effect = lambda files, tags, params: [{"SourceFile": f} for f in files]
+        stored = manager.preload_exif_data(paths, chunk_size=3, progress_callback=lambda d, t: progress.append((d, t)))
+
+        assert stored == 10
+        assert progress[-1] == (10, 10)
+        assert all(len(call.args[0]) <= 3 for call in helper.get_tags.call_args_list)
+        calls_after_preload = helper.get_tags.call_count
+
+        assert manager.load_exif_data(paths[4]) == {"SourceFile": paths[4]}
+        assert helper.get_tags.call_count == calls_after_preload
+    manager.close()
+
+
+def test_save_invalidates_cached_metadata(helper_factory):
+    """Test that saving a file drops its cached metadata so the next read is fresh."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1)
+    manager.load_exif_data("a.jpg")
+    assert manager.get_cached_exif_data("a.jpg") is not None
+
+    manager.save_exif_data("a.jpg", {"Make": "Nikon"})
+    assert manager.get_cached_exif_data("a.jpg") is None
+    manager.close()
+
+
+def test_form_profile_reads_only_form_tags(helper_factory):
+    """Test that the default form profile requests only the form tags with a fast scan."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1)
+    manager.load_exif_data("a.jpg")
+
+    helper = helper_factory[0]
+    helper.get_metadata.assert_not_called()
+    _, kwargs = helper.get_tags.call_args
+    assert kwargs["tags"] == FORM_TAGS
+    assert kwargs["params"] == FORM_READ_PARAMS
+    manager.close()
+
+
+def test_full_profile_is_read_separately_and_serves_form_reads(helper_factory):
+    """Test that a full read is stored and later form reads are answered from it."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1)
+    with patch('exiftool.ExifToolHelper') as helper_class:
+        helper = helper_class.return_value
+        helper.running = True
+        helper.get_metadata.return_value = [{
+            "SourceFile": "a.jpg",
+            "EXIF:Make": "Nikon",
+            "MakerNotes:ShutterCount": 1234,
+        }]
+        assert manager.load_exif_data("a.jpg", READ_PROFILE_FULL)["MakerNotes:ShutterCount"] == 1234
+        assert manager.load_exif_data("a.jpg") == {"SourceFile": "a.jpg", "EXIF:Make": "Nikon"}
+        helper.get_tags.assert_not_called()
+    manager.close()
+
+
+def test_native_path_handles_jpeg_without_exiftool(helper_factory, tmp_path, qapp):
+    """Test that JPEG form reads and writes never start exiftool."""
+    from PySide6.QtGui import QImage
+    file_path = str(tmp_path / "a.jpg")
+    image = QImage(8, 8, QImage.Format.Format_RGB32)
+    image.fill(0)
+    assert image.save(file_path)
+
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=2)
+    assert manager.save_exif_data(file_path, {"Make": "Nikon"})
+    assert manager.load_exif_data(file_path)["EXIF:Make"] == "Nikon"
+    assert manager.save_exif_data_batch([file_path], {"Make": "Canon"}) == {file_path: SAVE_MODE_IN_PLACE}
+    assert manager.preload_exif_data([file_path]) == 1
+    assert manager.get_cached_exif_data(file_path)["EXIF:Make"] == "Canon"
+    assert helper_factory == []
+    manager.close()
+
+
+def test_unsupported_files_fall_back_to_exiftool(helper_factory, tmp_path):
+    """Test that files the native path cannot handle are passed to exiftool."""
+    file_path = str(tmp_path / "a.png")
+    with open(file_path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1)
+    assert manager.load_exif_data(file_path) == {"SourceFile": file_path}
+    assert manager.save_exif_data(file_path, {"Make": "Nikon"}) == SAVE_MODE_REWRITTEN
+    helper_factory[0].set_tags.assert_called_once()
+
+    disabled = ExifManager("/mock/path/to/exiftool", num_workers=1, use_native=False)
+    assert disabled._native_read(file_path) is None
+    assert not disabled._native_write(file_path, {"Make": "Nikon"})
+
+
+def test_revisiting_a_file_reads_it_again_only_after_it_changed(helper_factory, tmp_path):
+    """Test that the metadata cache is validated against the file on disk."""
+    file_path = str(tmp_path / "a.png")
+    with open(file_path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1)
+
+    manager.load_exif_data(file_path)
+    manager.load_exif_data(file_path)
+    assert helper_factory[0].get_tags.call_count == 1
+
+    with open(file_path, "ab") as f:
+        f.write(b"\x00")
+    manager.load_exif_data(file_path)
+    assert helper_factory[0].get_tags.call_count == 2
+    manager.close()
+
+
+def test_index_serves_unchanged_files_in_a_new_session(helper_factory, tmp_path):
+    """Test that a second session only reads files that are new or changed."""
+    paths = []
+    for name in "abc":
+        file_path = str(tmp_path / f"{name}.png")
+        with open(file_path, "wb") as f:
+            f.write(b"\x89PNG\r\n\x1a\n")
+        paths.append(file_path)
+    index_path = str(tmp_path / "index.sqlite3")
+
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1, index_path=index_path)
+    assert manager.preload_exif_data(paths[:2]) == 2
+    manager.close()
+
+    with open(paths[1], "ab") as f:
+        f.write(b"\x00")
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1, index_path=index_path)
+    assert manager.preload_exif_data(paths) == 2
+    read = {call.args[0] for call in helper_factory[1].get_tags.call_args_list if isinstance(call.args[0], str)}
+    assert sorted(read) == paths[1:]
+    assert manager.get_cached_exif_data(paths[0]) == {"SourceFile": paths[0]}
+    manager.close()
+
+
+def test_sidecar_target_leaves_images_untouched(helper_factory, tmp_path):
+    """Test that sidecar saves never touch the image and reads merge the sidecar over it."""
+    file_path = str(tmp_path / "scan.png")
+    with open(file_path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1, save_target=SAVE_TARGET_SIDECAR)
+
+    assert manager.load_exif_data(file_path) == {"SourceFile": file_path}
+    assert manager.save_exif_data(file_path, {"Make": "Nikon", "ISO": "400"}) == SAVE_MODE_SIDECAR
+    assert manager.save_exif_data_batch([file_path], {"Model": "FM2"}) == {file_path: SAVE_MODE_SIDECAR}
+    helper_factory[0].set_tags.assert_not_called()
+    helper_factory[0].execute.assert_not_called()
+    with open(file_path, "rb") as f:
+        assert f.read() == b"\x89PNG\r\n\x1a\n"
+
+    exif_data = manager.load_exif_data(file_path)
+    assert exif_data["EXIF:Make"] == "Nikon"
+    assert exif_data["EXIF:Model"] == "FM2"
+    assert exif_data["EXIF:ISO"] == 400
+    assert manager.load_exif_data(file_path, READ_PROFILE_FULL)["EXIF:Make"] == "Nikon"
+
+    # Deleting the sidecar outside the app invalidates the cached read
+    reads = helper_factory[0].get_tags.call_count
+    assert manager.load_exif_data(file_path)["EXIF:Make"] == "Nikon"
+    assert helper_factory[0].get_tags.call_count == reads
+    (tmp_path / "scan.xmp").unlink()
+    assert manager.load_exif_data(file_path) == {"SourceFile": file_path}
+    manager.close()
+
+
+def test_offset_only_sidecar_save_keeps_the_offset(tmp_path):
+    """Test that changing only the time zone offset stores it in a sidecar with the embedded date."""
+    file_path = str(tmp_path / "scan.png")
+    with open(file_path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+    helper = MagicMock()
+    helper.get_tags.side_effect = lambda path, tags, params: [
+        {"SourceFile": path, "EXIF:DateTimeOriginal": "2023:01:01 12:00:00"}
+    ]
+    with patch('exiftool.ExifToolHelper', return_value=helper):
+        manager = ExifManager("/mock/path/to/exiftool", num_workers=1, save_target=SAVE_TARGET_SIDECAR)
+        assert manager.load_exif_data(file_path)["EXIF:DateTimeOriginal"] == "2023:01:01 12:00:00"
+
+        tags = {"DateTimeOriginal": "2023:01:01 12:00:00", "OffsetTimeOriginal": "+10:00", "OffsetTime": "+10:00"}
+        assert manager.save_exif_data_batch([file_path], tags) == {file_path: SAVE_MODE_SIDECAR}
+        exif_data = manager.load_exif_data(file_path)
+        assert exif_data["EXIF:DateTimeOriginal"] == "2023:01:01 12:00:00"
+        assert exif_data["EXIF:OffsetTimeOriginal"] == exif_data["EXIF:OffsetTime"] == "+10:00"
+
+        # Both offsets are read back from the sidecar, so saving them again writes nothing
+        assert manager.save_exif_data_batch([file_path], tags) == {file_path: SAVE_MODE_UNCHANGED}
+        manager.close()
+
+
+def test_undo_restores_the_values_a_save_replaced(helper_factory, tmp_path, qapp):
+    """Test that undo writes back only the previous values of the tags a save touched."""
+    from PySide6.QtGui import QImage
+    paths = []
+    for name in "ab":
+        file_path = str(tmp_path / f"{name}.jpg")
+        image = QImage(8, 8, QImage.Format.Format_RGB32)
+        image.fill(0)
+        assert image.save(file_path)
+        paths.append(file_path)
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=2, journal_path=str(tmp_path / "undo.jsonl"))
+    assert not manager.can_undo
+
+    manager.save_exif_data_batch(paths, {"Make": "Nikon", "Model": "FM2"})
+    assert manager.load_exif_data(paths[0])["EXIF:Make"] == "Nikon"
+    manager.save_exif_data_batch(paths[:1], {"Make": "Canon"})
+    manager.submit_save(paths[1:], {"Make": "Leica"}, journal=False).result()
+
+    assert manager.submit_undo().result() == {paths[0]: SAVE_MODE_IN_PLACE}
+    assert manager.load_exif_data(paths[0])["EXIF:Make"] == "Nikon"
+    results = manager.submit_undo().result()
+    assert set(results) == set(paths) and all(results.values())
+    for file_path in paths:
+        exif_data = manager.load_exif_data(file_path)
+        assert "EXIF:Make" not in exif_data and "EXIF:Model" not in exif_data
+    assert not manager.can_undo
+    assert manager.submit_undo().result() == {}
+    assert helper_factory == []
+    manager.close()
+
+
+def test_a_shared_journal_outlives_the_manager(helper_factory, tmp_path, qapp):
+    """Test that recreating the manager, as changing settings does, keeps the caller's undo history."""
+    from PySide6.QtGui import QImage
+    file_path = str(tmp_path / "a.jpg")
+    image = QImage(8, 8, QImage.Format.Format_RGB32)
+    image.fill(0)
+    assert image.save(file_path)
+    journal = open_undo_journal(str(tmp_path / "undo.jsonl"))
+
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1, journal=journal)
+    manager.save_exif_data_batch([file_path], {"Make": "Nikon"})
+    manager.close()
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1, journal=journal)
+    assert manager.can_undo
+    results = manager.submit_undo().result()
+    assert set(results) == {file_path} and results[file_path]
+    manager.close()
+    journal.close()
+    assert not (tmp_path / "undo.jsonl").exists()
+
+
+def test_journal_errors_do_not_leave_saves_pending(helper_factory, tmp_path, qapp):
+    """Test that a save whose journal entry cannot be written still completes with its results."""
+    from PySide6.QtGui import QImage
+    file_path = str(tmp_path / "a.jpg")
+    image = QImage(8, 8, QImage.Format.Format_RGB32)
+    image.fill(0)
+    assert image.save(file_path)
+    journal = MagicMock()
+    journal.record.side_effect = OSError("disk full")
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1, journal=journal)
+
+    future = manager.submit_save([file_path], {"Make": "Nikon"})
+    results = future.result(timeout=5)
+    assert set(results) == {file_path} and results[file_path]
+    journal.record.assert_called_once()
+    manager.close()
+
+
+def test_payload_verification_flags_changed_image_data(helper_factory, tmp_path, qapp):
+    """Test that a write altering the image data is reported, and a clean one is not."""
+    from PySide6.QtGui import QImage
+    paths = []
+    for name in "ab":
+        file_path = str(tmp_path / f"{name}.jpg")
+        image = QImage(16, 16, QImage.Format.Format_RGB32)
+        image.fill(0)
+        assert image.save(file_path)
+        paths.append(file_path)
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=2, verify_payload=True)
+    write_form_tags = native_exif.write_form_tags
+
+    def corrupting_write(file_path, tags):
+        mode = write_form_tags(file_path, tags)
+        if file_path == paths[1]:
+            with open(file_path, "r+b") as f:
+                f.seek(-8, 2)
+                f.write(b"\x12\x34")
+        return mode
+
+    with patch.object(native_exif, "write_form_tags", side_effect=corrupting_write):
+        results = manager.save_exif_data_batch(paths, {"Make": "Nikon"})
+    assert results[paths[0]] in (SAVE_MODE_IN_PLACE, SAVE_MODE_REWRITTEN)
+    assert results[paths[1]] == SAVE_MODE_PAYLOAD_CHANGED
+    manager.close()
+
+
+def test_async_load_and_save(helper_factory):
+    """Test that the async API reads and writes through the worker pool."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=2)
+
+    async def session():
+        exif_data = await manager.load("a.jpg")
+        modes = await manager.save(["a.jpg", "b.jpg"], {"Make": "Nikon"})
+        return exif_data, modes
+
+    exif_data, modes = asyncio.run(session())
+    assert exif_data == {"SourceFile": "a.jpg"}
+    assert modes == {"a.jpg": SAVE_MODE_REWRITTEN, "b.jpg": SAVE_MODE_REWRITTEN}
+    manager.close()
+
+
+def test_cancelled_load_is_never_read(helper_factory):
+    """Test that cancelling a queued read drops it before it reaches exiftool."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=1)
+    release = threading.Event()
+    manager._workers[0].call(release.wait)
+
+    async def scroll_past():
+        task = asyncio.ensure_future(manager.load("skipped.jpg"))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scroll_past())
+    release.set()
+    assert manager.load_exif_data("shown.jpg") == {"SourceFile": "shown.jpg"}
+    read = [call.args[0] for call in helper_factory[0].get_tags.call_args_list]
+    assert read == ["shown.jpg"]
+    manager.close()
+
+
+def test_submit_save_combines_worker_batches(helper_factory):
+    """Test that a queued batch save resolves once every worker has written its files."""
+    manager = ExifManager("/mock/path/to/exiftool", num_workers=3)
+    paths = [f"/scans/frame_{i:02d}.tif" for i in range(9)]
+
+    future = manager.submit_save(paths, {"Make": "Nikon"})
+    assert future.result(timeout=5) == {p: SAVE_MODE_REWRITTEN for p in paths}
+    assert manager.submit_save([], {"Make": "Nikon"}).result() == {}
+    manager.close()
@@ -1,12 +1,14 @@
 import pytest
 from src.timestamper.main import MainWindow
 from PySide6.QtCore import QDateTime
-from src.timestamper.constants import EXIF_DATE_TIME_ORIGINAL
+from src.timestamper.constants import EXIF_DATE_TIME_ORIGINAL, READ_PROFILE_FULL, SAVE_MODE_IN_PLACE
 from src.timestamper.exif_manager import ExifToolNotFound
 import os
 from unittest import mock
-from PySide6.QtGui import QIcon
 from unittest.mock import patch, MagicMock, call
+from conftest import wire_background_calls
+import threading
+from concurrent.futures import Future
 
 @pytest.fixture
 def mw(qtbot):
@@ -15,6 +17,7 @@ def mw(qtbot):
         window = MainWindow()
         qtbot.addWidget(window)
         window.exif_manager = mock_exif_manager.return_value
+        wire_background_calls(window.exif_manager)
         yield window
 
 def test_select_file_from_list_exiftool_error(mw, qtbot):
@@ -22,7 +25,7 @@ def test_select_file_from_list_exiftool_error(mw, qtbot):
     mw.exif_manager.load_exif_data.side_effect = ExifToolNotFound
 
     with patch.object(mw, 'open_settings_dialog') as mock_open_settings:
-        with patch('src.timestamper.main.QPixmap'), patch('src.timestamper.main.QIcon', return_value=QIcon()):
+        with patch('src.timestamper.main.QPixmap'):
             mw.load_files(["/mock/path/to/image.jpg"])
         mw.file_list.setCurrentRow(0)
 
@@ -31,10 +34,10 @@ def test_select_file_from_list_exiftool_error(mw, qtbot):
 
 def test_save_exiftool_error(mw, qtbot):
     """Test that the settings dialog is shown when saving EXIF fails."""
-    mw.exif_manager.save_exif_data.side_effect = ExifToolNotFound
+    mw.exif_manager.save_exif_data_batch.side_effect = ExifToolNotFound
 
     with patch.object(mw, 'open_settings_dialog') as mock_open_settings:
-        with patch('src.timestamper.main.QPixmap'), patch('src.timestamper.main.QIcon', return_value=QIcon()):
+        with patch('src.timestamper.main.QPixmap'):
             mw.load_files(["/mock/path/to/image.jpg"])
         mw.file_list.setCurrentRow(0)
         mw.save()
@@ -46,7 +49,7 @@ def test_select_file_from_list_no_exiftool_path(mw, qtbot):
     mw.exif_manager = None  # Simulate exiftool not being configured
 
     with patch.object(mw, 'open_settings_dialog') as mock_open_settings:
-        with patch('src.timestamper.main.QPixmap'), patch('src.timestamper.main.QIcon', return_value=QIcon()):
+        with patch('src.timestamper.main.QPixmap'):
             mw.load_files(["/mock/path/to/image.jpg"])
         mw.file_list.setCurrentRow(0)
 
@@ -61,7 +64,7 @@ def test_select_file_from_list_success(mw, qtbot):
     }
     mw.exif_manager.load_exif_data.return_value = mock_exif_data
 
-    with patch('src.timestamper.main.QPixmap'), patch('src.timestamper.main.QIcon', return_value=QIcon()):
+    with patch('src.timestamper.main.QPixmap'):
         mw.load_files(["/mock/path/to/image.jpg"])
     mw.file_list.setCurrentRow(0)
 
@@ -73,17 +76,17 @@ def test_select_file_from_list_success(mw, qtbot):
 
 def test_save_success(mw, qtbot, monkeypatch):
     """Test successful saving of EXIF data."""
-    mw.exif_manager.save_exif_data.return_value = True
+    mw.exif_manager.save_exif_data_batch.side_effect = lambda paths, tags: {p: SAVE_MODE_IN_PLACE for p in paths}
 
-    with patch('src.timestamper.main.QPixmap'), patch('src.timestamper.main.QIcon', return_value=QIcon()):
+    with patch('src.timestamper.main.QPixmap'):
         mw.load_files(["/mock/path/to/image.jpg", "/mock/path/to/image2.jpg"])
     mw.file_list.setCurrentRow(0)
 
     mw.make.setText("TestMake")
     mw.save()
 
-    mw.exif_manager.save_exif_data.assert_called_once()
-    assert "TestMake" in mw.exif_manager.save_exif_data.call_args[0][1]['Make']
+    mw.exif_manager.submit_save.assert_called_once()
+    assert "TestMake" in mw.exif_manager.submit_save.call_args[0][1]['Make']
     assert 0 in mw.files_done
     assert mw.file_list.currentRow() == 1
 
@@ -109,3 +112,66 @@ def test_populate_exif(mw, qtbot):
     assert mw.longfocallength.text() == "55"
     assert mw.wideaperturevalue.text() == "3.5"
     assert mw.longaperturevalue.text() == "5.6"
+
+def test_close_shuts_down_exiftool(mw, qtbot):
+    """Test that closing the main window stops the exiftool process."""
+    mw.close()
+    mw.exif_manager.close.assert_called_once()
+
+def test_load_files_preloads_metadata_in_background(mw, qtbot):
+    """Test that loading files starts a background read of all their metadata."""
+    files = ["/mock/path/to/b.jpg", "/mock/path/to/a.jpg"]
+    with patch('src.timestamper.main.QPixmap'):
+        mw.load_files(files)
+
+    qtbot.waitUntil(lambda: mw.exif_manager.preload_exif_data.called)
+    assert mw.exif_manager.preload_exif_data.call_args[0][0] == sorted(files)
+
+def test_full_exif_is_only_read_when_info_pane_is_visible(mw, qtbot):
+    """Test that the full metadata dump is skipped while the EXIF tree pane is collapsed."""
+    mw.exif_manager.load_exif_data.return_value = {"EXIF:Make": "TestMake"}
+    mw.h_splitter.setSizes([200, 400, 0])
+
+    with patch('src.timestamper.main.QPixmap'):
+        mw.load_files(["/mock/path/to/image.jpg"])
+    mw.file_list.setCurrentRow(0)
+
+    profiles = [c.args[1] if len(c.args) > 1 else None for c in mw.exif_manager.load_exif_data.call_args_list]
+    assert READ_PROFILE_FULL not in profiles
+    assert mw.info.topLevelItemCount() == 0
+
+    mw.h_splitter.setSizes([200, 400, 200])
+    mw.on_splitter_moved(600, 2)
+    mw.exif_manager.load_exif_data.assert_called_with("/mock/path/to/image.jpg", READ_PROFILE_FULL)
+    assert mw.info.topLevelItem(0).text(0) == "EXIF"
+
+def test_moving_past_a_file_cancels_its_pending_read(mw, qtbot):
+    """Test that a read still queued for a previously selected file is cancelled."""
+    pending = Future()
+    mw.exif_manager.submit_load.side_effect = None
+    mw.exif_manager.submit_load.return_value = pending
+    with patch('src.timestamper.main.QPixmap'):
+        mw.load_files(["/mock/path/to/a.jpg", "/mock/path/to/b.jpg"])
+    mw.file_list.setCurrentRow(0)
+    assert mw.current_exif is None
+
+    wire_background_calls(mw.exif_manager)
+    mw.exif_manager.load_exif_data.return_value = {"EXIF:Make": "TestMake"}
+    mw.file_list.setCurrentRow(1)
+
+    assert pending.cancelled()
+    assert mw.current_exif == {"EXIF:Make": "TestMake"}
+
+
+def test_read_finishing_in_the_background_updates_the_gui(mw, qtbot):
+    """Test that a read completed on a worker thread is delivered to the GUI thread."""
+    pending = Future()
+    mw.exif_manager.submit_load.side_effect = None
+    mw.exif_manager.submit_load.return_value = pending
+    with patch('src.timestamper.main.QPixmap'):
+        mw.load_files(["/mock/path/to/a.jpg"])
+    mw.file_list.setCurrentRow(0)
+
+    threading.Thread(target=pending.set_result, args=({"EXIF:Make": "TestMake"},)).start()
+    qtbot.waitUntil(lambda: mw.current_exif == {"EXIF:Make": "TestMake"})
+    assert mw.statusBar().currentMessage() == 'Opened EXIF for "/mock/path/to/a.jpg"'
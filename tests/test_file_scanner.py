@@ -0,0 +1,65 @@
+import os
+import pytest
+from src.timestamper.file_scanner import scan_images
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """A folder tree of images with names that sort awkwardly, hidden files and other files."""
+    for name in (
+        "2021/b.JPG", "2021/a.tif", "2021-extra.jpg", "2021.png", "2021/nested/c.jpeg",
+        "README.txt", "._2021.png", ".cache/thumb.jpg", "z/empty/.keep",
+    ):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_bytes(b"")
+    return tmp_path
+
+
+def _images(batches):
+    """Flatten the batches of a scan."""
+    return [file_path for batch, _ in batches for file_path in batch]
+
+
+def test_images_are_found_recursively_in_sorted_order(archive):
+    """Test that a scan finds every visible image, in the order sorting all the paths gives."""
+    batches = list(scan_images([str(archive)]))
+    images = _images(batches)
+    assert images == sorted(images)
+    assert [os.path.relpath(p, archive) for p in images] == [
+        "2021-extra.jpg", "2021.png", os.path.join("2021", "a.tif"), os.path.join("2021", "b.JPG"),
+        os.path.join("2021", "nested", "c.jpeg"),
+    ]
+    assert batches[-1][1] == 5  # The archive, 2021, nested, z and empty
+
+
+def test_files_and_folders_can_be_mixed(archive):
+    """Test that selected files are kept, unless they are not images or were already found."""
+    paths = [str(archive / "2021"), str(archive / "README.txt"), str(archive / "2021.png"), str(archive / "2021.png")]
+    assert [os.path.basename(p) for p in _images(scan_images(paths))] == ["2021.png", "a.tif", "b.JPG", "c.jpeg"]
+
+
+def test_images_are_streamed_in_batches(archive):
+    """Test that images arrive in batches of the given size, and every interval when that is zero."""
+    batches = list(scan_images([str(archive)], batch_size=2))
+    assert [len(batch) for batch, _ in batches] == [2, 2, 1]
+    assert all(len(batch) == 1 for batch, _ in list(scan_images([str(archive)], batch_interval_ms=0))[:-1])
+
+
+def test_scans_can_be_cancelled(archive):
+    """Test that a cancelled scan stops without yielding the rest."""
+    cancelled = False
+
+    def is_cancelled():
+        return cancelled
+
+    batches = scan_images([str(archive)], is_cancelled, batch_size=1)
+    next(batches)
+    cancelled = True
+    assert list(batches) == []
+
+
+def test_unreadable_folders_are_skipped(tmp_path):
+    """Test that a folder that cannot be listed is skipped instead of ending the scan."""
+    (tmp_path / "photo.jpg").write_bytes(b"")
+    missing = str(tmp_path / "missing")
+    assert _images(scan_images([missing, str(tmp_path)])) == [str(tmp_path / "photo.jpg")]
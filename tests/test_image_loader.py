@@ -0,0 +1,139 @@
+import struct
+import pytest
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QSize
+from PySide6.QtGui import QColor, QImage, QImageReader
+from src.timestamper.image_loader import load_scaled_image
+
+
+def test_thumbnail_fits_the_requested_size(tmp_path, qapp):
+    """Test that thumbnails keep their aspect ratio within the bounding size."""
+    file_path = str(tmp_path / "wide.jpg")
+    image = QImage(400, 200, QImage.Format.Format_RGB32)
+    image.fill(QColor(200, 100, 50))
+    assert image.save(file_path)
+
+    thumbnail = load_scaled_image(file_path, QSize(64, 64))
+    assert (thumbnail.width(), thumbnail.height()) == (64, 32)
+
+
+def test_undecodable_files_give_a_null_image(tmp_path, qapp):
+    """Test that a file Qt cannot decode yields a null image instead of raising."""
+    file_path = tmp_path / "broken.jpg"
+    file_path.write_bytes(b"not an image")
+    assert load_scaled_image(str(file_path), QSize(64, 64)).isNull()
+
+
+def _jpeg_bytes(width, height, color):
+    """Encode a solid-colour JPEG in memory."""
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(color)
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    assert image.save(buffer, "JPG")
+    return bytes(data)
+
+
+def _jpeg_with_thumbnail(file_path, main, thumbnail, orientation=1):
+    """Write a JPEG whose Exif segment holds an Orientation tag and an IFD1 thumbnail."""
+    ifd0 = struct.pack("<H", 1) + struct.pack("<HHIHH", 0x0112, 3, 1, orientation, 0) + struct.pack("<I", 26)
+    ifd1 = struct.pack("<H", 2) + struct.pack("<HHII", 0x0201, 4, 1, 56) + struct.pack("<HHII", 0x0202, 4, 1, len(thumbnail))
+    tiff = b"II*\x00" + struct.pack("<I", 8) + ifd0 + ifd1 + struct.pack("<I", 0) + thumbnail
+    segment = b"Exif\x00\x00" + tiff
+    with open(file_path, "wb") as f:
+        f.write(main[:2] + b"\xff\xe1" + struct.pack(">H", len(segment) + 2) + segment + main[2:])
+
+
+def test_embedded_thumbnail_is_used_when_big_enough(tmp_path, qapp):
+    """Test that a small request decodes the EXIF thumbnail and a large one the main image."""
+    file_path = str(tmp_path / "thumbnail.jpg")
+    _jpeg_with_thumbnail(file_path, _jpeg_bytes(400, 300, QColor(255, 0, 0)), _jpeg_bytes(160, 120, QColor(0, 255, 0)))
+
+    thumbnail = load_scaled_image(file_path, QSize(64, 64))
+    assert (thumbnail.width(), thumbnail.height()) == (64, 48)
+    assert thumbnail.pixelColor(32, 24).green() > 200
+
+    preview = load_scaled_image(file_path, QSize(300, 300))
+    assert (preview.width(), preview.height()) == (300, 225)
+    assert preview.pixelColor(150, 100).red() > 200
+
+
+def test_embedded_thumbnail_follows_the_main_orientation(tmp_path, qapp):
+    """Test that the EXIF thumbnail of a rotated image is rotated like the image."""
+    file_path = str(tmp_path / "rotated.jpg")
+    _jpeg_with_thumbnail(
+        file_path, _jpeg_bytes(400, 200, QColor(255, 0, 0)), _jpeg_bytes(160, 80, QColor(0, 255, 0)), orientation=6
+    )
+    thumbnail = load_scaled_image(file_path, QSize(64, 64))
+    assert (thumbnail.width(), thumbnail.height()) == (32, 64)
+    assert thumbnail.pixelColor(16, 32).green() > 200
+
+
+def test_uncompressed_tiff_is_subsampled(tmp_path, qapp, monkeypatch):
+    """Test that a large uncompressed TIFF is read by skipping rows and columns."""
+    file_path = str(tmp_path / "scan.tif")
+    image = QImage(400, 200, QImage.Format.Format_RGB888)
+    image.fill(QColor(0, 0, 255))
+    for y in range(200):
+        for x in range(200):
+            image.setPixelColor(x, y, QColor(255, 0, 0))
+    assert image.save(file_path)
+    monkeypatch.setattr(QImageReader, "read", lambda self: pytest.fail("decoded at full resolution"))
+
+    thumbnail = load_scaled_image(file_path, QSize(64, 64))
+    assert (thumbnail.width(), thumbnail.height()) == (64, 32)
+    assert thumbnail.pixelColor(4, 16).red() > 200
+    assert thumbnail.pixelColor(60, 16).blue() > 200
+
+
+def _multi_page_tiff(file_path, pages):
+    """Write an uncompressed RGB TIFF with one page per (width, height, colour, NewSubfileType)."""
+    data = bytearray(b"II*\x00" + struct.pack("<I", 0))
+    previous_next = 4  # Where the offset of the next IFD is stored
+    for width, height, color, subfile_type in pages:
+        pixels_offset = len(data)
+        data += bytes([color.red(), color.green(), color.blue()]) * (width * height)
+        bits_offset = len(data)
+        data += struct.pack("<HHH", 8, 8, 8) + b"\x00\x00"
+        entries = [
+            (0x00FE, 4, 1, subfile_type),
+            (0x0100, 4, 1, width),
+            (0x0101, 4, 1, height),
+            (0x0102, 3, 3, bits_offset),
+            (0x0103, 3, 1, 1),
+            (0x0106, 3, 1, 2),
+            (0x0111, 4, 1, pixels_offset),
+            (0x0115, 3, 1, 3),
+            (0x0116, 4, 1, height),
+            (0x0117, 4, 1, width * height * 3),
+        ]
+        ifd_offset = len(data)
+        struct.pack_into("<I", data, previous_next, ifd_offset)
+        data += struct.pack("<H", len(entries))
+        for tag, type_, count, value in entries:
+            field = struct.pack("<HH", value, 0) if type_ == 3 and count == 1 else struct.pack("<I", value)
+            data += struct.pack("<HHI", tag, type_, count) + field
+        previous_next = len(data)
+        data += struct.pack("<I", 0)
+    with open(file_path, "wb") as f:
+        f.write(data)
+
+
+def test_full_size_frames_are_not_taken_for_previews(tmp_path, qapp):
+    """Test that a later full-size page of a multi-page TIFF never stands in for the first."""
+    file_path = str(tmp_path / "batch.tif")
+    _multi_page_tiff(file_path, [(400, 200, QColor(255, 0, 0), 0), (400, 200, QColor(0, 255, 0), 0)])
+
+    thumbnail = load_scaled_image(file_path, QSize(64, 64))
+    assert (thumbnail.width(), thumbnail.height()) == (64, 32)
+    assert thumbnail.pixelColor(32, 16).red() > 200
+
+
+def test_reduced_tiff_pages_are_used_as_previews(tmp_path, qapp):
+    """Test that a page flagged as a reduced image and smaller than the first is decoded instead."""
+    file_path = str(tmp_path / "pyramid.tif")
+    _multi_page_tiff(file_path, [(400, 200, QColor(255, 0, 0), 0), (100, 50, QColor(0, 255, 0), 1)])
+
+    thumbnail = load_scaled_image(file_path, QSize(64, 64))
+    assert (thumbnail.width(), thumbnail.height()) == (64, 32)
+    assert thumbnail.pixelColor(32, 16).green() > 200
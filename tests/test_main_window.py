@@ -1,18 +1,33 @@
 import pytest
 from src.timestamper.main import MainWindow
 from PySide6.QtCore import QSettings, QDateTime
-from src.timestamper.constants import EXIF_DATE_TIME_ORIGINAL
+from src.timestamper.constants import (
+    DONE_ICON,
+    ERROR_ICON,
+    EXIF_DATE_TIME_ORIGINAL,
+    MISMATCH_ICON,
+    PENDING_ICON,
+    READ_PROFILE_FORM,
+    SAVE_MODE_APPENDED,
+    SAVE_MODE_IN_PLACE,
+    SAVE_MODE_PAYLOAD_CHANGED
+)
+from src.timestamper.file_scanner import scan_images
 from src.timestamper.utils import float_to_shutterspeed, parse_lensinfo
+from functools import partial
 from datetime import datetime
 import os
 from unittest import mock
 
 import exiftool # Import exiftool for mocking exceptions
 import sys
-from PySide6.QtWidgets import QApplication, QFileDialog, QListWidgetItem, QAbstractItemView, QMenu
-from PySide6.QtGui import QPixmap, QIcon, QKeySequence
+from PySide6.QtWidgets import QApplication, QFileDialog, QAbstractItemView, QMenu
+from PySide6.QtGui import QImage, QPixmap, QIcon, QKeySequence
 from PySide6.QtCore import QSize, Qt, QItemSelectionModel
 from unittest.mock import patch, MagicMock
+from conftest import finished_future, wire_background_calls
+import threading
+from concurrent.futures import Future
 
 
 # Test _validate_numeric_input
@@ -109,16 +124,17 @@ def test_onLoadFilesButtonClick(qtbot, monkeypatch):
     monkeypatch.setattr(QFileDialog, 'selectedFiles', lambda self: mock_selected_files)
 
     mw.files_done = [0] # Simulate a file already marked as done
-    mw.file_list.addItem("dummy_item") # Add a dummy item to ensure clear() works
+    mw.file_model.set_files(["dummy_item"]) # Add a dummy row to ensure it is replaced
 
     with mock.patch('PySide6.QtGui.QPixmap'), mock.patch('PySide6.QtGui.QIcon'):
         mw.onLoadFilesButtonClick()
 
+    qtbot.waitUntil(lambda: mw.file_model.index(0).data(Qt.UserRole) != "dummy_item")
     assert mw.file_list.count() == 2
-    assert mw.file_list.item(0).data(Qt.UserRole) == "/path/to/image1.jpg"
-    assert mw.file_list.item(1).data(Qt.UserRole) == "/path/to/image2.png"
-    assert mw.file_list.item(0).text() == "image1.jpg"
-    assert mw.file_list.item(1).text() == "image2.png"
+    assert mw.file_model.index(0).data(Qt.UserRole) == "/path/to/image1.jpg"
+    assert mw.file_model.index(1).data(Qt.UserRole) == "/path/to/image2.png"
+    assert mw.file_model.index(0).data() == "image1.jpg"
+    assert mw.file_model.index(1).data() == "image2.png"
     assert mw.files_done == []
     assert mw.file_list.currentRow() == 0
 
@@ -161,10 +177,11 @@ def test_save_post_save_list_management(qtbot, monkeypatch):
         mw = MainWindow()
         qtbot.addWidget(mw)
         mw.exif_manager = mock_exif_manager.return_value
-        mw.exif_manager.save_exif_data.return_value = True
+        wire_background_calls(mw.exif_manager)
+        mw.exif_manager.save_exif_data_batch.side_effect = lambda paths, tags: {p: SAVE_MODE_IN_PLACE for p in paths}
         mw.exif_manager.load_exif_data.return_value = {"SourceFile": "/mock/path/to/image.jpg"}
 
-        with mock.patch('src.timestamper.main.QPixmap'), mock.patch('src.timestamper.main.QIcon', return_value=QIcon()):
+        with mock.patch('src.timestamper.main.QPixmap'):
             # Scenario 1: Save first file, move to next
             mw.load_files(["file1.jpg", "file2.jpg", "file3.jpg"])
             mw.file_list.setCurrentRow(0)
@@ -326,7 +343,8 @@ def mw_new(qtbot):
         # Configure the mock manager to behave as if exiftool is correctly configured
         mock_instance = mock_exif_manager.return_value
         mock_instance.load_exif_data.return_value = {'SourceFile': 'mock.jpg'}
-        mock_instance.save_exif_data.return_value = True
+        mock_instance.save_exif_data_batch.side_effect = lambda paths, tags: {p: SAVE_MODE_IN_PLACE for p in paths}
+        wire_background_calls(mock_instance)
 
         window = MainWindow()
         qtbot.addWidget(window)
@@ -342,7 +360,7 @@ def test_apply_to_selected_save(mw_new, qtbot):
     """Test that the save operation applies to all selected files."""
     # Load some mock files
     files = ["/path/to/image1.jpg", "/path/to/image2.jpg", "/path/to/image3.jpg"]
-    with mock.patch('src.timestamper.main.QPixmap'), mock.patch('src.timestamper.main.QIcon', return_value=QIcon()):
+    with mock.patch('src.timestamper.main.QPixmap'):
         mw_new.load_files(files)
 
     # Select multiple items
@@ -350,45 +368,46 @@ def test_apply_to_selected_save(mw_new, qtbot):
     mw_new.file_list.selectionModel().setCurrentIndex(mw_new.file_list.model().index(1, 0), QItemSelectionModel.Select)
     mw_new.file_list.selectionModel().setCurrentIndex(mw_new.file_list.model().index(2, 0), QItemSelectionModel.Select)
     
-    # Mock the save execution
-    with mock.patch.object(mw_new, '_execute_save', return_value=True) as mock_execute_save:
-        mw_new.save()
-        # Assert that _execute_save was called for each selected file
-        assert mock_execute_save.call_count == 3
-        mock_execute_save.assert_any_call(files[0], mock.ANY)
-        mock_execute_save.assert_any_call(files[1], mock.ANY)
-        mock_execute_save.assert_any_call(files[2], mock.ANY)
+    modes = [SAVE_MODE_IN_PLACE, SAVE_MODE_IN_PLACE, SAVE_MODE_APPENDED]
+    mw_new.exif_manager.save_exif_data_batch.side_effect = lambda paths, tags: dict(zip(paths, modes))
+    mw_new.save()
+
+    # All selected files are saved together in one batch
+    mw_new.exif_manager.save_exif_data_batch.assert_called_once()
+    saved_paths, _ = mw_new.exif_manager.save_exif_data_batch.call_args[0]
+    assert sorted(saved_paths) == files
+    mw_new.exif_manager.save_exif_data.assert_not_called()
+    assert sorted(mw_new.files_done) == [0, 1, 2]
+    assert mw_new.statusBar().currentMessage() == "Saved EXIF to 3 files: 1 appended, 2 in-place"
 
 def test_thumbnail_view_loading(mw_new, qtbot):
     """Test that files are loaded as thumbnails."""
     files = ["/path/to/image1.jpg"]
-    with mock.patch('src.timestamper.main.QPixmap'), mock.patch('src.timestamper.main.QIcon', return_value=QIcon()):
+    with mock.patch('src.timestamper.main.QPixmap'):
         mw_new.load_files(files)
         assert mw_new.file_list.count() == 1
-        item = mw_new.file_list.item(0)
-        assert isinstance(item, QListWidgetItem)
-        assert item.icon() is not None
-        assert item.text() == "image1.jpg"
-        assert item.data(Qt.UserRole) == "/path/to/image1.jpg"
+        index = mw_new.file_model.index(0)
+        assert index.data(Qt.DecorationRole) is not None
+        assert index.data() == "image1.jpg"
+        assert index.data(Qt.UserRole) == "/path/to/image1.jpg"
 
 def test_selection_change_updates_ui(mw_new, qtbot):
     """Test that selecting a thumbnail updates the UI."""
     files = ["/path/to/image1.jpg", "/path/to/image2.jpg"]
-    with mock.patch('src.timestamper.main.QPixmap'), mock.patch('src.timestamper.main.QIcon', return_value=QIcon()):
+    with mock.patch('src.timestamper.main.QPixmap'):
         mw_new.load_files(files)
     
-    with mock.patch.object(mw_new, '_load_exif_data') as mock_load_exif, \
-         mock.patch.object(mw_new, '_update_exif_info_view') as mock_update_exif, \
+    with mock.patch.object(mw_new, '_update_exif_info_view') as mock_update_exif, \
          mock.patch.object(mw_new, '_update_image_preview') as mock_update_preview:
         
         # Reset mocks after initial load
-        mock_load_exif.reset_mock()
         mock_update_exif.reset_mock()
         mock_update_preview.reset_mock()
 
         mw_new.file_list.setCurrentRow(1)
         
-        mock_load_exif.assert_called_once()
+        # The prefetcher may also read neighbouring files in the background
+        mw_new.exif_manager.submit_load.assert_any_call("/path/to/image2.jpg", READ_PROFILE_FORM)
         mock_update_exif.assert_called_once()
         mock_update_preview.assert_called_once()
         assert mw_new.current_path == "/path/to/image2.jpg"
@@ -397,7 +416,7 @@ def test_selection_change_updates_ui(mw_new, qtbot):
 def test_file_done_indicator(mw_new, qtbot):
     """Test that a checkmark appears next to a file after it's saved."""
     files = ["/path/to/image1.jpg", "/path/to/image2.jpg"]
-    with mock.patch('src.timestamper.main.QPixmap'), mock.patch('src.timestamper.main.QIcon', return_value=QIcon()):
+    with mock.patch('src.timestamper.main.QPixmap'):
         mw_new.load_files(files)
     
     # Select the first file and save it
@@ -405,9 +424,441 @@ def test_file_done_indicator(mw_new, qtbot):
     mw_new.save()
     
     # Assert that the 'done' status is set for the first item
-    item = mw_new.file_list.item(0)
-    assert item.data(Qt.UserRole + 1) == True
+    assert mw_new.file_model.index(0).data(Qt.UserRole + 1) == True
     
     # Verify that the second item is not marked as done
-    item2 = mw_new.file_list.item(1)
-    assert item2.data(Qt.UserRole + 1) == False
+    assert mw_new.file_model.index(1).data(Qt.UserRole + 1) == False
+
+def test_batch_save_marks_only_successful_files_done(mw_new, qtbot):
+    """Test that files which fail within a batch save are not marked as done."""
+    files = ["/path/to/image1.jpg", "/path/to/image2.jpg", "/path/to/image3.jpg"]
+    with mock.patch('src.timestamper.main.QPixmap'):
+        mw_new.load_files(files)
+    mw_new.file_list.selectAll()
+
+    mw_new.exif_manager.save_exif_data_batch.side_effect = lambda paths, tags: {p: SAVE_MODE_IN_PLACE if p != files[1] else None for p in paths}
+    mw_new.save()
+
+    assert sorted(mw_new.files_done) == [0, 2]
+    assert mw_new.file_list.currentRow() == 1
+
+def test_save_is_written_behind_and_advances_immediately(mw_new, qtbot):
+    """Test that a save marks the row pending, moves on, and flips it to done once written."""
+    files = ["/path/to/image1.jpg", "/path/to/image2.jpg"]
+    with mock.patch('src.timestamper.main.QPixmap'):
+        mw_new.load_files(files)
+    mw_new.file_list.setCurrentRow(0)
+
+    pending = Future()
+    mw_new.exif_manager.submit_save.side_effect = None
+    mw_new.exif_manager.submit_save.return_value = pending
+    mw_new.save()
+
+    assert mw_new.file_list.currentRow() == 1
+    assert mw_new.file_model.index(0).data() == PENDING_ICON + "image1.jpg"
+    assert mw_new.files_done == []
+
+    threading.Thread(target=pending.set_result, args=({files[0]: SAVE_MODE_IN_PLACE},)).start()
+    qtbot.waitUntil(lambda: mw_new.files_done == [0])
+    assert mw_new.file_model.index(0).data() == DONE_ICON + "image1.jpg"
+    assert 0 not in mw_new.files_pending
+
+def test_failed_background_save_can_be_retried(mw_new, qtbot):
+    """Test that a failed save marks the row as an error and can be queued again."""
+    files = ["/path/to/image1.jpg", "/path/to/image2.jpg"]
+    with mock.patch('src.timestamper.main.QPixmap'):
+        mw_new.load_files(files)
+    mw_new.file_list.setCurrentRow(0)
+
+    mw_new.exif_manager.save_exif_data_batch.side_effect = lambda paths, tags: {p: None for p in paths}
+    mw_new.save()
+    assert mw_new.file_model.index(0).data() == ERROR_ICON + "image1.jpg"
+    assert 0 in mw_new.files_failed and mw_new.files_done == []
+
+    mw_new.exif_manager.save_exif_data_batch.side_effect = lambda paths, tags: {p: SAVE_MODE_IN_PLACE for p in paths}
+    mw_new.retry_failed_saves()
+    assert mw_new.file_model.index(0).data() == DONE_ICON + "image1.jpg"
+    assert mw_new.files_failed == {} and mw_new.files_done == [0]
+    retried_paths, retried_tags = mw_new.exif_manager.submit_save.call_args[0]
+    assert retried_paths == [files[0]]
+    assert retried_tags == mw_new.exif_manager.submit_save.call_args_list[0][0][1]
+
+def test_close_flushes_queued_saves(mw_new, qtbot):
+    """Test that closing the window waits for queued saves to be written."""
+    with mock.patch('src.timestamper.main.QPixmap'):
+        mw_new.load_files(["/path/to/image1.jpg"])
+    pending = Future()
+    mw_new.exif_manager.submit_save.side_effect = None
+    mw_new.exif_manager.submit_save.return_value = pending
+    mw_new.save()
+
+    threading.Timer(0.05, pending.set_result, args=({"/path/to/image1.jpg": SAVE_MODE_IN_PLACE},)).start()
+    mw_new.close()
+    assert pending.done()
+
+def test_undo_last_save_restores_rows(mw_new, qtbot):
+    """Test that undoing a save unmarks its rows and reloads the current file."""
+    files = ["/path/to/image1.jpg", "/path/to/image2.jpg"]
+    with mock.patch('src.timestamper.main.QPixmap'):
+        mw_new.load_files(files)
+    mw_new.file_list.setCurrentRow(0)
+    mw_new.save()
+    assert mw_new.files_done == [0]
+
+    mw_new.file_list.setCurrentRow(0)
+    mw_new.exif_manager.can_undo = True
+    mw_new.exif_manager.submit_undo.return_value = finished_future(lambda: {files[0]: SAVE_MODE_IN_PLACE})
+    loads = mw_new.exif_manager.submit_load.call_count
+    mw_new.undo_last_save()
+
+    assert mw_new.files_done == []
+    assert mw_new.file_model.index(0).data() == "image1.jpg"
+    assert mw_new.exif_manager.submit_load.call_count > loads
+
+    mw_new.exif_manager.can_undo = False
+    mw_new.undo_last_save()
+    assert mw_new.exif_manager.submit_undo.call_count == 1
+
+def test_changed_image_data_is_flagged(mw_new, qtbot):
+    """Test that a save whose verification failed marks the row instead of completing it."""
+    with mock.patch('src.timestamper.main.QPixmap'):
+        mw_new.load_files(["/path/to/image1.jpg", "/path/to/image2.jpg"])
+    mw_new.file_list.setCurrentRow(0)
+    mw_new.exif_manager.save_exif_data_batch.side_effect = lambda paths, tags: {p: SAVE_MODE_PAYLOAD_CHANGED for p in paths}
+    mw_new.save()
+
+    index = mw_new.file_model.index(0)
+    assert index.data() == MISMATCH_ICON + "image1.jpg"
+    assert index.data(Qt.ToolTipRole)
+    assert mw_new.files_mismatched == {0} and mw_new.files_done == [] and mw_new.files_failed == {}
+
+def test_thumbnails_are_decoded_in_the_background(mw_new, qtbot, tmp_path):
+    """Test that rows appear with a placeholder and get their thumbnail once it is decoded."""
+    from PySide6.QtGui import QColor, QImage
+    files = []
+    for name in ("a.jpg", "b.jpg"):
+        file_path = str(tmp_path / name)
+        image = QImage(64, 48, QImage.Format.Format_RGB32)
+        image.fill(QColor(200, 100, 50))
+        assert image.save(file_path)
+        files.append(file_path)
+
+    mw_new.load_files(files)
+    assert mw_new.file_list.count() == 2
+    assert mw_new.file_model.index(0).data(Qt.DecorationRole).cacheKey() == mw_new.file_model.placeholder.cacheKey()
+    qtbot.waitUntil(lambda: all(mw_new.file_model.has_thumbnail(row) for row in range(2)))
+    assert isinstance(mw_new.file_model.index(0).data(Qt.DecorationRole), QPixmap)
+
+    # Thumbnails decoded for a file that is no longer listed are dropped
+    with mock.patch.object(mw_new, '_start_thumbnail_loads'):
+        mw_new.load_files(files[1:])
+    mw_new._on_thumbnail_loaded(files[0], QImage(8, 8, QImage.Format.Format_RGB32))
+    assert not mw_new.file_model.has_thumbnail(0)
+
+
+def test_thumbnails_are_only_loaded_near_the_viewport(mw_new, qtbot):
+    """Test that only rows near the visible ones get thumbnails and far ones are released."""
+    from PySide6.QtGui import QImage
+    from src.timestamper.constants import THUMBNAIL_KEEP_ROWS, THUMBNAIL_PREFETCH_ROWS
+    files = [f"/path/to/image{i:05d}.jpg" for i in range(5000)]
+    with mock.patch.object(mw_new, '_start_thumbnail_loads') as start_loads:
+        mw_new.load_files(files)
+        assert start_loads.call_args[0][0] == list(range(THUMBNAIL_PREFETCH_ROWS + 1))
+        assert mw_new.exif_manager.preload_exif_data.call_count <= 1
+
+        for row in range(THUMBNAIL_PREFETCH_ROWS + 1):
+            mw_new._on_thumbnail_loaded(files[row], QImage(8, 8, QImage.Format.Format_RGB32))
+        assert mw_new.file_model.has_thumbnail(0)
+
+        mw_new.on_visible_rows_changed(4000, 4020)
+        rows = start_loads.call_args[0][0]
+        assert sorted(rows) == list(range(4000 - THUMBNAIL_PREFETCH_ROWS, 4020 + THUMBNAIL_PREFETCH_ROWS + 1))
+        assert rows[:21] == list(range(4000, 4021))  # Visible rows are decoded first
+        assert not mw_new.file_model.has_thumbnail(0)
+        assert mw_new._is_thumbnail_unwanted(mw_new.file_model.files, 0)
+        assert not mw_new._is_thumbnail_unwanted(mw_new.file_model.files, 4020 + THUMBNAIL_KEEP_ROWS)
+
+
+def test_reopened_files_use_cached_thumbnails(mw_new, qtbot, tmp_path):
+    """Test that thumbnails come from the thumbnail cache when files are loaded again."""
+    from PySide6.QtGui import QColor, QImage
+    from src.timestamper.thumbnail_cache import ThumbnailCache
+    file_path = str(tmp_path / "a.jpg")
+    image = QImage(64, 48, QImage.Format.Format_RGB32)
+    image.fill(QColor(200, 100, 50))
+    assert image.save(file_path)
+    mw_new.thumbnail_cache = ThumbnailCache(str(tmp_path / "thumbnails.pack"), 1024 * 1024)
+
+    mw_new.load_files([file_path])
+    qtbot.waitUntil(lambda: mw_new.file_model.has_thumbnail(0))
+    assert len(mw_new.thumbnail_cache) == 1
+
+    with patch('src.timestamper.workers.load_scaled_image', side_effect=AssertionError("decoded again")):
+        mw_new.load_files([file_path])
+        assert not mw_new.file_model.has_thumbnail(0)
+        qtbot.waitUntil(lambda: mw_new.file_model.has_thumbnail(0))
+    mw_new.thread_pool.waitForDone()
+    mw_new.thumbnail_cache.close()
+
+
+def test_resizing_rescales_the_preview_from_memory(mw_new, qtbot, tmp_path):
+    """Test that resizing the window never decodes the image again and ends with a smooth rescale."""
+    from PySide6.QtGui import QColor, QImage
+    file_path = str(tmp_path / "a.jpg")
+    image = QImage(640, 480, QImage.Format.Format_RGB32)
+    image.fill(QColor(200, 100, 50))
+    assert image.save(file_path)
+    mw_new.load_files([file_path])
+    qtbot.waitUntil(lambda: not mw_new.pic.pixmap().isNull())
+    assert len(mw_new.preview_cache) == 1
+
+    with patch('src.timestamper.workers.load_scaled_image', side_effect=AssertionError("decoded again")), \
+         patch.object(mw_new, '_show_preview', wraps=mw_new._show_preview) as show_preview:
+        mw_new.show()
+        mw_new.resize(mw_new.width() + 40, mw_new.height() + 30)
+        mw_new.resize(mw_new.width() + 40, mw_new.height() + 30)
+        assert all(call.kwargs == {"smooth": False} for call in show_preview.call_args_list)
+        qtbot.waitUntil(lambda: show_preview.call_args == mock.call())
+
+        # Selecting the file again is served from the preview cache
+        mw_new.file_list.setCurrentRow(-1)
+        mw_new.file_list.setCurrentRow(0)
+    assert not mw_new.pic.pixmap().isNull()
+
+
+def test_previews_are_decoded_off_the_gui_thread(mw_new, qtbot, tmp_path):
+    """Test that an uncached preview is decoded on the thread pool and shown when it arrives."""
+    from PySide6.QtCore import QThread
+    from PySide6.QtGui import QColor
+    from src.timestamper.image_loader import load_scaled_image
+    file_path = str(tmp_path / "a.jpg")
+    image = QImage(640, 480, QImage.Format.Format_RGB32)
+    image.fill(QColor(200, 100, 50))
+    assert image.save(file_path)
+    threads = []
+
+    def decode(*args):
+        threads.append(QThread.currentThread())
+        return load_scaled_image(*args)
+
+    with patch('src.timestamper.workers.load_scaled_image', side_effect=decode):
+        mw_new.load_files([file_path])
+        assert mw_new.pic.pixmap().isNull()
+        qtbot.waitUntil(lambda: not mw_new.pic.pixmap().isNull())
+    assert threads and QThread.currentThread() not in threads
+
+
+def test_next_files_are_prefetched(mw_new, qtbot, tmp_path):
+    """Test that selecting a file warms the caches for the next files not done and the previous one."""
+    from PySide6.QtGui import QColor, QImage
+    from src.timestamper.constants import PREFETCH_AHEAD_FILES
+    files = []
+    for i in range(PREFETCH_AHEAD_FILES + 3):
+        file_path = str(tmp_path / f"{i}.jpg")
+        image = QImage(64, 48, QImage.Format.Format_RGB32)
+        image.fill(QColor(200, 100, 50))
+        assert image.save(file_path)
+        files.append(file_path)
+    mw_new.load_files(files)
+    mw_new.files_done = [2]
+
+    assert mw_new._prefetch_rows(1) == [3, 4, 5, 0]
+    mw_new.file_list.setCurrentRow(1)
+    mw_new.thread_pool.waitForDone()
+    for row in (0, 3, 4, 5):
+        assert mw_new.preview_cache.get(files[row]) is not None
+        mw_new.exif_manager.submit_load.assert_any_call(files[row], READ_PROFILE_FORM)
+
+    # Saving advances to a prefetched file, which is shown without decoding it again
+    with patch('src.timestamper.workers.load_scaled_image', side_effect=AssertionError("decoded again")):
+        mw_new.save()
+    assert mw_new.current_path == files[3]
+    assert not mw_new.pic.pixmap().isNull()
+
+
+def test_prefetch_is_cancelled_when_moving_away(mw_new, qtbot):
+    """Test that the prefetch for a file the user left is cancelled, queued metadata reads included."""
+    files = [f"/path/to/image{i}.jpg" for i in range(5)]
+    with patch('src.timestamper.main.Prefetcher') as prefetcher_class, \
+         patch.object(mw_new.thread_pool, 'start'):
+        mw_new.load_files(files)
+        first = mw_new._prefetcher
+        mw_new.file_list.setCurrentRow(2)
+        first.cancel.assert_called_once()
+        assert prefetcher_class.call_args[0][0] == files[3:5] + files[0:1] + files[1:2]
+        mw_new.file_list.clearSelection()
+    assert mw_new._prefetcher is None
+
+
+def test_grid_view_reuses_decoded_thumbnails(mw_new, qtbot, tmp_path):
+    """Test that switching between list and grid only decodes thumbnails when larger ones are needed."""
+    from PySide6.QtGui import QColor, QImage
+    from src.timestamper.image_loader import load_scaled_image
+    files = []
+    for i in range(3):
+        file_path = str(tmp_path / f"{i}.jpg")
+        image = QImage(640, 480, QImage.Format.Format_RGB32)
+        image.fill(QColor(200, 100, 50))
+        assert image.save(file_path)
+        files.append(file_path)
+    mw_new.set_grid_mode(False)
+    mw_new.show()
+    mw_new.load_files(files)
+    qtbot.waitUntil(lambda: all(mw_new.file_model.has_thumbnail(row) for row in range(3)))
+    mw_new.thread_pool.waitForDone()
+
+    with patch('src.timestamper.workers.load_scaled_image', wraps=load_scaled_image) as decode:
+        mw_new.set_grid_mode(True)
+        assert mw_new.file_list.isGridMode() and mw_new.thumbnail_size_slider.isVisible()
+        mw_new.set_grid_icon_size(256)
+        assert mw_new.file_list.iconSize().width() == 256
+        qtbot.waitUntil(lambda: decode.call_count == 3)
+        mw_new.thread_pool.waitForDone()
+        qtbot.waitUntil(lambda: mw_new.file_model.index(0).data(Qt.DecorationRole).width() == 256)
+
+        mw_new.set_grid_mode(False)
+        mw_new.set_grid_mode(True)
+        mw_new.set_grid_icon_size(128)
+        qtbot.wait(50)
+        mw_new.thread_pool.waitForDone()
+    assert decode.call_count == 3
+    assert mw_new.settings.value("grid_icon_size") == 128
+
+
+def test_larger_cached_thumbnails_are_scaled_down(tmp_path, qapp):
+    """Test that a thumbnail batch scales down cached larger tiers instead of decoding the file."""
+    from PySide6.QtCore import QSize
+    from PySide6.QtGui import QColor, QImage
+    from src.timestamper.thumbnail_cache import ThumbnailCache
+    from src.timestamper.workers import ThumbnailLoader, ThumbnailLoaderSignals
+    file_path = str(tmp_path / "a.jpg")
+    image = QImage(640, 480, QImage.Format.Format_RGB32)
+    image.fill(QColor(200, 100, 50))
+    assert image.save(file_path)
+    cache = ThumbnailCache(str(tmp_path / "thumbnails.pack"), 1024 * 1024)
+    cache.put(file_path, QSize(256, 256), os.stat(file_path).st_mtime_ns, image.scaled(256, 192))
+
+    signals = ThumbnailLoaderSignals()
+    loaded = []
+    signals.loaded.connect(lambda *args: loaded.append(args))
+    jobs = [(file_path, lambda: False), (str(tmp_path / "missing.jpg"), lambda: False), (file_path, lambda: True)]
+    with patch('src.timestamper.workers.load_scaled_image', side_effect=AssertionError("decoded")):
+        ThumbnailLoader(jobs, 64, signals, cache, [128, 256]).run()
+    (path, thumbnail, tier), = loaded
+    assert (path, tier) == (file_path, 64)
+    assert (thumbnail.width(), thumbnail.height()) == (64, 48)
+    cache.close()
+
+
+def test_dropped_folders_are_scanned_recursively(mw_new, qtbot, tmp_path):
+    """Test that dropping a folder streams in the images of all its subfolders, in sorted order."""
+    for name in ("b.jpg", "a/2.tif", "a/1.png", "a/deep/x.jpeg", "notes.txt", ".hidden/c.jpg"):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_bytes(b"")
+    mw_new.load_files(["/path/to/stale.jpg"])
+
+    # One image per batch, so the later ones are appended to the list the first replaced
+    with patch('src.timestamper.workers.scan_images', partial(scan_images, batch_size=1)), \
+            patch('src.timestamper.workers.load_scaled_image', return_value=QImage()):
+        mw_new.file_list.filesDropped.emit([str(tmp_path)])
+        qtbot.waitUntil(lambda: mw_new._folder_scanner is None)
+
+    expected = [str(tmp_path / name) for name in ("a/1.png", "a/2.tif", "a/deep/x.jpeg", "b.jpg")]
+    assert mw_new.file_model.files == expected
+    assert mw_new.current_path == expected[0]
+
+
+def test_folder_scan_results_are_sorted_when_it_finishes(mw_new, qtbot):
+    """Test that batches arriving out of order end up sorted, keeping the current file and row state."""
+    release = threading.Event()
+
+    def fake_scan(paths, is_cancelled):
+        yield ["/r/b.jpg", "/r/d.jpg"], 1
+        yield ["/q/a.jpg", "/r/c.jpg"], 2
+        release.wait(5)
+        yield [], 2
+
+    with patch('src.timestamper.workers.scan_images', fake_scan), \
+            patch('src.timestamper.workers.load_scaled_image', return_value=QImage()):
+        mw_new.open_paths(["/r", "/q"])
+        qtbot.waitUntil(lambda: len(mw_new.file_model.files) == 4)
+        assert mw_new.file_model.files == ["/r/b.jpg", "/r/d.jpg", "/q/a.jpg", "/r/c.jpg"]
+        mw_new.file_model.set_marker(1, DONE_ICON)
+        release.set()
+        qtbot.waitUntil(lambda: mw_new._folder_scanner is None)
+
+    assert mw_new.file_model.files == ["/q/a.jpg", "/r/b.jpg", "/r/c.jpg", "/r/d.jpg"]
+    assert mw_new.current_path == "/r/b.jpg"
+    assert mw_new.file_list.currentRow() == 1
+    assert mw_new.file_model.index(3).data().startswith(DONE_ICON)
+
+
+def test_saves_during_a_folder_scan_follow_their_files_when_it_sorts(mw_new, qtbot):
+    """Test that saves queued or finished while a scan runs keep their state once the list is sorted."""
+    release = threading.Event()
+
+    def fake_scan(paths, is_cancelled):
+        yield ["/r/b.jpg", "/r/d.jpg"], 1
+        yield ["/q/a.jpg"], 2
+        release.wait(5)
+        yield [], 2
+
+    pending, failed = Future(), Future()
+    failed.set_result({"/r/d.jpg": None})
+    mw_new.exif_manager.submit_save.side_effect = [pending, failed]
+    with patch('src.timestamper.workers.scan_images', fake_scan), \
+            patch('src.timestamper.workers.load_scaled_image', return_value=QImage()):
+        mw_new.open_paths(["/r", "/q"])
+        qtbot.waitUntil(lambda: len(mw_new.file_model.files) == 3)
+        mw_new.file_list.setCurrentRow(0)
+        mw_new.save()  # /r/b.jpg, left pending
+        mw_new.save()  # /r/d.jpg, fails
+        release.set()
+        qtbot.waitUntil(lambda: mw_new._folder_scanner is None)
+
+    assert mw_new.file_model.files == ["/q/a.jpg", "/r/b.jpg", "/r/d.jpg"]
+    assert mw_new.files_pending == {1: 1}
+    assert list(mw_new.files_failed) == [2]
+    assert mw_new.file_model.index(2).data() == ERROR_ICON + "d.jpg"
+
+    threading.Thread(target=pending.set_result, args=({"/r/b.jpg": SAVE_MODE_IN_PLACE},)).start()
+    qtbot.waitUntil(lambda: mw_new.files_done == [1])
+    assert mw_new.files_pending == {}
+    assert mw_new.file_model.index(1).data() == DONE_ICON + "b.jpg"
+    assert mw_new.file_model.index(0).data() == "a.jpg"
+
+
+def test_a_scan_that_finds_nothing_keeps_the_list(mw_new, qtbot):
+    """Test that a scan without images neither replaces nor reorders the files already listed."""
+    mw_new.load_files(["/path/to/b.jpg"])
+    mw_new.append_files(["/path/to/a.jpg"])
+    with patch('src.timestamper.workers.scan_images', lambda paths, is_cancelled: iter([([], 1)])):
+        mw_new.open_paths(["/empty"])
+        qtbot.waitUntil(lambda: mw_new._folder_scanner is None)
+    assert mw_new.file_model.files == ["/path/to/b.jpg", "/path/to/a.jpg"]
+
+
+def test_folder_scan_is_cancelled_by_a_new_one(mw_new, qtbot, tmp_path):
+    """Test that batches from a replaced scan never reach the list."""
+    (tmp_path / "old").mkdir()
+    (tmp_path / "old" / "old.jpg").write_bytes(b"")
+    mw_new.open_paths([str(tmp_path / "old")])
+    old_scanner = mw_new._folder_scanner
+    mw_new.open_paths(["/path/to/new.jpg"])
+    assert old_scanner.is_cancelled()
+
+    qtbot.waitUntil(lambda: mw_new._folder_scanner is None)
+    mw_new.thread_pool.waitForDone()
+    qtbot.wait(10)
+    assert mw_new.file_model.files == ["/path/to/new.jpg"]
+
+
+def test_changing_settings_keeps_the_undo_history(mock_settings, mw_new):
+    """Test that the ExifManager rebuilt after the settings dialog reuses the window's undo journal."""
+    journal = mw_new.undo_journal
+    with patch('src.timestamper.main.ExifManager') as exif_manager, \
+            patch('src.timestamper.main.SettingsDialog') as dialog:
+        dialog.return_value.exec.return_value = True
+        mw_new.open_settings_dialog()
+    assert exif_manager.call_args.kwargs["journal"] is journal
+    assert mw_new.undo_journal is journal
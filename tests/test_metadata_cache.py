@@ -0,0 +1,61 @@
+import os
+from src.timestamper.metadata_cache import MetadataCache, file_signature
+
+
+def _write(file_path, content):
+    with open(file_path, "w") as f:
+        f.write(content)
+
+
+def test_unchanged_file_is_served_from_cache(tmp_path):
+    """Test that a cached entry is returned while the file is unchanged."""
+    file_path = str(tmp_path / "a.jpg")
+    _write(file_path, "image")
+    cache = MetadataCache(max_entries=10, max_bytes=1 << 20)
+
+    cache.put(file_path, "form", {"EXIF:Make": "Nikon"}, file_signature(file_path))
+    assert cache.get(file_path, "form") == {"EXIF:Make": "Nikon"}
+    assert cache.get(file_path, "full") is None
+
+
+def test_changed_file_is_not_served_from_cache(tmp_path):
+    """Test that a file modified on disk invalidates its entry."""
+    file_path = str(tmp_path / "a.jpg")
+    _write(file_path, "image")
+    cache = MetadataCache(max_entries=10, max_bytes=1 << 20)
+    cache.put(file_path, "form", {"EXIF:Make": "Nikon"}, file_signature(file_path))
+
+    st = os.stat(file_path)
+    os.utime(file_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert cache.get(file_path, "form") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Test that the entry budget evicts the least recently used file first."""
+    cache = MetadataCache(max_entries=2, max_bytes=1 << 20)
+    paths = [str(tmp_path / f"{name}.jpg") for name in "abc"]
+    for file_path in paths[:2]:
+        cache.put(file_path, "form", {"SourceFile": file_path}, None)
+
+    assert cache.get(paths[0], "form") is not None  # a is now more recent than b
+    cache.put(paths[2], "form", {"SourceFile": paths[2]}, None)
+
+    assert cache.get(paths[0], "form") is not None
+    assert cache.get(paths[1], "form") is None
+    assert cache.get(paths[2], "form") is not None
+
+
+def test_byte_budget_and_invalidate(tmp_path):
+    """Test that the byte budget bounds the cache and invalidate drops every profile."""
+    cache = MetadataCache(max_entries=100, max_bytes=1000)
+    for i in range(20):
+        cache.put(str(tmp_path / f"{i}.jpg"), "form", {"EXIF:Make": "x" * 100}, None)
+    assert cache.size_bytes <= 1000
+    assert 0 < len(cache) < 20
+
+    file_path = str(tmp_path / "19.jpg")
+    cache.put(file_path, "full", {"EXIF:Make": "Nikon"}, None)
+    cache.invalidate(file_path)
+    assert cache.get(file_path, "form") is None
+    assert cache.get(file_path, "full") is None
@@ -0,0 +1,37 @@
+from src.timestamper.metadata_cache import FileSignature
+from src.timestamper.metadata_index import MetadataIndex, open_metadata_index
+
+
+def test_index_persists_across_sessions(tmp_path):
+    """Test that indexed metadata survives closing and reopening the database."""
+    db_path = str(tmp_path / "index.sqlite3")
+    signature = FileSignature(100, 123456789, 42)
+
+    index = MetadataIndex(db_path)
+    index.put_many([("/scans/a.tif", signature, {"EXIF:Make": "Nikon"})], "form")
+    index.close()
+
+    index = MetadataIndex(db_path)
+    assert index.get_many(["/scans/a.tif", "/scans/b.tif"], "form") == {
+        "/scans/a.tif": (signature, {"EXIF:Make": "Nikon"})
+    }
+    assert index.get_many(["/scans/a.tif"], "full") == {}
+    index.close()
+
+
+def test_invalidate_and_unsigned_entries(tmp_path):
+    """Test that invalidated files are dropped and files without a signature are not indexed."""
+    index = MetadataIndex(str(tmp_path / "index.sqlite3"))
+    signature = FileSignature(1, 2, 3)
+    index.put_many([("/a.jpg", signature, {}), ("/b.jpg", signature, {}), ("/c.jpg", None, {})], "form")
+    assert len(index) == 2
+
+    index.invalidate_many(["/a.jpg"])
+    assert list(index.get_many(["/a.jpg", "/b.jpg", "/c.jpg"], "form")) == ["/b.jpg"]
+    index.close()
+
+
+def test_unavailable_index_is_skipped(tmp_path):
+    """Test that an index that cannot be opened is replaced by None."""
+    assert open_metadata_index(None) is None
+    assert open_metadata_index(str(tmp_path / "missing" / "index.sqlite3")) is None
@@ -0,0 +1,209 @@
+import shutil
+import subprocess
+import pytest
+from PySide6.QtGui import QColor, QImage
+from src.timestamper.constants import SAVE_MODE_APPENDED, SAVE_MODE_IN_PLACE, SAVE_MODE_REWRITTEN
+from src.timestamper.native_exif import (
+    NativeExifUnsupported, embedded_jpegs, payload_digest, read_form_tags, tiff_pages, write_form_tags,
+)
+
+
+TAGS = {
+    "Make": "Nikon",
+    "Model": "FM2",
+    "DateTimeOriginal": "2023:01:01 12:00:00",
+    "OffsetTimeOriginal": "+10:00",
+    "ExposureTime": "0.004",
+    "ShutterSpeedValue": "0.004",
+    "FNumber": "5.6",
+    "MaxApertureValue": "2.8",
+    "FocalLength": "50",
+    "ISO": "400",
+    "LensInfo": "28 70 3.5 4.5",
+    "LensModel": "Nikkor 28-70mm",
+}
+
+
+@pytest.fixture(params=["jpg", "tif"])
+def image_file(request, tmp_path, qapp):
+    """Create a small JPEG or TIFF file without EXIF data."""
+    image = QImage(32, 24, QImage.Format.Format_RGB32)
+    image.fill(QColor(200, 100, 50))
+    file_path = str(tmp_path / f"image.{request.param}")
+    assert image.save(file_path)
+    return file_path
+
+
+def test_round_trip(image_file):
+    """Test that written tags are read back and the image still decodes."""
+    write_form_tags(image_file, TAGS)
+    exif_data = read_form_tags(image_file)
+
+    assert exif_data["SourceFile"] == image_file
+    assert exif_data["EXIF:Make"] == "Nikon"
+    assert exif_data["EXIF:DateTimeOriginal"] == "2023:01:01 12:00:00"
+    assert exif_data["EXIF:OffsetTimeOriginal"] == "+10:00"
+    assert exif_data["EXIF:ExposureTime"] == pytest.approx(0.004)
+    assert exif_data["EXIF:ShutterSpeedValue"] == pytest.approx(0.004)
+    assert exif_data["EXIF:FNumber"] == pytest.approx(5.6)
+    assert exif_data["EXIF:MaxApertureValue"] == pytest.approx(2.8)
+    assert exif_data["EXIF:ISO"] == 400
+    assert exif_data["EXIF:LensInfo"] == "28 70 3.5 4.5"
+
+    image = QImage(image_file)
+    assert (image.width(), image.height()) == (32, 24)
+
+
+def test_rewrite_updates_and_removes_tags(image_file):
+    """Test that a second write replaces values and an empty value removes a tag."""
+    write_form_tags(image_file, TAGS)
+    write_form_tags(image_file, {"Make": "Canon", "Model": ""})
+    exif_data = read_form_tags(image_file)
+
+    assert exif_data["EXIF:Make"] == "Canon"
+    assert "EXIF:Model" not in exif_data
+    assert exif_data["EXIF:LensModel"] == "Nikkor 28-70mm"
+    assert not QImage(image_file).isNull()
+
+
+def test_unsupported_files_and_tags_raise(tmp_path, image_file):
+    """Test that anything the native path cannot handle is left for exiftool."""
+    png_path = tmp_path / "image.png"
+    png_path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 32)
+    with pytest.raises(NativeExifUnsupported):
+        read_form_tags(str(png_path))
+    with pytest.raises(NativeExifUnsupported):
+        write_form_tags(str(png_path), {"Make": "Nikon"})
+    with pytest.raises(NativeExifUnsupported):
+        write_form_tags(image_file, {"Artist": "Someone"})
+    with pytest.raises(NativeExifUnsupported):
+        write_form_tags(image_file, {"FNumber": "fast"})
+
+
+@pytest.mark.skipif(shutil.which("exiftool") is None, reason="exiftool is not installed")
+def test_exiftool_reads_native_output(image_file):
+    """Test that exiftool agrees with what the native writer stored."""
+    write_form_tags(image_file, TAGS)
+    output = subprocess.run(
+        ["exiftool", "-n", "-s3", "-EXIF:Make", "-EXIF:FNumber", "-EXIF:ISO", image_file],
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    assert output == ["Nikon", "5.6", "400"]
+
+
+def test_fitting_values_are_patched_in_place(image_file):
+    """Test that values fitting their existing space are written without moving anything."""
+    assert write_form_tags(image_file, TAGS) in (SAVE_MODE_APPENDED, SAVE_MODE_REWRITTEN)
+    with open(image_file, "rb") as f:
+        before = f.read()
+
+    assert write_form_tags(image_file, {"Make": "Leica", "ISO": "800", "FNumber": "8"}) == SAVE_MODE_IN_PLACE
+    with open(image_file, "rb") as f:
+        after = f.read()
+
+    assert len(after) == len(before)
+    assert sum(a != b for a, b in zip(before, after)) < 32
+    exif_data = read_form_tags(image_file)
+    assert exif_data["EXIF:Make"] == "Leica"
+    assert exif_data["EXIF:ISO"] == 800
+    assert exif_data["EXIF:FNumber"] == 8
+    assert exif_data["EXIF:Model"] == "FM2"
+
+
+def test_growing_values_leave_the_in_place_path(image_file):
+    """Test that a longer value or a new tag falls back to appending or rewriting."""
+    write_form_tags(image_file, TAGS)
+    expected = SAVE_MODE_APPENDED if image_file.endswith(".tif") else SAVE_MODE_REWRITTEN
+
+    assert write_form_tags(image_file, {"Make": "Nikon Corporation"}) == expected
+    assert write_form_tags(image_file, {"LensMake": "Nikon"}) == expected
+    assert write_form_tags(image_file, {"Model": ""}) == expected
+    exif_data = read_form_tags(image_file)
+    assert exif_data["EXIF:Make"] == "Nikon Corporation"
+    assert exif_data["EXIF:LensMake"] == "Nikon"
+    assert "EXIF:Model" not in exif_data
+
+
+def test_repeated_tiff_saves_reuse_appended_space(tmp_path, qapp):
+    """Test that IFDs appended by earlier saves are reclaimed instead of piling up."""
+    image = QImage(32, 24, QImage.Format.Format_RGB32)
+    image.fill(QColor(200, 100, 50))
+    file_path = str(tmp_path / "image.tif")
+    assert image.save(file_path)
+    digest = payload_digest(file_path)
+    write_form_tags(file_path, TAGS)
+
+    sizes = []
+    for i in range(20):
+        make = "Nikon" + " Corporation" * (i % 3)  # Alternately grows and shrinks
+        assert write_form_tags(file_path, {"Make": make, "DateTimeOriginal": f"2023:01:{i + 1:02d} 12:00:00"}) \
+            in (SAVE_MODE_APPENDED, SAVE_MODE_IN_PLACE)
+        with open(file_path, "rb") as f:
+            sizes.append(len(f.read()))
+        exif_data = read_form_tags(file_path)
+        assert exif_data["EXIF:Make"] == make
+        assert exif_data["EXIF:DateTimeOriginal"] == f"2023:01:{i + 1:02d} 12:00:00"
+        assert exif_data["EXIF:LensModel"] == "Nikkor 28-70mm"
+        assert exif_data["EXIF:LensInfo"] == "28 70 3.5 4.5"
+
+    assert max(sizes[10:]) <= max(sizes[:10])
+    assert payload_digest(file_path) == digest
+    assert (QImage(file_path).width(), QImage(file_path).height()) == (32, 24)
+
+
+def test_repeated_jpeg_saves_do_not_grow_the_exif_segment(tmp_path, qapp):
+    """Test that a rebuilt APP1 segment drops the IFDs appended by earlier saves."""
+    image = QImage(32, 24, QImage.Format.Format_RGB32)
+    image.fill(QColor(200, 100, 50))
+    file_path = str(tmp_path / "image.jpg")
+    assert image.save(file_path)
+    digest = payload_digest(file_path)
+    write_form_tags(file_path, TAGS)
+
+    sizes = []
+    for i in range(20):
+        make = "Nikon" + " Corporation" * (i % 3)  # Alternately grows and shrinks
+        assert write_form_tags(file_path, {"Make": make, "DateTimeOriginal": f"2023:01:{i + 1:02d} 12:00:00"}) \
+            in (SAVE_MODE_REWRITTEN, SAVE_MODE_IN_PLACE)
+        with open(file_path, "rb") as f:
+            sizes.append(len(f.read()))
+        exif_data = read_form_tags(file_path)
+        assert exif_data["EXIF:Make"] == make
+        assert exif_data["EXIF:DateTimeOriginal"] == f"2023:01:{i + 1:02d} 12:00:00"
+        assert exif_data["EXIF:LensModel"] == "Nikkor 28-70mm"
+
+    assert max(sizes[10:]) <= max(sizes[:10])
+    assert payload_digest(file_path) == digest
+    assert (QImage(file_path).width(), QImage(file_path).height()) == (32, 24)
+
+
+def test_payload_digest_ignores_metadata_but_not_pixels(image_file, tmp_path):
+    """Test that EXIF writes keep the image data digest and different pixels change it."""
+    before = payload_digest(image_file)
+    write_form_tags(image_file, TAGS)
+    write_form_tags(image_file, {"Make": "Nikon Corporation", "LensMake": "Nikon"})
+    assert payload_digest(image_file) == before
+
+    other = str(tmp_path / ("other." + image_file.rsplit(".", 1)[1]))
+    image = QImage(32, 24, QImage.Format.Format_RGB32)
+    image.fill(QColor(10, 100, 50))
+    assert image.save(other)
+    assert payload_digest(other) != before
+
+    png_path = tmp_path / "image.png"
+    png_path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 32)
+    with pytest.raises(NativeExifUnsupported):
+        payload_digest(str(png_path))
+
+
+def test_image_layout_survives_tag_writes(image_file):
+    """Test that page layouts and embedded previews are described after EXIF writes."""
+    write_form_tags(image_file, TAGS)
+    assert embedded_jpegs(image_file) == []
+    if image_file.endswith(".tif"):
+        page, = tiff_pages(image_file)
+        assert (page.width, page.height, page.compression) == (32, 24, 1)
+        assert sum(page.strip_byte_counts) == 32 * 24 * page.samples_per_pixel
+    else:
+        with pytest.raises(NativeExifUnsupported):
+            tiff_pages(image_file)
@@ -0,0 +1,60 @@
+import os
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QColor, QImage
+from src.timestamper.metadata_cache import file_signature
+from src.timestamper.preview_cache import PreviewCache
+
+
+def _preview(color, width=64, height=48):
+    """Create a solid-colour preview."""
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(color)
+    return image
+
+
+def test_previews_are_served_until_the_file_changes(tmp_path, qapp):
+    """Test that a cached preview is returned only while the file is unchanged."""
+    file_path = tmp_path / "a.jpg"
+    file_path.write_bytes(b"one")
+    cache = PreviewCache(1024 * 1024)
+    cache.put(str(file_path), _preview(QColor(255, 0, 0)), file_signature(str(file_path)))
+    assert cache.get(str(file_path)).pixelColor(0, 0).red() == 255
+    assert cache.get(str(tmp_path / "b.jpg")) is None
+
+    file_path.write_bytes(b"changed")
+    os.utime(file_path, ns=(1, 1))
+    assert cache.get(str(file_path)) is None
+    assert len(cache) == 0
+    assert cache.size_bytes == 0
+
+
+def test_least_recently_used_previews_are_evicted(tmp_path, qapp):
+    """Test that the byte budget evicts the least recently used previews."""
+    one = _preview(QColor(0, 0, 0))
+    cache = PreviewCache(3 * one.sizeInBytes())
+    for name in ("a", "b", "c"):
+        cache.put(f"/{name}.jpg", _preview(QColor(0, 0, 0)), None)
+    assert cache.get("/a.jpg", None) is not None  # Now the most recently used
+    cache.put("/d.jpg", _preview(QColor(0, 0, 0)), None)
+
+    assert len(cache) == 3
+    assert cache.size_bytes == 3 * one.sizeInBytes()
+    assert cache.get("/b.jpg", None) is None
+    assert cache.get("/a.jpg", None) is not None
+
+    # A single preview over budget is still kept
+    cache.put("/big.jpg", _preview(QColor(0, 0, 0), 640, 480), None)
+    assert len(cache) == 1
+
+
+def test_previews_decoded_for_smaller_bounds_are_not_upscaled(qapp):
+    """Test that a preview is only served for bounds no larger than those it was decoded for."""
+    cache = PreviewCache(1024 * 1024)
+    cache.put("/a.jpg", _preview(QColor(0, 0, 0)), None, QSize(560, 480))
+    assert cache.get("/a.jpg", None, QSize(560, 480)) is not None
+    assert cache.get("/a.jpg", None, QSize(280, 240)) is not None
+    assert cache.get("/a.jpg", None, QSize(1120, 960)) is None
+
+    cache.put("/a.jpg", _preview(QColor(0, 0, 0)), None, QSize(1120, 960))
+    assert cache.get("/a.jpg", None, QSize(1120, 960)) is not None
+    assert len(cache) == 1
@@ -0,0 +1,87 @@
+import os
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QColor, QImage
+from src.timestamper.thumbnail_cache import ThumbnailCache, open_thumbnail_cache
+
+SIZE = QSize(64, 64)
+
+
+def _thumbnail(color, width=64, height=48):
+    """Create a solid-colour thumbnail."""
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(color)
+    return image
+
+
+def test_thumbnails_persist_across_sessions(tmp_path, qapp):
+    """Test that cached thumbnails survive reopening, with or without a written index."""
+    pack_path = str(tmp_path / "thumbnails.pack")
+    cache = ThumbnailCache(pack_path, 1024 * 1024)
+    cache.put("/scans/a.tif", SIZE, 100, _thumbnail(QColor(0, 255, 0)))
+    cache.close()
+
+    cache = ThumbnailCache(pack_path, 1024 * 1024)
+    image = cache.get("/scans/a.tif", SIZE, 100)
+    assert (image.width(), image.height()) == (64, 48)
+    assert image.pixelColor(32, 24).green() > 200
+    assert cache.get("/scans/a.tif", QSize(128, 128), 100) is None
+    cache.put("/scans/b.tif", SIZE, 100, _thumbnail(QColor(0, 0, 255)))
+    cache._file.close()  # Simulate a crash: the index does not know about b.tif
+
+    cache = ThumbnailCache(pack_path, 1024 * 1024)
+    assert len(cache) == 2
+    assert cache.get("/scans/b.tif", SIZE, 100).pixelColor(0, 0).blue() > 200
+    cache.close()
+
+
+def test_modified_files_miss(tmp_path, qapp):
+    """Test that a thumbnail made before the file changed is not served."""
+    cache = ThumbnailCache(str(tmp_path / "thumbnails.pack"), 1024 * 1024)
+    cache.put("/a.jpg", SIZE, 100, _thumbnail(QColor(255, 0, 0)))
+    assert cache.get("/a.jpg", SIZE, 200) is None
+    assert len(cache) == 0
+    cache.close()
+
+
+def test_eviction_and_compaction_bound_the_pack(tmp_path, qapp):
+    """Test that old thumbnails are evicted and the pack is compacted to the live ones."""
+    pack_path = str(tmp_path / "thumbnails.pack")
+    cache = ThumbnailCache(pack_path, 64 * 1024)
+    noisy = QImage(256, 256, QImage.Format.Format_RGB32)
+    for y in range(256):
+        for x in range(256):
+            noisy.setPixel(x, y, (x * 7919 + y * 104729) & 0xFFFFFF)
+    for i in range(200):
+        cache.put(f"/scans/{i}.tif", QSize(256, 256), 1, noisy)
+
+    assert cache.size_bytes <= 64 * 1024
+    assert cache.get("/scans/0.tif", QSize(256, 256), 1) is None
+    assert cache.get("/scans/199.tif", QSize(256, 256), 1) is not None
+    assert os.path.getsize(pack_path) < 3 * 1024 * 1024
+    cache.close()
+
+    cache = ThumbnailCache(pack_path, 64 * 1024)
+    assert cache.get("/scans/199.tif", QSize(256, 256), 1) is not None
+    cache.close()
+
+
+def test_torn_records_are_cut_off(tmp_path, qapp):
+    """Test that a record cut short by a crash is dropped instead of breaking the cache."""
+    pack_path = str(tmp_path / "thumbnails.pack")
+    cache = ThumbnailCache(pack_path, 1024 * 1024)
+    cache.put("/a.jpg", SIZE, 1, _thumbnail(QColor(255, 0, 0)))
+    cache.put("/b.jpg", SIZE, 1, _thumbnail(QColor(0, 255, 0)))
+    cache._file.close()
+    with open(pack_path, "r+b") as f:
+        f.truncate(os.path.getsize(pack_path) - 10)
+
+    cache = ThumbnailCache(pack_path, 1024 * 1024)
+    assert cache.get("/a.jpg", SIZE, 1) is not None
+    assert cache.get("/b.jpg", SIZE, 1) is None
+    cache.close()
+
+
+def test_unavailable_cache_is_skipped(tmp_path):
+    """Test that a cache that cannot be opened is replaced by None."""
+    assert open_thumbnail_cache(None, 1024) is None
+    assert open_thumbnail_cache(str(tmp_path / "missing" / "thumbnails.pack"), 1024) is None
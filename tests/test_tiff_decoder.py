@@ -0,0 +1,153 @@
+import struct
+import zlib
+from unittest.mock import patch
+import numpy as np
+import pytest
+from PySide6.QtCore import QSize
+from src.timestamper.image_loader import load_scaled_image
+from src.timestamper.native_exif import tiff_pages
+from src.timestamper import tiff_decoder
+from src.timestamper.tiff_decoder import decode_reduced
+
+SHORT, LONG = 3, 4
+
+
+def _write_tiff(file_path, pixels, byte_order="<", compression=1, predictor=1, rows_per_strip=None, tile=None):
+    """Write a minimal TIFF file with the given (rows, columns, samples) pixels."""
+    height, width, samples = pixels.shape
+    bits = pixels.dtype.itemsize * 8
+    pixels = pixels.astype(pixels.dtype.newbyteorder(byte_order))
+
+    def encode(block):
+        if predictor == 2:
+            block = block.copy()
+            block[:, 1:] -= block[:, :-1].copy()
+        data = block.tobytes()
+        return zlib.compress(data) if compression == 8 else data
+
+    if tile:
+        tile_width, tile_length = tile
+        padded = np.zeros((-(-height // tile_length) * tile_length, -(-width // tile_width) * tile_width, samples), pixels.dtype)
+        padded[:height, :width] = pixels
+        segments = [
+            encode(padded[y:y + tile_length, x:x + tile_width])
+            for y in range(0, padded.shape[0], tile_length) for x in range(0, padded.shape[1], tile_width)
+        ]
+    else:
+        rows_per_strip = rows_per_strip or height
+        segments = [encode(pixels[y:y + rows_per_strip]) for y in range(0, height, rows_per_strip)]
+
+    body = bytearray()
+    offsets = []
+    for segment in segments:
+        offsets.append(8 + len(body))
+        body += segment
+    entries = [
+        (256, LONG, [width]), (257, LONG, [height]), (258, SHORT, [bits] * samples),
+        (259, SHORT, [compression]), (262, SHORT, [1 if samples == 1 else 2]), (277, SHORT, [samples]),
+        (317, SHORT, [predictor]),
+    ]
+    if tile:
+        entries += [(322, LONG, [tile[0]]), (323, LONG, [tile[1]]),
+                    (324, LONG, offsets), (325, LONG, [len(s) for s in segments])]
+    else:
+        entries += [(273, LONG, offsets), (278, LONG, [rows_per_strip]), (279, LONG, [len(s) for s in segments])]
+    entries.sort()
+
+    ifd_offset = 8 + len(body)
+    extra_offset = ifd_offset + 2 + 12 * len(entries) + 4
+    ifd = bytearray(struct.pack(byte_order + "H", len(entries)))
+    extra = bytearray()
+    for tag, field_type, values in entries:
+        value = struct.pack(byte_order + ("H" if field_type == SHORT else "I") * len(values), *values)
+        if len(value) > 4:
+            field = struct.pack(byte_order + "I", extra_offset + len(extra))
+            extra += value
+        else:
+            field = value.ljust(4, b"\x00")
+        ifd += struct.pack(byte_order + "HHI", tag, field_type, len(values)) + field
+    ifd += b"\x00\x00\x00\x00"
+    header = (b"II*\x00" if byte_order == "<" else b"MM\x00*") + struct.pack(byte_order + "I", ifd_offset)
+    with open(file_path, "wb") as f:
+        f.write(header + body + ifd + extra)
+
+
+def _expected(pixels, factor):
+    """Average blocks of pixels with NumPy and scale them to 8 bits."""
+    height, width, samples = pixels.shape
+    blocks = pixels[:height // factor * factor, :width // factor * factor].astype(np.float64)
+    blocks = blocks.reshape(height // factor, factor, width // factor, factor, samples).mean(axis=(1, 3))
+    if pixels.dtype.itemsize == 2:
+        blocks /= 257
+    return blocks
+
+
+def _pixels(image):
+    """Return the pixels of an 8-bit QImage as a (rows, columns, samples) array."""
+    samples = image.depth() // 8
+    data = np.frombuffer(image.constBits(), np.uint8, image.sizeInBytes()).reshape(image.height(), image.bytesPerLine())
+    return data[:, :image.width() * samples].reshape(image.height(), image.width(), samples)
+
+
+@pytest.mark.parametrize("layout", [
+    {"byte_order": "<"},
+    {"byte_order": ">", "rows_per_strip": 7},
+    {"compression": 8, "predictor": 2, "rows_per_strip": 5},
+    {"byte_order": ">", "compression": 8, "predictor": 2, "tile": (16, 16)},
+    {"tile": (16, 32)},
+])
+def test_16_bit_pages_are_block_averaged(tmp_path, qapp, layout):
+    """Test that 16-bit pages in every supported layout reduce to the block averages."""
+    rng = np.random.default_rng(1)
+    pixels = rng.integers(0, 65536, (45, 70, 3), dtype=np.uint16)
+    file_path = str(tmp_path / "scan.tif")
+    _write_tiff(file_path, pixels, **layout)
+    page, = tiff_pages(file_path)
+
+    image = decode_reduced(file_path, page, 4, 64 * 1024 * 1024)
+    assert (image.width(), image.height()) == (17, 11)
+    assert np.abs(_pixels(image).astype(int) - _expected(pixels, 4)).max() <= 1
+
+    # A budget of a single row gives the same result
+    tiny = decode_reduced(file_path, page, 4, 1)
+    assert (_pixels(tiny) == _pixels(image)).all()
+
+
+def test_8_bit_grey_pages_are_block_averaged(tmp_path, qapp):
+    """Test that compressed 8-bit grey pages are averaged too."""
+    pixels = np.arange(40 * 30, dtype=np.uint8).reshape(40, 30, 1)
+    file_path = str(tmp_path / "scan.tif")
+    _write_tiff(file_path, pixels, compression=8, rows_per_strip=3)
+    page, = tiff_pages(file_path)
+
+    image = decode_reduced(file_path, page, 3, 1024)
+    assert np.abs(_pixels(image).astype(int) - _expected(pixels, 3)).max() <= 1
+
+
+def test_unsupported_and_truncated_pages_are_skipped(tmp_path, qapp):
+    """Test that pages this decoder cannot read return None instead of raising."""
+    pixels = np.zeros((32, 32, 3), np.uint16)
+    file_path = tmp_path / "scan.tif"
+    _write_tiff(str(file_path), pixels, compression=8)
+    page, = tiff_pages(str(file_path))
+    assert decode_reduced(str(file_path), page._replace(compression=5), 2, 1024) is None  # LZW
+    assert decode_reduced(str(file_path), page._replace(planar_configuration=2), 2, 1024) is None
+
+    data = file_path.read_bytes()
+    file_path.write_bytes(data[:8] + b"\x00" * 64 + data[72:])
+    assert decode_reduced(str(file_path), page, 2, 1024) is None
+
+
+def test_16_bit_tiff_previews_are_decoded_at_reduced_size(tmp_path, qapp):
+    """Test that load_scaled_image reduces a 16-bit scan without a full-size decode."""
+    pixels = np.full((400, 600, 3), 65535, np.uint16)
+    pixels[:, :, 1] = 0
+    file_path = str(tmp_path / "scan.tif")
+    _write_tiff(file_path, pixels, compression=8, predictor=2, rows_per_strip=16)
+
+    with patch.object(tiff_decoder, "decode_reduced", wraps=decode_reduced) as decode:
+        image = load_scaled_image(file_path, QSize(60, 60))
+    assert decode.call_args[0][2] == 10
+    assert (image.width(), image.height()) == (60, 40)
+    color = image.pixelColor(30, 20)
+    assert (color.red(), color.green(), color.blue()) == (255, 0, 255)
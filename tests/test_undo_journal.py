@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import pytest
+from src.timestamper.undo_journal import open_undo_journal, remove_stale_journals
+
+
+def test_saves_are_undone_last_in_first_out(tmp_path):
+    """Test that popped entries come back newest first and shrink the journal file."""
+    journal_path = tmp_path / "undo.jsonl"
+    journal = open_undo_journal(str(journal_path))
+    first = {"/a.jpg": {"Make": ""}, "/b.jpg": {"Make": ""}}
+    second = {"/a.jpg": {"Make": "Nikon", "ISO": "400"}}
+    journal.record(first)
+    size_after_first = journal_path.stat().st_size
+    journal.record(second)
+
+    assert len(journal) == 2
+    assert journal.pop() == second
+    assert journal_path.stat().st_size == size_after_first
+    assert journal.pop() == first
+    assert journal.pop() is None
+    journal.close()
+
+
+def test_files_with_the_same_previous_values_share_a_group(tmp_path):
+    """Test that a save over a whole roll stays small on disk."""
+    journal_path = tmp_path / "undo.jsonl"
+    journal = open_undo_journal(str(journal_path))
+    previous = {f"/roll/{i:04}.tif": {"Make": "", "Model": ""} for i in range(1000)}
+    journal.record(previous)
+
+    assert journal_path.read_text().count('"Make"') == 1
+    assert journal_path.stat().st_size < 20 * 1000
+    assert journal.pop() == previous
+    journal.close()
+
+
+def test_a_new_session_starts_empty(tmp_path):
+    """Test that reopening the journal discards the previous session's history."""
+    journal_path = tmp_path / "undo.jsonl"
+    journal = open_undo_journal(str(journal_path))
+    journal.record({"/a.jpg": {"Make": ""}})
+    journal.close()
+
+    journal = open_undo_journal(str(journal_path))
+    assert len(journal) == 0 and journal.pop() is None
+    journal.close()
+    assert not journal_path.exists()
+
+    fallback = open_undo_journal(None)
+    fallback.record({"/a.jpg": {"Make": ""}})
+    assert len(fallback) == 1
+    fallback.close()
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Running sessions are detected by their open journal on Windows")
+def test_journals_of_ended_sessions_are_removed(tmp_path):
+    """Test that journals left by processes no longer running are removed, and no others."""
+    ended = subprocess.Popen([sys.executable, "-c", "pass"])
+    ended.wait()
+    template = "Timestamper-undo-{pid}.jsonl"
+    names = [template.format(pid=pid) for pid in (ended.pid, os.getppid(), os.getpid())] + ["other.jsonl"]
+    for name in names:
+        (tmp_path / name).write_bytes(b"")
+
+    remove_stale_journals(str(tmp_path), template)
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(names[1:])
@@ -1,5 +1,5 @@
 import pytest
-from src.timestamper.utils import float_to_shutterspeed, parse_lensinfo
+from src.timestamper.utils import float_to_shutterspeed, parse_lensinfo, setting_to_bool, tag_values_equal
 
 # Test float_to_shutterspeed
 @pytest.mark.parametrize("value, expected_speed", [
@@ -15,3 +15,34 @@ def test_float_to_shutterspeed(value, expected_speed):
 # Test parse_lensinfo
 def test_parse_lensinfo():
     assert parse_lensinfo("18 55 3.5 5.6") == ["18", "55", "3.5", "5.6"]
+
+# Test setting_to_bool
+@pytest.mark.parametrize("value, expected", [
+    (True, True),
+    (False, False),
+    ("true", True),
+    ("false", False),
+])
+def test_setting_to_bool(value, expected):
+    assert setting_to_bool(value) is expected
+
+
+@pytest.mark.parametrize("tag, current, new, expected", [
+    ("FNumber", 5.6, "5.6", True),
+    ("ExposureTime", 0.004, "1/250", True),
+    ("ShutterSpeedValue", 0.00400000013, "1/250", True),
+    ("ExposureTime", 0.004, "1/125", False),
+    ("ISO", 400, "400", True),
+    ("LensInfo", "28 70 3.5 4.5", "28 70 3.50 4.5", True),
+    ("LensInfo", "28 70 3.5 4.5", "28 70 2.8 2.8", False),
+    ("OffsetTimeOriginal", "+10:00", "+1000", True),
+    ("OffsetTime", "+10:00", "+09:30", False),
+    ("DateTimeOriginal", "2023:01:01 12:00:00", "2023:01:01 12:00", True),
+    ("DateTimeOriginal", "2023:01:01 12:00:00", "2023:01:02 12:00:00", False),
+    ("Make", "Nikon", "Nikon", True),
+    ("Model", "5", "5.0", False),
+    ("Make", None, "", True),
+    ("Make", None, "Nikon", False),
+])
+def test_tag_values_equal(tag, current, new, expected):
+    assert tag_values_equal(tag, current, new) == expected
@@ -0,0 +1,142 @@
+import shutil
+import subprocess
+import xml.etree.ElementTree as ET
+import pytest
+from src.timestamper.xmp_sidecar import XmpSidecarError, read_sidecar, sidecar_path, write_sidecar
+
+
+TAGS = {
+    "Make": "Nikon",
+    "Model": "FM2",
+    "DateTimeOriginal": "2023:01:01 12:00:00",
+    "OffsetTimeOriginal": "+10:00",
+    "OffsetTime": "+10:00",
+    "ExposureTime": "0.004",
+    "ShutterSpeedValue": "0.004",
+    "FNumber": "5.6",
+    "MaxApertureValue": "2.8",
+    "FocalLength": "50",
+    "ISO": "400",
+    "LensInfo": "28 70 3.5 4.5",
+    "LensModel": "Nikkor 28-70mm",
+}
+
+
+@pytest.fixture
+def image_file(tmp_path):
+    """Create a stand-in image; the sidecar code never opens it."""
+    file_path = tmp_path / "scan.tif"
+    file_path.write_bytes(b"II*\x00")
+    return str(file_path)
+
+
+def test_round_trip(image_file):
+    """Test that written tags are read back in exiftool's -n shape."""
+    write_sidecar(image_file, TAGS)
+    exif_data = read_sidecar(image_file)
+
+    assert sidecar_path(image_file).endswith("scan.xmp")
+    assert exif_data["EXIF:Make"] == "Nikon"
+    assert exif_data["EXIF:DateTimeOriginal"] == "2023:01:01 12:00:00"
+    assert exif_data["EXIF:OffsetTimeOriginal"] == "+10:00"
+    assert exif_data["EXIF:OffsetTime"] == "+10:00"
+    assert exif_data["EXIF:ExposureTime"] == pytest.approx(0.004)
+    assert exif_data["EXIF:ShutterSpeedValue"] == pytest.approx(0.004)
+    assert exif_data["EXIF:FNumber"] == pytest.approx(5.6)
+    assert exif_data["EXIF:MaxApertureValue"] == pytest.approx(2.8)
+    assert exif_data["EXIF:FocalLength"] == 50
+    assert exif_data["EXIF:ISO"] == 400
+    assert exif_data["EXIF:LensInfo"] == "28 70 3.5 4.5"
+    with open(image_file, "rb") as f:
+        assert f.read() == b"II*\x00"
+
+
+def test_updates_keep_other_properties(image_file):
+    """Test that a write only touches its own tags and keeps foreign XMP content."""
+    with open(sidecar_path(image_file), "w", encoding="utf-8") as f:
+        f.write(
+            '<x:xmpmeta xmlns:x="adobe:ns:meta/"><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">'
+            '<rdf:Description rdf:about="" xmlns:crs="http://ns.adobe.com/camera-raw-settings/1.0/"'
+            ' xmlns:tiff="http://ns.adobe.com/tiff/1.0/" crs:Exposure2012="+0.50" tiff:Make="Canon"/>'
+            '</rdf:RDF></x:xmpmeta>'
+        )
+    assert read_sidecar(image_file) == {"EXIF:Make": "Canon"}
+
+    write_sidecar(image_file, TAGS)
+    write_sidecar(image_file, {"Model": "", "OffsetTimeOriginal": "-05:00"})
+    exif_data = read_sidecar(image_file)
+
+    assert exif_data["EXIF:Make"] == "Nikon"
+    assert "EXIF:Model" not in exif_data
+    assert exif_data["EXIF:DateTimeOriginal"] == "2023:01:01 12:00:00"
+    assert exif_data["EXIF:OffsetTimeOriginal"] == "-05:00"
+    with open(sidecar_path(image_file), encoding="utf-8") as f:
+        content = f.read()
+    assert 'crs:Exposure2012="+0.50"' in content
+    assert "Canon" not in content
+
+
+def test_unknown_namespaces_survive_without_global_registration(image_file, monkeypatch):
+    """Test that foreign properties in unknown namespaces are kept without touching ElementTree's prefix table."""
+    with open(sidecar_path(image_file), "w", encoding="utf-8") as f:
+        f.write(
+            '<x:xmpmeta xmlns:x="adobe:ns:meta/"><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">'
+            '<rdf:Description rdf:about="" xmlns:acme="http://example.com/acme/1.0/" acme:Rating="5"/>'
+            '</rdf:RDF></x:xmpmeta>'
+        )
+    monkeypatch.setattr(ET, "register_namespace", lambda prefix, uri: pytest.fail("registered at runtime"))
+
+    write_sidecar(image_file, {"Make": "Nikon"})
+    with open(sidecar_path(image_file), encoding="utf-8") as f:
+        root = ET.fromstring(f.read())
+    description = root.find(".//{http://www.w3.org/1999/02/22-rdf-syntax-ns#}Description")
+    assert description.get("{http://example.com/acme/1.0/}Rating") == "5"
+    assert read_sidecar(image_file) == {"EXIF:Make": "Nikon"}
+
+
+def test_images_sharing_a_name_get_their_own_sidecars(tmp_path):
+    """Test that a JPEG and a TIFF with the same name never share a sidecar."""
+    jpeg, tiff, single = tmp_path / "IMG_0001.jpg", tmp_path / "IMG_0001.tif", tmp_path / "IMG_0002.jpg"
+    for file_path in (jpeg, tiff, single):
+        file_path.write_bytes(b"")
+
+    write_sidecar(str(jpeg), {"Make": "Nikon"})
+    write_sidecar(str(tiff), {"Make": "Epson", "Model": "V600"})
+    write_sidecar(str(single), {"Make": "Canon"})
+
+    assert sidecar_path(str(jpeg)) == str(tmp_path / "IMG_0001.jpg.xmp")
+    assert sidecar_path(str(tiff)) == str(tmp_path / "IMG_0001.tif.xmp")
+    assert sidecar_path(str(single)) == str(tmp_path / "IMG_0002.xmp")
+    assert read_sidecar(str(jpeg)) == {"EXIF:Make": "Nikon"}
+    assert read_sidecar(str(tiff)) == {"EXIF:Make": "Epson", "EXIF:Model": "V600"}
+    assert not (tmp_path / "IMG_0001.xmp").exists()
+
+
+def test_missing_and_invalid_sidecars(image_file):
+    """Test that a missing sidecar reads as empty and bad input raises."""
+    assert read_sidecar(image_file) == {}
+    with pytest.raises(XmpSidecarError):
+        write_sidecar(image_file, {"Artist": "Someone"})
+    with pytest.raises(XmpSidecarError):
+        write_sidecar(image_file, {"FNumber": "fast"})
+    with pytest.raises(XmpSidecarError):
+        write_sidecar(image_file, {"DateTimeOriginal": "yesterday"})
+    # The offset is part of the date, so it cannot be stored without one
+    with pytest.raises(XmpSidecarError):
+        write_sidecar(image_file, {"OffsetTimeOriginal": "+10:00", "OffsetTime": "+10:00"})
+
+    with open(sidecar_path(image_file), "w", encoding="utf-8") as f:
+        f.write("<not xmp")
+    with pytest.raises(XmpSidecarError):
+        read_sidecar(image_file)
+
+
+@pytest.mark.skipif(shutil.which("exiftool") is None, reason="exiftool is not installed")
+def test_exiftool_reads_sidecar(image_file):
+    """Test that exiftool agrees with what the sidecar writer stored."""
+    write_sidecar(image_file, TAGS)
+    output = subprocess.run(
+        ["exiftool", "-n", "-s3", "-XMP:Make", "-XMP:FNumber", "-XMP:ISO", sidecar_path(image_file)],
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    assert output == ["Nikon", "5.6", "400"]